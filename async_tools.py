@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from neo4j_for_adk import tool_error
+
+# file tools run on these threads, so disk I/O never blocks the event loop shared by all sessions
+FILE_TOOL_WORKERS = 8
+FILE_TOOL_TIMEOUT_S = 60.0
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# set for a tool call which was cancelled or timed out; long loops in the tools check it
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar("cancel_event", default=None)
+
+
+class ToolCancelled(Exception):
+    """Raised inside a file tool whose call was cancelled or timed out."""
+
+
+def raise_if_cancelled() -> None:
+    """Stops the current tool call if it was cancelled. Call it from long loops; a no-op outside offloaded tools."""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise ToolCancelled()
+
+
+# items between two checks of raise_if_cancelled in loops over records or lines
+CANCEL_CHECK_INTERVAL = 4096
+
+
+class _StagedState:
+    """The session state as an offloaded tool sees it: reads fall through to the session state,
+    and writes are kept apart until the call finished in time."""
+    def __init__(self, state):
+        self.state = state
+        self.writes = {}
+
+    def __getitem__(self, key):
+        return self.writes[key] if key in self.writes else self.state[key]
+
+    def __setitem__(self, key, value):
+        self.writes[key] = value
+
+    def __contains__(self, key) -> bool:
+        return key in self.writes or key in self.state
+
+    def get(self, key, default=None):
+        return self.writes[key] if key in self.writes else self.state.get(key, default)
+
+    def update(self, delta) -> None:
+        self.writes.update(delta)
+
+
+class _StagedToolContext:
+    """A tool context whose state writes are staged, otherwise the tool context of the call."""
+    def __init__(self, tool_context):
+        self._tool_context = tool_context
+        self.state = _StagedState(tool_context.state)
+
+    def __getattr__(self, name):
+        return getattr(self._tool_context, name)
+
+
+def get_file_tool_executor() -> ThreadPoolExecutor:
+    """Gets the process-wide executor for file tools, bounded to FILE_TOOL_WORKERS threads."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=FILE_TOOL_WORKERS, thread_name_prefix="file_tool")
+        return _executor
+
+
+def offloaded(func: Callable, timeout: Optional[float] = FILE_TOOL_TIMEOUT_S) -> Callable:
+    """Adapts a blocking tool function into an async tool which runs in the file tool executor.
+
+    The wrapper keeps the name, docstring and signature the model sees. Calls waiting for a free
+    thread are dropped when cancelled. A running call can not be interrupted, so it is asked to stop:
+    raise_if_cancelled() raises in its thread once the agent cancels the call or the timeout passes,
+    at the next check in its loops over records and lines.
+    A timed out call returns an error result instead of the tool's result.
+
+    The tool writes to tool_context.state are staged and only applied to the session state, on the
+    event loop, when the call finishes in time; a call which timed out or was cancelled changes nothing.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        tool_context = bound.arguments.get("tool_context")
+        if tool_context is not None:
+            bound.arguments["tool_context"] = staged_context = _StagedToolContext(tool_context)
+        cancel_event = threading.Event()
+        context = contextvars.copy_context()
+        context.run(_cancel_event.set, cancel_event)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(get_file_tool_executor(),
+                                      functools.partial(context.run, func, *bound.args, **bound.kwargs))
+        try:
+            result = await asyncio.wait_for(future, timeout)
+            if tool_context is not None:
+                for key, value in staged_context.state.writes.items():
+                    tool_context.state[key] = value
+            return result
+        except asyncio.TimeoutError:
+            cancel_event.set()
+            return tool_error(f"{func.__name__} did not finish within {timeout:g} seconds and was stopped. "
+                              f"Try again with a narrower request.")
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+        except ToolCancelled:
+            return tool_error(f"{func.__name__} was cancelled.")
+    return wrapper
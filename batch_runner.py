@@ -0,0 +1,167 @@
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from session_service import get_session_service, get_runner, PIPELINE_APP_NAME
+from tracing import iter_agents
+
+# requests per minute by LLM provider, the prefix of a LiteLLM model name like "gemini/gemini-2.5-flash"
+DEFAULT_RATE_LIMITS = {"gemini": 60, "openai": 500, "anthropic": 50}
+DEFAULT_MESSAGES = ["How can these files be imported?", "Yes, let's do it!"]
+
+
+class RateLimiter:
+    """An async token bucket allowing a number of requests per minute, with bursts up to that number."""
+    def __init__(self, requests_per_minute: float):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(requests_per_minute, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.requests = 0
+        self.waited = 0.0
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+                self.waited += wait
+                await asyncio.sleep(wait)
+
+
+# one limiter per provider for the whole process, since the provider's limits are per API key, not per batch
+_limiters: Dict[str, RateLimiter] = {}
+
+def configure_rate_limits(rate_limits: Dict[str, float]) -> Dict[str, RateLimiter]:
+    """Sets the requests per minute of providers. Limiters of providers already configured keep their state."""
+    for provider, requests_per_minute in rate_limits.items():
+        if provider not in _limiters or _limiters[provider].capacity != max(requests_per_minute, 1.0):
+            _limiters[provider] = RateLimiter(requests_per_minute)
+    return _limiters
+
+# before_model_callback waiting for the rate limit of the model's provider
+async def rate_limit_llm_calls(callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+    provider = provider_of(llm_request.model or "")
+    limiter = _limiters.get(provider) or _limiters.get("default")
+    if limiter:
+        await limiter.acquire()
+    return None
+
+def provider_of(model: Any) -> str:
+    """The provider of a model: the LiteLLM prefix of its name, or 'default'."""
+    name = model if isinstance(model, str) else getattr(model, "model", "")
+    return name.split("/", 1)[0] if "/" in name else "default"
+
+
+def install_rate_limits(root_agent: BaseAgent) -> None:
+    """Adds the rate limit callback to every LLM agent of a tree, once."""
+    for agent in iter_agents(root_agent):
+        if not isinstance(agent, LlmAgent):
+            continue
+        callbacks = agent.before_model_callback or []
+        callbacks = callbacks if isinstance(callbacks, list) else [callbacks]
+        if rate_limit_llm_calls not in callbacks:
+            agent.before_model_callback = [rate_limit_llm_calls] + callbacks
+
+
+class BatchRunner:
+    """Runs one agent pipeline for many goals and file sets, as independent sessions in parallel.
+
+    Sessions run concurrently up to max_concurrency. All sessions share the agents' LLM client,
+    the Neo4j driver and its connection pool (both module-level in this project), the runner and
+    the session service. Every LLM call first waits for the rate limiter of its provider.
+    """
+    def __init__(self, agent: BaseAgent, max_concurrency: int = 4,
+                 rate_limits: Optional[Dict[str, float]] = None, app_name: str = PIPELINE_APP_NAME):
+        self.agent = agent
+        self.max_concurrency = max_concurrency
+        self.app_name = app_name
+        self.limiters = configure_rate_limits(rate_limits or DEFAULT_RATE_LIMITS)
+        self.runner = get_runner(agent, app_name)
+        self.session_service = get_session_service()
+        install_rate_limits(agent)
+
+    async def run_job(self, job: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Runs one job in its own session.
+
+        A job is a dictionary with a 'name', the 'approved_user_goal' and 'approved_files',
+        optionally other 'initial_state' keys and the user 'messages' to send.
+        """
+        name = job.get("name") or job.get("approved_user_goal", {}).get("kind_of_graph", "job")
+        async with semaphore:
+            started = time.monotonic()
+            result = {"name": name, "session_id": None, "status": "success", "error": None,
+                      "events": 0, "prompt_tokens": 0, "completion_tokens": 0}
+            try:
+                state = dict(job.get("initial_state", {}))
+                state.update({key: job[key] for key in ("approved_user_goal", "approved_files") if key in job})
+                state.setdefault("feedback", "")
+                user_id = job.get("user_id") or "batch_user"
+                session = await self.session_service.create_session(app_name=self.app_name, user_id=user_id, state=state)
+                result["session_id"] = session.id
+                for message in job.get("messages", DEFAULT_MESSAGES):
+                    content = types.Content(role="user", parts=[types.Part(text=message)])
+                    async for event in self.runner.run_async(user_id=user_id, session_id=session.id, new_message=content):
+                        result["events"] += 1
+                        if event.usage_metadata:
+                            result["prompt_tokens"] += event.usage_metadata.prompt_token_count or 0
+                            result["completion_tokens"] += event.usage_metadata.candidates_token_count or 0
+                final = await self.session_service.get_session(app_name=self.app_name, user_id=user_id, session_id=session.id)
+                result["state"] = {key: final.state.get(key) for key in job.get("result_keys", ["approved_construction_plan"])}
+            except Exception as e:
+                result.update(status="error", error=f"{type(e).__name__}: {e}")
+            result["duration_s"] = round(time.monotonic() - started, 3)
+            return result
+
+    async def run(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Runs all jobs and reports per-job results and aggregate throughput."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.monotonic()
+        results = await asyncio.gather(*(self.run_job(job, semaphore) for job in jobs))
+        elapsed = time.monotonic() - started
+        succeeded = [r for r in results if r["status"] == "success"]
+        return {
+            "results": results,
+            "summary": {
+                "jobs": len(results),
+                "succeeded": len(succeeded),
+                "failed": len(results) - len(succeeded),
+                "elapsed_s": round(elapsed, 3),
+                "jobs_per_minute": round(len(results) / elapsed * 60, 2) if elapsed else None,
+                "mean_job_s": round(sum(r["duration_s"] for r in results) / len(results), 3) if results else None,
+                "prompt_tokens": sum(r["prompt_tokens"] for r in results),
+                "completion_tokens": sum(r["completion_tokens"] for r in results),
+                "llm_requests_by_provider": {p: l.requests for p, l in self.limiters.items() if l.requests},
+                "rate_limit_wait_s": {p: round(l.waited, 3) for p, l in self.limiters.items() if l.waited},
+            },
+        }
+
+
+async def main(jobs_path: str, max_concurrency: int = 4):
+    from structured_data_agents.agent import schema_proposal_coordinator
+
+    with open(jobs_path, encoding="utf-8") as file:
+        jobs = json.load(file)
+    report = await BatchRunner(schema_proposal_coordinator, max_concurrency=max_concurrency).run(jobs)
+    for result in report["results"]:
+        print(f"{result['name']}: {result['status']} in {result['duration_s']}s" +
+              (f" ({result['error']})" if result["error"] else ""))
+    print(json.dumps(report["summary"], indent=2))
+
+if __name__ == "__main__":
+    # usage: python batch_runner.py jobs.json [max_concurrency]
+    asyncio.run(main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 4))
@@ -0,0 +1,214 @@
+"""Seeded synthetic bill of materials dataset, with the schema of the files in data/.
+
+The scale is the number of parts, from 10^3 to 10^7. The other files follow:
+products ~ parts / 9, assemblies ~ parts * 0.7, suppliers ~ 2 * sqrt(parts), 1 to 3 supplier
+mappings per part, and a review markdown file for up to --review-products products.
+The same rows and seed always give the same files.
+
+usage: python -m benchmarks.bom_dataset OUTPUT_DIR [--rows 100000] [--seed 42] [--review-products 100]
+"""
+import argparse
+import csv
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# rows are generated and written in chunks, so memory stays flat at any scale
+CHUNK_ROWS = 100000
+
+CITIES = ["Stockholm", "Gothenburg", "Malmo", "Uppsala", "Vasteras", "Orebro", "Linkoping", "Helsingborg",
+          "Jonkoping", "Norrkoping", "Lund", "Umea", "Gavle", "Boras", "Eskilstuna", "Sodertalje"]
+FURNITURE = ["Chair", "Table", "Desk", "Dresser", "Sofa", "Bed", "Bookshelf", "Lamp", "Nightstand",
+             "Coffee Table", "Wardrobe", "Cabinet", "Bench", "Stool", "Armchair", "Sideboard"]
+DESCRIPTIONS = ["Ergonomic design with minimalist Scandinavian style", "Modern design that brings people together",
+                "Solid construction built to last for generations", "Compact storage for small spaces",
+                "Timeless style with a natural wood finish", "Clean lines and smart details for everyday use"]
+ASSEMBLIES = ["Seat Cushion", "Back Cushion", "Frame", "Leg Set", "Drawer", "Table Top", "Base", "Shelf Unit",
+              "Headboard", "Door Panel", "Lamp Head", "Arm Rest", "Side Panel", "Back Panel", "Hardware Kit"]
+PARTS = ["Drawer Front", "Drawer Bottom", "Drawer Slide", "Wooden Leg", "Metal Bracket", "Screw Set", "Dowel",
+         "Hinge", "Foam Insert", "Fabric Cover", "Spring", "Glass Panel", "Handle", "Cam Lock", "Shelf Pin",
+         "Side Rail", "Cross Beam", "Light Bulb", "Power Cord", "Felt Pad"]
+SPECIALTIES = ["Wood", "Metal", "Fabric", "Plastic", "Glass", "Hardware", "Foam", "Electrical"]
+COUNTRIES = [("Sweden", "Stockholm"), ("China", "Shanghai"), ("Germany", "Hamburg"), ("Poland", "Poznan"),
+             ("Vietnam", "Hanoi"), ("Canada", "Vancouver"), ("Italy", "Milan"), ("Mexico", "Monterrey"),
+             ("India", "Pune"), ("Turkey", "Izmir")]
+SUPPLIER_WORDS = ["Nordic", "Global", "Pacific", "Baltic", "United", "Precision", "Premier", "Atlas", "Summit", "Coastal"]
+
+REVIEW_SENTENCES = {
+    5: ["Absolutely love the {product}, it exceeded my expectations.", "The {assembly} feels solid and well made.",
+        "Assembly was quick and the instructions were clear."],
+    4: ["Very happy with the {product} overall.", "The {assembly} is sturdy, but the {part} was a bit stiff at first.",
+        "Taking off one star because assembly took longer than expected."],
+    3: ["The {product} is decent for the price.", "The {part} started to loosen after a few weeks.",
+        "It works, but I expected better quality from the {assembly}."],
+    2: ["Disappointed with the {product}.", "The {part} broke within a month and the {assembly} wobbles.",
+        "Customer service sent a replacement {part} but it did not fit."],
+    1: ["Would not recommend the {product}.", "The {assembly} cracked during assembly because the {part} was defective.",
+        "Returned it after the {part} failed twice."],
+}
+REVIEWERS = ["home_maker", "wfh_warrior", "designer_dave", "tallguy87", "architect_amy", "cozy_corner", "diy_dan",
+             "minimal_mia", "budget_buyer", "family_of_five"]
+
+
+def scale_counts(rows: int) -> Dict[str, int]:
+    """The number of products, assemblies, parts and suppliers for a number of parts."""
+    products = max(10, rows // 9)
+    return {
+        "products": products,
+        "assemblies": max(products, rows * 7 // 10),
+        "parts": rows,
+        "suppliers": max(20, int(2 * math.sqrt(rows))),
+    }
+
+
+def _write(path: Path, header: List[str], rows_iter) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(header)
+        for chunk in rows_iter:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def _chunks(total: int):
+    for start in range(0, total, CHUNK_ROWS):
+        yield start, min(start + CHUNK_ROWS, total)
+
+
+def product_name(i: int) -> str:
+    base = f"{CITIES[i % len(CITIES)]} {FURNITURE[(i // len(CITIES)) % len(FURNITURE)]}"
+    series = i // (len(CITIES) * len(FURNITURE))
+    return f"{base} {series + 1}" if series else base
+
+
+def generate_bom_dataset(output_dir: str, rows: int, seed: int = 42, review_products: int = 100) -> Dict[str, Any]:
+    """Writes products, assemblies, parts, suppliers and part_supplier_mapping CSVs and product review markdown.
+
+    Args:
+        output_dir: directory for the files, created if needed; reviews go to its product_reviews directory
+        rows: the number of parts
+        seed: the random seed
+        review_products: the number of products with a review file
+
+    Returns:
+        Dict[str, Any]: the 'rows' of each file, their total 'bytes', the 'seed' and the 'duration_s'
+    """
+    started = time.monotonic()
+    output = Path(output_dir)
+    (output / "product_reviews").mkdir(parents=True, exist_ok=True)
+    counts = scale_counts(rows)
+    rng = np.random.default_rng(seed)
+    written = {}
+
+    supplier_names = [f"{SUPPLIER_WORDS[i % len(SUPPLIER_WORDS)]} {SPECIALTIES[(i // len(SUPPLIER_WORDS)) % len(SPECIALTIES)]} "
+                      f"{['Industries', 'Corp', 'Works', 'Supply', 'Group'][(i // 80) % 5]}" + (f" {i // 400 + 1}" if i >= 400 else "")
+                      for i in range(counts["suppliers"])]
+    supplier_width = max(3, len(str(counts["suppliers"])))
+
+    def suppliers():
+        for start, end in _chunks(counts["suppliers"]):
+            chunk = []
+            for i in range(start, end):
+                country, city = COUNTRIES[i % len(COUNTRIES)]
+                slug = supplier_names[i].lower().replace(" ", "")
+                chunk.append([f"SUP-{i + 1:0{supplier_width}d}", supplier_names[i], SPECIALTIES[i % len(SPECIALTIES)],
+                              city, country, f"www.{slug}.com", f"info@{slug}.com"])
+            yield chunk
+    written["suppliers.csv"] = _write(output / "suppliers.csv",
+                                      ["supplier_id", "name", "specialty", "city", "country", "website", "contact_email"],
+                                      suppliers())
+
+    def products():
+        for start, end in _chunks(counts["products"]):
+            prices = rng.integers(49, 1500, end - start)
+            descriptions = rng.integers(0, len(DESCRIPTIONS), end - start)
+            yield [[product_name(i), f"${prices[k]}", DESCRIPTIONS[descriptions[k]], f"P-{1000 + i}"]
+                   for k, i in enumerate(range(start, end))]
+    written["products.csv"] = _write(output / "products.csv", ["product_name", "price", "description", "product_id"],
+                                     products())
+
+    def assemblies():
+        for start, end in _chunks(counts["assemblies"]):
+            size = end - start
+            names = rng.integers(0, len(ASSEMBLIES), size)
+            quantities = rng.integers(1, 5, size)
+            # the first assemblies cover every product once, the others go to random products
+            owners = rng.integers(0, counts["products"], size)
+            yield [[f"A-{1000 + i}", ASSEMBLIES[names[k]], int(quantities[k]),
+                    f"P-{1000 + (i if i < counts['products'] else int(owners[k]))}"]
+                   for k, i in enumerate(range(start, end))]
+    written["assemblies.csv"] = _write(output / "assemblies.csv", ["assembly_id", "assembly_name", "quantity", "product_id"],
+                                       assemblies())
+
+    part_names = []
+    def parts():
+        for start, end in _chunks(counts["parts"]):
+            size = end - start
+            names = rng.integers(0, len(PARTS), size)
+            quantities = rng.integers(1, 9, size)
+            owners = rng.integers(0, counts["assemblies"], size)
+            part_names.append(names.astype(np.int8))
+            yield [[f"S-{1000 + i}", PARTS[names[k]], int(quantities[k]),
+                    f"A-{1000 + (i if i < counts['assemblies'] else int(owners[k]))}"]
+                   for k, i in enumerate(range(start, end))]
+    written["parts.csv"] = _write(output / "parts.csv", ["part_id", "part_name", "quantity", "assembly_id"], parts())
+
+    def mappings():
+        for chunk_index, (start, end) in enumerate(_chunks(counts["parts"])):
+            size = end - start
+            names = part_names[chunk_index]
+            supplier_counts = rng.integers(1, 4, size)
+            picks = rng.integers(0, counts["suppliers"], (size, 3))
+            lead_times = rng.integers(3, 60, (size, 3))
+            costs = rng.uniform(0.5, 120, (size, 3))
+            minimums = rng.integers(1, 500, (size, 3))
+            chunk = []
+            for k, i in enumerate(range(start, end)):
+                for j in range(supplier_counts[k]):
+                    supplier = int(picks[k, j])
+                    chunk.append([f"S-{1000 + i}", PARTS[names[k]], f"SUP-{supplier + 1:0{supplier_width}d}",
+                                  supplier_names[supplier], int(lead_times[k, j]), f"${costs[k, j]:.2f}",
+                                  int(minimums[k, j]), "yes" if j == 0 else "no"])
+            yield chunk
+    written["part_supplier_mapping.csv"] = _write(
+        output / "part_supplier_mapping.csv",
+        ["part_id", "part_name", "supplier_id", "supplier_name", "lead_time_days", "unit_cost",
+         "minimum_order_quantity", "preferred_supplier"],
+        mappings())
+    part_names.clear()
+
+    review_count = 0
+    for i in range(min(review_products, counts["products"])):
+        name = product_name(i)
+        slug = name.lower().replace(" ", "_")
+        lines = [f"# {name} Reviews", "", f"Scraped from https://www.between2furns.com/{name.replace(' ', '-')}/dp/P{1000 + i}", ""]
+        for _ in range(int(rng.integers(3, 9))):
+            rating = int(rng.choice([5, 4, 3, 2, 1], p=[0.35, 0.3, 0.15, 0.1, 0.1]))
+            text = " ".join(sentence.format(product=name, assembly=ASSEMBLIES[int(rng.integers(len(ASSEMBLIES)))].lower(),
+                                            part=PARTS[int(rng.integers(len(PARTS)))].lower())
+                            for sentence in REVIEW_SENTENCES[rating])
+            reviewer = REVIEWERS[int(rng.integers(len(REVIEWERS)))]
+            lines += [f"## Rating: {'★' * rating}{'☆' * (5 - rating)} ({rating}/5)", text, "",
+                      f"- @{reviewer} ({CITIES[int(rng.integers(len(CITIES)))]})", "", "---", ""]
+            review_count += 1
+        (output / "product_reviews" / f"{slug}_reviews.md").write_text("\n".join(lines), encoding="utf-8")
+    written["product_reviews"] = review_count
+
+    total_bytes = sum(path.stat().st_size for path in output.rglob("*") if path.is_file())
+    return {"rows": written, "bytes": total_bytes, "seed": seed, "duration_s": round(time.monotonic() - started, 3)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output_dir")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--review-products", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(generate_bom_dataset(args.output_dir, args.rows, args.seed, args.review_products), indent=2))
@@ -0,0 +1,120 @@
+"""Latency of concurrent sessions using the file tools, with the tools run on the event loop and offloaded.
+
+Each simulated session alternates a model turn (an await of --think-ms) with a file tool call:
+search_file with a new query, sample_file or list_available_files. Run on the event loop, every
+tool call stalls all other sessions; offloaded to the file tool executor, only its own session waits.
+Search indexes are built before measuring, so both runs measure the same steady state.
+
+usage: python -m benchmarks.file_tools [--sessions 16] [--rounds 20] [--rows 300000] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+def write_dataset(import_dir: Path, rows: int, seed: int = 42) -> None:
+    """A large CSV to search and sample, and many small markdown files to list."""
+    rng = random.Random(seed)
+    with open(import_dir / "parts.csv", "w", encoding="utf-8") as file:
+        file.write("part_id,part_name,assembly_id,quantity,supplier\n")
+        for i in range(rows):
+            file.write(f"P-{i:07d},part {rng.choice(['bolt', 'frame', 'hinge', 'panel', 'screw'])} {i},"
+                       f"A-{rng.randrange(rows // 10 + 1):06d},{rng.randrange(1, 50)},S-{rng.randrange(500):04d}\n")
+    for d in range(20):
+        review_dir = import_dir / "product_reviews" / f"batch_{d:02d}"
+        review_dir.mkdir(parents=True, exist_ok=True)
+        for i in range(50):
+            (review_dir / f"review_{i:03d}.md").write_text(f"# Review {d}-{i}\n\nFine product.\n", encoding="utf-8")
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    values_ms = np.asarray(values) * 1000
+    return {"count": len(values), "p50_ms": round(float(np.percentile(values_ms, 50)), 2),
+            "p99_ms": round(float(np.percentile(values_ms, 99)), 2), "max_ms": round(float(values_ms.max()), 2)}
+
+
+async def run_sessions(tools: Dict[str, Any], sessions: int, rounds: int, think_s: float, seed: int) -> Dict[str, Any]:
+    turn_delays, tool_latencies, step_latencies = [], [], []
+
+    async def session(number: int) -> None:
+        rng = random.Random(seed * 1000 + number)
+        tool_context = SimpleNamespace(state={})
+        for _ in range(rounds):
+            step_started = time.perf_counter()
+            # a model turn: any time beyond think_s is time the event loop was busy with other sessions
+            started = time.perf_counter()
+            await asyncio.sleep(think_s)
+            turn_delays.append(time.perf_counter() - started - think_s)
+
+            choice = rng.random()
+            started = time.perf_counter()
+            if choice < 0.6:
+                call = tools["search_file"]("parts.csv", f"P-{rng.randrange(10 ** 6):06d}")
+            elif choice < 0.9:
+                call = tools["sample_file"]("parts.csv", tool_context, strategy="spread")
+            else:
+                call = tools["list_available_files"](tool_context, pattern="product_reviews/*")
+            if asyncio.iscoroutine(call):
+                await call
+            tool_latencies.append(time.perf_counter() - started)
+            step_latencies.append(time.perf_counter() - step_started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(number) for number in range(sessions)))
+    return {"elapsed_s": round(time.perf_counter() - started, 3), "model_turn_delay": percentiles(turn_delays),
+            "tool_call": percentiles(tool_latencies), "session_step": percentiles(step_latencies)}
+
+
+def main() -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--think-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        import_dir = Path(work_dir) / "import"
+        import_dir.mkdir()
+        write_dataset(import_dir, args.rows, args.seed)
+        os.environ["NEO4J_IMPORT_DIR"] = str(import_dir)
+        os.environ["AGENTIC_KG_CACHE_DIR"] = str(Path(work_dir) / "cache")
+
+        from async_tools import offloaded, FILE_TOOL_WORKERS
+        from file_suggestion_agent.tools import sample_file, list_available_files
+        from structured_data_agents.tools import search_file
+
+        blocking = {"search_file": search_file, "sample_file": sample_file, "list_available_files": list_available_files}
+        offloaded_tools = {name: offloaded(tool) for name, tool in blocking.items()}
+        search_file("parts.csv", "warm up")
+
+        results = {"sessions": args.sessions, "rounds": args.rounds, "rows": args.rows, "think_ms": args.think_ms,
+                   "file_tool_workers": FILE_TOOL_WORKERS}
+        for mode, tools in (("blocking", blocking), ("offloaded", offloaded_tools)):
+            results[mode] = asyncio.run(run_sessions(tools, args.sessions, args.rounds, args.think_ms / 1000, args.seed))
+
+    print(f"{'mode':<10} {'metric':<18} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for mode in ("blocking", "offloaded"):
+        for metric in ("model_turn_delay", "tool_call", "session_step"):
+            m = results[mode][metric]
+            print(f"{mode:<10} {metric:<18} {m['p50_ms']:>9} {m['p99_ms']:>9} {m['max_ms']:>9}")
+        print(f"{mode:<10} {'elapsed s':<18} {results[mode]['elapsed_s']:>9}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""End-to-end benchmarks on synthetic BOM datasets, saved as JSON to compare runs for regressions.
+
+For each scale, a dataset is generated with benchmarks.bom_dataset into the import directory,
+then these are timed: search_file (cold, with the index build, and warm), sample_file by strategy,
+to_python over driver records, RegexTextSplitter over the reviews, the construction plan import,
+and graph queries. The import and the queries need Neo4j; the graph they write uses labels prefixed
+with 'Bench' and is deleted afterwards, unless --keep-graph is given. Benchmarks which can not run
+are recorded as skipped, with the reason.
+
+usage: python -m benchmarks.harness run [--rows 1000 100000] [--repeat 5] [--output results.json]
+       python -m benchmarks.harness compare baseline.json results.json [--threshold 1.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.bom_dataset import generate_bom_dataset, scale_counts
+
+BENCH_LABEL_PREFIX = "Bench"
+TO_PYTHON_MAX_RECORDS = 100000
+REVIEW_SEPARATOR = "---"
+
+
+def summarize(durations: List[float]) -> Dict[str, Any]:
+    values_ms = np.asarray(durations) * 1000
+    return {"runs": len(durations), "min_ms": round(float(values_ms.min()), 3),
+            "median_ms": round(float(np.median(values_ms)), 3), "mean_ms": round(float(values_ms.mean()), 3),
+            "p99_ms": round(float(np.percentile(values_ms, 99)), 3)}
+
+
+def timed(call: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    call()
+    return time.perf_counter() - started
+
+
+def guarded(name: str, results: Dict[str, Any], benchmark: Callable[[], Dict[str, Any]], group: bool = False) -> bool:
+    """Runs a benchmark into results, or a group of benchmarks returned by name.
+    A benchmark which fails is recorded as skipped, with the error."""
+    try:
+        measured = benchmark()
+    except Exception as e:
+        results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+        print(f"  {name}: skipped ({results[name]['skipped'][:200]})", flush=True)
+        return False
+    measured = measured if group else {name: measured}
+    results.update(measured)
+    for measured_name, stats in measured.items():
+        print(f"  {measured_name}: {stats.get('median_ms', stats.get('total_ms'))} ms", flush=True)
+    return True
+
+
+def bench_search_file(rel_dir: str, rows: int, repeat: int, rng: random.Random) -> Dict[str, Any]:
+    from structured_data_agents.tools import search_file
+
+    part_ids = lambda: f"S-{1000 + rng.randrange(rows)}"
+    results = {"search_file_cold": summarize([timed(lambda: search_file(f"{rel_dir}/parts.csv", part_ids()))])}
+    results["search_file_warm"] = summarize([timed(lambda: search_file(f"{rel_dir}/parts.csv", part_ids()))
+                                             for _ in range(repeat)])
+    results["search_file_column"] = summarize([timed(lambda: search_file(f"{rel_dir}/part_supplier_mapping.csv",
+                                                                         part_ids(), column="part_id"))
+                                               for _ in range(repeat)])
+    return results
+
+
+def bench_sample_file(rel_dir: str, repeat: int) -> Dict[str, Any]:
+    from file_suggestion_agent.tools import sample_file
+
+    tool_context = SimpleNamespace(state={})
+    review = next(iter(sorted(Path(os.environ["NEO4J_IMPORT_DIR"], rel_dir, "product_reviews").glob("*.md"))), None)
+    cases = {"columnar": f"{rel_dir}/parts.csv", "head": f"{rel_dir}/parts.csv", "spread": f"{rel_dir}/parts.csv"}
+    if review is not None:
+        cases["sections"] = f"{rel_dir}/product_reviews/{review.name}"
+    return {f"sample_file_{strategy}": summarize([timed(lambda: sample_file(path, tool_context, strategy=strategy))
+                                                  for _ in range(repeat)])
+            for strategy, path in cases.items()}
+
+
+def driver_records(import_dir: Path, rel_dir: str, limit: int) -> List[Any]:
+    """Records as the driver hydrates them, each with a part node, its assembly node and their relationship."""
+    import csv
+    from itertools import islice
+    from neo4j import Record
+    # the driver's own hydration, as used for query results
+    from neo4j._codec.hydration.v1.hydration_handler import _GraphHydrator
+
+    hydrator = _GraphHydrator()
+    records = []
+    with open(import_dir / rel_dir / "parts.csv", encoding="utf-8") as file:
+        for i, row in enumerate(islice(csv.DictReader(file), limit)):
+            part = hydrator.hydrate_node(2 * i, ["Part"], dict(row))
+            assembly = hydrator.hydrate_node(2 * i + 1, ["Assembly"], {"assembly_id": row["assembly_id"]})
+            relationship = hydrator.hydrate_relationship(i, 2 * i, 2 * i + 1, "BELONGS_TO_ASSEMBLY",
+                                                         {"quantity": row["quantity"]})
+            records.append(Record(zip(["part", "relationship", "assembly"], [part, relationship, assembly])))
+    return records
+
+
+def bench_to_python(import_dir: Path, rel_dir: str, rows: int, repeat: int) -> Dict[str, Any]:
+    from neo4j_for_adk import to_python
+
+    records = driver_records(import_dir, rel_dir, min(rows, TO_PYTHON_MAX_RECORDS))
+    return dict(summarize([timed(lambda: [to_python(record) for record in records]) for _ in range(repeat)]),
+                records=len(records))
+
+
+def bench_text_splitter(import_dir: Path, rel_dir: str, repeat: int) -> Dict[str, Any]:
+    from knowledge_graph.helper import RegexTextSplitter
+
+    text = "\n".join(path.read_text(encoding="utf-8")
+                     for path in sorted((import_dir / rel_dir / "product_reviews").glob("*.md")))
+    splitter = RegexTextSplitter(REVIEW_SEPARATOR)
+    loop = asyncio.new_event_loop()
+    try:
+        durations = [timed(lambda: loop.run_until_complete(splitter.run(text))) for _ in range(repeat)]
+        chunks = len(loop.run_until_complete(splitter.run(text)).chunks)
+    finally:
+        loop.close()
+    return dict(summarize(durations), chunks=chunks, text_bytes=len(text.encode("utf-8")))
+
+
+def bench_plan(import_dir: Path, rel_dir: str) -> Dict[str, Dict[str, Any]]:
+    """The draft construction plan of the dataset, with its labels prefixed so it can not touch other graphs."""
+    from structured_data_agents.discovery import get_discovery
+
+    files = [f"{rel_dir}/{name}" for name in
+             ("products.csv", "assemblies.csv", "parts.csv", "suppliers.csv", "part_supplier_mapping.csv")]
+    plan = get_discovery(str(import_dir), files)["draft_plan"]
+    for rule in plan.values():
+        for key in ("label", "from_node_label", "to_node_label"):
+            if key in rule:
+                rule[key] = BENCH_LABEL_PREFIX + rule[key]
+    return plan
+
+
+def bench_import(plan: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    from knowledge_graph.tools import iter_construct_domain_graph
+
+    started = time.perf_counter()
+    steps = list(iter_construct_domain_graph(plan))
+    failed = [step for step in steps if step["status"] == "error"]
+    if failed:
+        raise RuntimeError(f"importing {failed[0]['name']} failed: {failed[0].get('error_message')}")
+    return {"total_ms": round((time.perf_counter() - started) * 1000, 3),
+            "steps": {step["name"]: round(step["duration_s"] * 1000, 3) for step in steps}}
+
+
+def bench_queries(plan: Dict[str, Dict[str, Any]], rows: int, repeat: int, rng: random.Random) -> Dict[str, Any]:
+    from neo4j_for_adk import graphdb
+
+    def run(query: str, parameters: Dict[str, Any]) -> None:
+        result = graphdb.send_query(query, parameters)
+        if result["status"] == "error":
+            raise RuntimeError(result["error_message"])
+
+    nodes = {rule["label"]: rule for rule in plan.values() if rule["construction_type"] == "node"}
+    relationship_types = [rule["relationship_type"] for rule in plan.values() if rule["construction_type"] == "relationship"]
+    counts = scale_counts(rows)
+    results = {
+        "query_count_nodes": summarize([timed(lambda: [run("MATCH (n:$($label)) RETURN count(n) AS count", {"label": label})
+                                                       for label in nodes]) for _ in range(repeat)]),
+        "query_count_relationships": summarize([timed(lambda: [run("MATCH ()-[r:$($type)]->() RETURN count(r) AS count",
+                                                                   {"type": rel_type}) for rel_type in relationship_types])
+                                                for _ in range(repeat)]),
+    }
+    product, supplier = nodes.get(BENCH_LABEL_PREFIX + "Product"), nodes.get(BENCH_LABEL_PREFIX + "Supplier")
+    if product and supplier:
+        # root cause analysis: which products depend on a supplier, across assemblies and parts
+        width = max(3, len(str(counts["suppliers"])))
+        results["query_supplier_products"] = summarize([timed(lambda: run(
+            f"""MATCH (s:$($supplier) {{ {supplier['unique_column_name']}: $id }})-[*1..3]-(p:$($product))
+            RETURN p.{product['unique_column_name']} AS product, count(*) AS paths""",
+            {"supplier": supplier["label"], "product": product["label"],
+             "id": f"SUP-{rng.randrange(counts['suppliers']) + 1:0{width}d}"})) for _ in range(repeat)])
+        results["query_product_bom"] = summarize([timed(lambda: run(
+            f"""MATCH path = (p:$($product) {{ {product['unique_column_name']}: $id }})-[*1..2]-(x)
+            RETURN path LIMIT 1000""",
+            {"product": product["label"], "id": f"P-{1000 + rng.randrange(counts['products'])}"})) for _ in range(repeat)])
+    return results
+
+
+def delete_bench_graph(plan: Dict[str, Dict[str, Any]]) -> None:
+    from neo4j_for_adk import graphdb
+
+    labels = [rule["label"] for rule in plan.values() if rule["construction_type"] == "node"]
+    graphdb.send_query("""MATCH (n) WHERE any(label IN labels(n) WHERE label IN $labels)
+    CALL (n) { DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS""", {"labels": labels})
+    for rule in plan.values():
+        if rule["construction_type"] == "node":
+            graphdb.send_query(f"DROP CONSTRAINT `{rule['label']}_{rule['unique_column_name']}_constraint` IF EXISTS")
+
+
+def run_scale(import_dir: Path, rows: int, args: argparse.Namespace) -> Dict[str, Any]:
+    rel_dir = f"synthetic_bom/{rows}"
+    print(f"{rows} rows: generating into {import_dir / rel_dir}", flush=True)
+    dataset = generate_bom_dataset(str(import_dir / rel_dir), rows, args.seed, args.review_products)
+    rng = random.Random(args.seed)
+    results: Dict[str, Any] = {}
+
+    guarded("search_file", results, lambda: bench_search_file(rel_dir, rows, args.repeat, rng), group=True)
+    guarded("sample_file", results, lambda: bench_sample_file(rel_dir, args.repeat), group=True)
+    guarded("to_python", results, lambda: bench_to_python(import_dir, rel_dir, rows, args.repeat))
+    guarded("regex_text_splitter", results, lambda: bench_text_splitter(import_dir, rel_dir, args.repeat))
+
+    from knowledge_graph.chunk_retrieval import database_available
+    if args.skip_graph or not database_available():
+        reason = "--skip-graph was given" if args.skip_graph else "Neo4j is not reachable"
+        results["plan_import"] = results["graph_queries"] = {"skipped": reason}
+    else:
+        plan = bench_plan(import_dir, rel_dir)
+        try:
+            if guarded("plan_import", results, lambda: bench_import(plan)):
+                guarded("graph_queries", results, lambda: bench_queries(plan, rows, args.repeat, rng), group=True)
+        finally:
+            if not args.keep_graph:
+                delete_bench_graph(plan)
+    return {"dataset": dataset, "benchmarks": results}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import_dir = os.getenv("NEO4J_IMPORT_DIR")
+    temporary = None
+    if not import_dir:
+        # without an import directory, a temporary one is used; Neo4j can not read it, so the import will fail
+        temporary = tempfile.TemporaryDirectory()
+        import_dir = os.environ["NEO4J_IMPORT_DIR"] = temporary.name
+    report = {
+        "meta": {"started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "seed": args.seed, "repeat": args.repeat,
+                 "python": sys.version.split()[0], "platform": platform.platform()},
+        "scales": {},
+    }
+    try:
+        for rows in args.rows:
+            report["scales"][str(rows)] = run_scale(Path(import_dir), rows, args)
+    finally:
+        if temporary is not None:
+            temporary.cleanup()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"results written to {args.output}")
+    return report
+
+
+def compare(baseline_path: str, results_path: str, threshold: float = 1.2) -> List[Dict[str, Any]]:
+    """Compares the median times of two result files, listing benchmarks slower by more than threshold times."""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(results_path, encoding="utf-8") as file:
+        results = json.load(file)
+    regressions = []
+    print(f"{'rows':>9} {'benchmark':<28} {'baseline ms':>12} {'now ms':>10} {'ratio':>7}")
+    for rows, scale in results["scales"].items():
+        before_scale = baseline["scales"].get(rows)
+        if before_scale is None:
+            continue
+        for name, now in scale["benchmarks"].items():
+            before = before_scale["benchmarks"].get(name, {})
+            key = "median_ms" if now.get("median_ms") is not None else "total_ms"
+            if now.get(key) is None or before.get(key) is None or not before[key]:
+                continue
+            ratio = now[key] / before[key]
+            flag = " slower" if ratio > threshold else ""
+            print(f"{rows:>9} {name:<28} {before[key]:>12.3f} {now[key]:>10.3f} {ratio:>7.2f}{flag}")
+            if ratio > threshold:
+                regressions.append({"rows": rows, "benchmark": name, "baseline_ms": before[key],
+                                    "now_ms": now[key], "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="generate datasets and run the benchmarks")
+    run_parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000],
+                            help="the scales, as numbers of parts, from 1000 to 10000000")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--review-products", type=int, default=100)
+    run_parser.add_argument("--skip-graph", action="store_true", help="skip the import and the graph queries")
+    run_parser.add_argument("--keep-graph", action="store_true", help="keep the imported benchmark graph")
+    run_parser.add_argument("--output", help="write the results as JSON to this file")
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=1.2,
+                                help="ratio of median times above which a benchmark counts as a regression")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        return 1 if compare(args.baseline, args.results, args.threshold) else 0
+    run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
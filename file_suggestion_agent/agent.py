@@ -1,11 +1,11 @@
 from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
+from llm_cache import CachingLiteLlm
 from dotenv import load_dotenv
 from file_suggestion_agent.tools import file_suggestion_agent_tools
 
 load_dotenv()
 
-llm = LiteLlm(model="gemini/gemini-2.5-flash")
+llm = CachingLiteLlm(model="gemini/gemini-2.5-flash")
 
 
 file_suggestion_agent_instruction = """
@@ -24,7 +24,8 @@ Prepare for the task:
 - use the 'approve_perceived_user_goal' tool to get the approved user goal
 
 Think carefully, repeating these steps until finished:
-1. list available files using the 'list_available_files' tool
+1. list available files using the 'list_available_files' tool. Results are paginated, use the summary,
+   a pattern or extensions to narrow down large listings, and 'next_offset' to get the next page
 2. evaluate the relevance of each file, then record the list of suggested files using the 'set_suggested_files' tool
 3. use the 'get_suggested_files' tool to get the list of suggested files
 4. ask the user to approve the set of suggested files
@@ -1,16 +1,29 @@
 import asyncio
+import sys
+from typing import Optional
 from main_call import make_agent_caller
-from file_suggestion.agent import file_suggestion_agent
+from file_suggestion_agent.agent import file_suggestion_agent
 
-async def main():
-    file_suggestion_caller = await make_agent_caller(file_suggestion_agent, {
-        "approved_user_goal": {
-            "kind_of_graph": "supply chain analysis",
-            "description": "A multi-level bill of materials for manufactured products, useful for root cause analysis.."
-        }   
-    })
+# state of the user intent stage, used when no earlier session is continued
+DEFAULT_STATE = {
+    "approved_user_goal": {
+        "kind_of_graph": "supply chain analysis",
+        "description": "A multi-level bill of materials for manufactured products, useful for root cause analysis.."
+    }
+}
+
+async def main(session_id: Optional[str] = None):
+    # continue the session of the user intent stage if given, otherwise start from the default state
+    file_suggestion_caller = await make_agent_caller(file_suggestion_agent, {} if session_id else DEFAULT_STATE,
+                                                     session_id=session_id)
     
-    await file_suggestion_caller.call("List available files.")
+    await file_suggestion_caller.call("What files can we use for import?")
+    await file_suggestion_caller.call("Yes, approve those files.", True)
+
+    return file_suggestion_caller
     
 if __name__ == "__main__":
-    session_end = asyncio.run(main())
+    # usage: python -m file_suggestion_agent.call [session_id]
+    session_end = asyncio.run(main(*sys.argv[1:2]))
+    session = asyncio.run(session_end.get_session())
+    print(f"Continue with: python -m structured_data_agents.call {session.id}")
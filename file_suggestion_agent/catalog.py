@@ -0,0 +1,186 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from neo4j_for_adk import get_cache_dir, get_neo4j_import_dir
+from async_tools import raise_if_cancelled, ToolCancelled
+
+# detected formats by file name suffix, longest suffixes first
+FORMATS_BY_SUFFIX = [
+    (".csv.gz", "csv.gz"),
+    (".jsonl.gz", "jsonl.gz"),
+    (".json.gz", "json.gz"),
+    (".csv", "csv"),
+    (".tsv", "tsv"),
+    (".jsonl", "jsonl"),
+    (".ndjson", "jsonl"),
+    (".json", "json"),
+    (".parquet", "parquet"),
+    (".md", "markdown"),
+    (".markdown", "markdown"),
+    (".txt", "text"),
+    (".gz", "gzip"),
+]
+
+def detect_format(file_name: str) -> str:
+    """Detects the format of a file from its name, for example 'csv' or 'csv.gz'."""
+    lower_name = file_name.lower()
+    for suffix, file_format in FORMATS_BY_SUFFIX:
+        if lower_name.endswith(suffix):
+            return file_format
+    return "other"
+
+
+class FileCatalog:
+    """A persistent catalog of the files in the import directory.
+
+    The catalog stores path, size, mtime and detected format of every file in SQLite.
+    A refresh only re-lists directories whose mtime changed since the last refresh,
+    which is when entries were added, removed or renamed. Unchanged directories cost
+    one stat, so a refresh of a large, mostly static import share is cheap.
+
+    Note that editing a file in place does not change its directory's mtime,
+    so the size and mtime of such a file are updated when its directory is next re-listed.
+    """
+    def __init__(self, import_dir: str, catalog_path: Optional[Path] = None, min_refresh_interval: float = 5.0):
+        """
+        Args:
+            import_dir: the directory to catalog
+            catalog_path: the SQLite file for the catalog, by default in the cache directory
+            min_refresh_interval: seconds during which a new refresh is skipped
+        """
+        self.import_dir = Path(import_dir)
+        if catalog_path is None:
+            dir_hash = hashlib.sha1(str(self.import_dir.resolve()).encode("utf-8")).hexdigest()[:12]
+            catalog_path = get_cache_dir() / f"file_catalog_{dir_hash}.sqlite"
+        self.min_refresh_interval = min_refresh_interval
+        self.last_refresh = 0.0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(catalog_path), check_same_thread=False)
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER);
+        CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, dir TEXT, size INTEGER,
+                                          mtime_ns INTEGER, format TEXT);
+        CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+        CREATE INDEX IF NOT EXISTS files_format ON files (format);
+        CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+        """)
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """Brings the catalog up to date with the import directory.
+
+        Returns:
+            Dict[str, int]: the number of directories visited and re-listed
+        """
+        with self.lock:
+            if not force and time.monotonic() - self.last_refresh < self.min_refresh_interval:
+                return {"dirs_visited": 0, "dirs_listed": 0}
+            known = dict(self.conn.execute("SELECT path, mtime_ns FROM dirs"))
+            visited, listed = set(), 0
+            stack = [""]
+            while stack:
+                try:
+                    raise_if_cancelled()
+                except ToolCancelled:
+                    # a partial refresh could hide new subdirectories behind an up-to-date parent
+                    self.conn.rollback()
+                    raise
+                rel_dir = stack.pop()
+                full_dir = self.import_dir / rel_dir
+                try:
+                    mtime_ns = os.stat(full_dir).st_mtime_ns
+                except OSError:
+                    continue
+                visited.add(rel_dir)
+                if known.get(rel_dir) == mtime_ns:
+                    stack.extend(row[0] for row in self.conn.execute(
+                        "SELECT path FROM dirs WHERE parent = ?", (rel_dir,)))
+                    continue
+
+                listed += 1
+                files, subdirs = [], []
+                with os.scandir(full_dir) as entries:
+                    for entry in entries:
+                        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(rel_path)
+                            elif entry.is_file():
+                                stat = entry.stat()
+                                files.append((rel_path, rel_dir, stat.st_size, stat.st_mtime_ns,
+                                              detect_format(entry.name)))
+                        except OSError:
+                            continue
+                self.conn.execute("DELETE FROM files WHERE dir = ?", (rel_dir,))
+                self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", files)
+                parent = rel_dir.rpartition("/")[0] if rel_dir else None
+                self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (rel_dir, parent, mtime_ns))
+                stack.extend(subdirs)
+
+            # directories which disappeared take their files with them
+            gone = [(path,) for path in known if path not in visited]
+            self.conn.executemany("DELETE FROM files WHERE dir = ?", gone)
+            self.conn.executemany("DELETE FROM dirs WHERE path = ?", gone)
+            self.conn.commit()
+            self.last_refresh = time.monotonic()
+            return {"dirs_visited": len(visited), "dirs_listed": listed}
+
+    def list_files(self, pattern: str = "*", extensions: Optional[List[str]] = None,
+                   offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """Lists a page of catalogued files with a summary of all matching files.
+
+        Args:
+            pattern: a glob over the relative path, for example "product_reviews/*.md". '*' also matches '/'
+            extensions: optional list of detected formats or suffixes to keep, for example ["csv", ".md"]
+            offset: index of the first file to return
+            limit: maximum number of files to return
+
+        Returns:
+            Dict[str, Any]: 'files' (relative paths), 'total_files', 'offset', 'next_offset'
+                (None on the last page) and 'summary' with counts by format and by top-level directory.
+        """
+        where, params = ["path GLOB ?"], [pattern or "*"]
+        if extensions:
+            conditions = []
+            for extension in extensions:
+                extension = extension.lower().lstrip(".")
+                conditions.append("(format = ? OR lower(path) GLOB ?)")
+                params.extend([extension, f"*.{extension}"])
+            where.append("(" + " OR ".join(conditions) + ")")
+        where_clause = " AND ".join(where)
+
+        with self.lock:
+            total = self.conn.execute(f"SELECT count(*) FROM files WHERE {where_clause}", params).fetchone()[0]
+            files = [row[0] for row in self.conn.execute(
+                f"SELECT path FROM files WHERE {where_clause} ORDER BY path LIMIT ? OFFSET ?",
+                params + [limit, offset])]
+            by_format = dict(self.conn.execute(
+                f"SELECT format, count(*) FROM files WHERE {where_clause} GROUP BY format ORDER BY 2 DESC",
+                params))
+            by_directory = dict(self.conn.execute(
+                f"""SELECT CASE WHEN instr(path, '/') > 0 THEN substr(path, 1, instr(path, '/') - 1) ELSE '.' END AS top,
+                count(*) FROM files WHERE {where_clause} GROUP BY top ORDER BY 2 DESC LIMIT 20""",
+                params))
+
+        next_offset = offset + len(files)
+        return {
+            "files": files,
+            "total_files": total,
+            "offset": offset,
+            "next_offset": next_offset if next_offset < total else None,
+            "summary": {"by_format": by_format, "by_directory": by_directory},
+        }
+
+
+_catalogs: Dict[str, FileCatalog] = {}
+
+def get_file_catalog() -> FileCatalog:
+    """Gets the shared catalog of the current import directory, creating it on first use."""
+    import_dir = get_neo4j_import_dir()
+    if import_dir not in _catalogs:
+        _catalogs[import_dir] = FileCatalog(import_dir)
+    return _catalogs[import_dir]
@@ -0,0 +1,184 @@
+import csv
+import gzip
+import io
+import json
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from async_tools import CANCEL_CHECK_INTERVAL, raise_if_cancelled
+from file_suggestion_agent.catalog import detect_format
+
+# formats read through a decompressing or columnar stream, which cannot seek to arbitrary lines
+STREAMED_FORMATS = {"csv.gz", "jsonl.gz", "json.gz", "gzip", "parquet"}
+
+def record_format(full_path: str) -> str:
+    """The record layout of a file, ignoring compression: 'csv', 'tsv', 'jsonl', 'parquet' or 'text'."""
+    file_format = detect_format(str(full_path))
+    if file_format.endswith(".gz"):
+        file_format = file_format[:-3]
+    if file_format == "json":
+        # read as records either way, see iter_records for JSON arrays
+        file_format = "jsonl"
+    return file_format if file_format in ("csv", "tsv", "jsonl", "parquet") else "text"
+
+def open_text(full_path: str):
+    """Opens a file for reading text, decompressing gzip on the fly and dropping a byte order mark."""
+    if str(full_path).lower().endswith(".gz"):
+        return gzip.open(full_path, "rt", encoding="utf-8-sig", newline="")
+    return open(full_path, "r", encoding="utf-8-sig", newline="")
+
+def csv_header(full_path: str) -> Dict[str, Any]:
+    """The columns, delimiter and quote character of a CSV or TSV file, from the header registry."""
+    # imported here, as the header registry itself reads files with this module
+    from structured_data_agents.headers import get_header
+    return get_header(full_path)
+
+def _parquet_file(full_path: str):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet files requires pyarrow. Install it with 'pip install pyarrow'.") from e
+    return pq.ParquetFile(full_path)
+
+def _is_json_array(full_path: str) -> bool:
+    """Whether a .json file holds a JSON array rather than one object per line."""
+    if detect_format(str(full_path)) not in ("json", "json.gz"):
+        return False
+    with open_text(full_path) as file:
+        while True:
+            char = file.read(1)
+            if not char or not char.isspace():
+                return char == "["
+
+def _iter_json_array(file, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Streams the items of a top-level JSON array, holding one item and one chunk of text in memory."""
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+
+    def skip_whitespace() -> str:
+        """Skips whitespace, reading more text as needed, and returns the next character or '' at the end."""
+        nonlocal buffer, position, eof
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or eof:
+                return buffer[position:position + 1]
+            chunk = file.read(chunk_size)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+
+    if skip_whitespace() != "[":
+        raise ValueError("expected a JSON array")
+    position += 1
+    first = True
+    while True:
+        char = skip_whitespace()
+        if char == "]":
+            return
+        if not first:
+            if char != ",":
+                raise ValueError(f"expected ',' or ']' in the JSON array, found {char!r}")
+            position += 1
+            skip_whitespace()
+        first = False
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # a number or literal at the end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            chunk = file.read(chunk_size)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+        yield item
+        position = end
+
+def read_header(full_path: str, sample_records: int = 100) -> List[str]:
+    """The column names of a file.
+
+    CSV and TSV use the header row, Parquet its schema, and JSONL the keys of the first records.
+    """
+    file_format = record_format(full_path)
+    if file_format == "parquet":
+        return list(_parquet_file(full_path).schema_arrow.names)
+    if file_format == "jsonl":
+        columns = {}
+        for record in islice(iter_records(full_path), sample_records):
+            columns.update(dict.fromkeys(record))
+        return list(columns)
+    return list(csv_header(full_path)["columns"])
+
+def _checked(items: Iterator[Any]) -> Iterator[Any]:
+    """Passes items through, stopping a cancelled or timed out tool call every CANCEL_CHECK_INTERVAL items."""
+    for count, item in enumerate(items, 1):
+        if count % CANCEL_CHECK_INTERVAL == 0:
+            raise_if_cancelled()
+        yield item
+
+def iter_records(full_path: str, columns: Optional[List[str]] = None, batch_size: int = 10000) -> Iterator[Dict[str, Any]]:
+    """Streams the records of a CSV, TSV, JSONL or Parquet file as dictionaries, optionally gzip compressed.
+
+    A .json file may hold one object per line or a JSON array of objects, which is streamed item by item.
+
+    Args:
+        full_path: path to the file
+        columns: optional list of columns to keep. For Parquet, only these columns are read from disk.
+        batch_size: rows per Parquet record batch
+    """
+    return _checked(_iter_records(full_path, columns, batch_size))
+
+def _iter_records(full_path: str, columns: Optional[List[str]], batch_size: int) -> Iterator[Dict[str, Any]]:
+    file_format = record_format(full_path)
+    if file_format == "parquet":
+        # column projection, and one record batch in memory at a time
+        for batch in _parquet_file(full_path).iter_batches(batch_size=batch_size, columns=columns):
+            yield from batch.to_pylist()
+        return
+
+    if _is_json_array(full_path):
+        # a JSON array is not split by lines, so its items are decoded one at a time
+        with open_text(full_path) as file:
+            for record in _iter_json_array(file):
+                yield {k: record.get(k) for k in columns} if columns else record
+        return
+
+    with open_text(full_path) as file:
+        if file_format == "jsonl":
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield {k: record.get(k) for k in columns} if columns else record
+        elif file_format in ("csv", "tsv"):
+            header = csv_header(full_path)
+            # keyed by the registry's column names, which are stripped like the names plans refer to
+            reader = csv.DictReader(file, fieldnames=header["columns"], delimiter=header["delimiter"],
+                                    quotechar=header["quotechar"])
+            next(reader, None)
+            for record in reader:
+                yield {k: record.get(k) for k in columns} if columns else record
+        else:
+            raise ValueError(f"{full_path} is not a CSV, TSV, JSONL or Parquet file")
+
+def iter_lines(full_path: str) -> Iterator[str]:
+    """Streams a file as lines of text. Parquet rows and the items of JSON arrays are rendered as one JSON object per line."""
+    return _checked(_iter_lines(full_path))
+
+def _iter_lines(full_path: str) -> Iterator[str]:
+    if record_format(full_path) == "parquet" or _is_json_array(full_path):
+        for record in iter_records(full_path):
+            yield json.dumps(record, default=str) + "\n"
+        return
+    with open_text(full_path) as file:
+        for line in file:
+            yield line
+
+def head_records_as_csv(full_path: str, max_rows: int, columns: Optional[List[str]] = None) -> List[str]:
+    """The header and first records of any record file, rendered as CSV lines."""
+    header = columns or read_header(full_path)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    for record in islice(iter_records(full_path, columns=header), max_rows):
+        writer.writerow(["" if record.get(k) is None else record.get(k) for k in header])
+    return buffer.getvalue().splitlines(keepends=True)
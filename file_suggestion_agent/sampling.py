@@ -0,0 +1,133 @@
+import csv
+import os
+import random
+import re
+import zlib
+from typing import List, Tuple
+
+from async_tools import CANCEL_CHECK_INTERVAL, raise_if_cancelled
+
+# a markdown heading starts a new section
+_HEADING = re.compile(rb"^#{1,6} ")
+
+def _seed_for(full_path: str) -> int:
+    """A seed derived from path and size, so repeated calls return the same sample for the same file."""
+    return zlib.crc32(f"{full_path}:{os.path.getsize(full_path)}".encode("utf-8"))
+
+def spread_lines(full_path: str, head: int, random_lines: int) -> Tuple[List[str], List[str], int]:
+    """Reads the first lines of a file plus lines at random byte offsets after them.
+
+    Only the sampled lines are read: each random offset is a seek followed by reading
+    to the end of the current line and then the next, complete line. Longer lines are
+    slightly more likely to be skipped over, which is fine for a preview.
+
+    Returns:
+        the head lines, the sampled lines in file order, and an estimate of the total line count
+    """
+    size = os.path.getsize(full_path)
+    with open(full_path, "rb") as file:
+        head_lines = []
+        for _ in range(head):
+            line = file.readline()
+            if not line:
+                break
+            head_lines.append(line)
+        head_end = file.tell()
+        if head_end >= size:
+            return [l.decode("utf-8", "replace") for l in head_lines], [], len(head_lines)
+
+        rng = random.Random(_seed_for(full_path))
+        offsets = sorted(rng.randrange(head_end, size) for _ in range(random_lines))
+        sampled, last_end = [], head_end
+        for offset in offsets:
+            if offset < last_end:
+                continue
+            # land on the line start after the offset; if offset - 1 is a newline, that is offset itself
+            file.seek(offset - 1)
+            file.readline()
+            line = file.readline()
+            if not line:
+                break
+            last_end = file.tell()
+            sampled.append(line)
+
+    read_lines = head_lines + sampled
+    average_length = sum(len(l) for l in read_lines) / max(len(read_lines), 1)
+    estimated_lines = int(size / average_length) if average_length else len(read_lines)
+    return ([l.decode("utf-8", "replace") for l in head_lines],
+            [l.decode("utf-8", "replace") for l in sampled],
+            estimated_lines)
+
+def markdown_sections(full_path: str, max_sections: int, max_section_chars: int) -> Tuple[str, int]:
+    """Samples a markdown file by section: the preamble, the first section and a random spread of the rest.
+
+    Section start offsets are found in one streaming pass; only sampled sections are read back.
+
+    Returns:
+        the rendered sample and the total number of sections
+    """
+    starts = []
+    with open(full_path, "rb") as file:
+        offset = 0
+        for count, line in enumerate(file, 1):
+            if _HEADING.match(line):
+                starts.append(offset)
+            offset += len(line)
+            if count % CANCEL_CHECK_INTERVAL == 0:
+                raise_if_cancelled()
+        end = offset
+
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        bounds = list(zip(starts, starts[1:] + [end]))
+        # always keep the title/preamble and the first section, spread the rest
+        keep = list(range(min(2, len(bounds))))
+        rest = list(range(len(keep), len(bounds)))
+        rng = random.Random(_seed_for(full_path))
+        keep += sorted(rng.sample(rest, min(len(rest), max(max_sections - len(keep), 0))))
+
+        parts, previous = [], -1
+        for index in keep:
+            start, stop = bounds[index]
+            if index != previous + 1:
+                parts.append(f"[... {index - previous - 1} sections omitted ...]\n")
+            file.seek(start)
+            text = file.read(min(stop - start, max_section_chars * 4)).decode("utf-8", "replace")
+            if len(text) > max_section_chars or stop - start > max_section_chars * 4:
+                text = text[:max_section_chars].rstrip() + " [...]\n"
+            parts.append(text)
+            previous = index
+        if previous < len(bounds) - 1:
+            parts.append(f"[... {len(bounds) - previous - 1} sections omitted ...]\n")
+    return "".join(parts), len(bounds)
+
+def render_columnar(lines: List[str], max_value_chars: int = 40) -> str:
+    """Renders CSV lines (header first) column by column, so each column name appears once.
+
+    The i-th value of every column comes from the same sampled row.
+    """
+    rows = list(csv.reader(lines))
+    if not rows:
+        return ""
+    header, records = rows[0], rows[1:]
+    rendered = [f"columns ({len(header)}): {', '.join(header)}", f"sampled rows: {len(records)}"]
+    for i, name in enumerate(header):
+        values = []
+        for record in records:
+            value = record[i] if i < len(record) else ""
+            if len(value) > max_value_chars:
+                value = value[:max_value_chars] + "..."
+            values.append(value)
+        rendered.append(f"{name}: " + " | ".join(values))
+    return "\n".join(rendered) + "\n"
+
+def apply_byte_budget(content: str, max_bytes: int) -> str:
+    """Truncates content to at most max_bytes of UTF-8, at a line boundary when possible."""
+    encoded = content.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return content
+    truncated = encoded[:max_bytes].decode("utf-8", "ignore")
+    cut = truncated.rfind("\n")
+    if cut > max_bytes // 2:
+        truncated = truncated[:cut + 1]
+    return truncated + f"[... truncated to {max_bytes} bytes of {len(encoded)} ...]\n"
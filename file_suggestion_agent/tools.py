@@ -1,11 +1,16 @@
 from dotenv import load_dotenv
 from neo4j_for_adk import tool_success, tool_error, get_neo4j_import_dir
+from tool_budget import govern_tools
+from async_tools import offloaded
 from google.adk.tools.tool_context import ToolContext
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from itertools import islice
 from google.adk.tools import ToolContext
 from indent_agent.tools import approve_perceived_user_goal
+from file_suggestion_agent.catalog import get_file_catalog, detect_format
+from file_suggestion_agent.readers import STREAMED_FORMATS, record_format, iter_lines, head_records_as_csv
+from file_suggestion_agent.sampling import spread_lines, markdown_sections, render_columnar, apply_byte_budget
 
 load_dotenv()
 
@@ -14,40 +19,64 @@ load_dotenv()
 # this constant will be used as the key for storing the file list in the tool context state
 ALL_AVAILABLE_FILES = "all_available_files"
 
-def list_available_files(tool_context:ToolContext) -> dict:
-    f"""Lists files available for knowledge graph construction.
+def list_available_files(tool_context:ToolContext, pattern: str = "*", extensions: Optional[List[str]] = None,
+                         offset: int = 0, limit: int = 100) -> dict:
+    """Lists files available for knowledge graph construction, one page at a time.
     All files are relative to the import directory.
 
+    Args:
+      pattern: glob over the relative file path, for example "product_reviews/*.md". '*' also matches '/'.
+      extensions: optional formats or extensions to keep, for example ["csv", "md"]
+      offset: index of the first file to return, use 'next_offset' from the previous call for the next page
+      limit: maximum number of files to return
+
     Returns:
         dict: A dictionary containing metadata about the content.
                 Includes a 'status' key ('success' or 'error').
-                If 'success', includes a {ALL_AVAILABLE_FILES} key with list of file names.
+                If 'success', includes an 'all_available_files' key with a page of file names under 'files',
+                the 'total_files' matching, the 'next_offset' (None on the last page), and
+                a 'summary' of the matching files by format and top-level directory.
                 If 'error', includes an 'error_message' key.
                 The 'error_message' may have instructions about how to handle the error.
     """
-    # get the import dir using the helper function
-    import_dir = Path(get_neo4j_import_dir())
-
-    # get a list of relative file names, so files must be rooted at the import dir
-    file_names = [str(x.relative_to(import_dir)) 
-                 for x in import_dir.rglob("*") 
-                 if x.is_file()]
+    # the catalog only re-lists directories which changed since the last call
+    try:
+        catalog = get_file_catalog()
+        catalog.refresh()
+        listing = catalog.list_files(pattern, extensions, offset, limit)
+    except Exception as e:
+        return tool_error(f"Error listing files in the import directory: {e}")
 
-    # save the list to state so we can inspect it later
-    tool_context.state[ALL_AVAILABLE_FILES] = file_names
+    # save the page to state so we can inspect it later
+    tool_context.state[ALL_AVAILABLE_FILES] = listing["files"]
 
-    return tool_success(ALL_AVAILABLE_FILES, file_names)
+    return tool_success(ALL_AVAILABLE_FILES, listing)
 
 # Tool: Sample File
 # This is a simple file reading tool that only works on files from the import directory
-def sample_file(file_path: str, tool_context: ToolContext) -> dict:
-    """Samples a file by reading its content as text.
-    
-    Treats any file as text and reads up to a maximum of 100 lines.
-    
+SAMPLING_STRATEGIES = ["auto", "head", "spread", "sections", "columnar"]
+
+def sample_file(file_path: str, tool_context: ToolContext, strategy: str = "auto",
+                max_lines: int = 100, max_bytes: int = 8000) -> dict:
+    """Samples a file by reading part of its content as text.
+
+    Gzip compressed files (.csv.gz, .jsonl.gz) and Parquet files are read from the start as a stream;
+    for those, tabular data is rendered as columns and otherwise the first lines are returned.
+
+    Sampling strategies:
+    - "auto": picks "columnar" for CSV files, "sections" for markdown files, and "spread" otherwise
+    - "head": the first max_lines lines
+    - "spread": the first lines plus lines from random positions across the whole file,
+      which is less biased than the head for sorted files
+    - "sections": for markdown, the title, first section and a random spread of the other sections
+    - "columnar": for CSV, head and spread rows rendered column by column, so each column name appears once
+
     Args:
       file_path: file to sample, relative to the import directory
-      
+      strategy: one of "auto", "head", "spread", "sections" or "columnar"
+      max_lines: maximum number of lines (or rows, or sections) to sample
+      max_bytes: maximum size of the returned content
+
     Returns:
         dict: A dictionary containing metadata about the content,
             along with a sampling of the file.
@@ -59,6 +88,8 @@ def sample_file(file_path: str, tool_context: ToolContext) -> dict:
     # Trust, but verify. The agent may invent absolute file paths. 
     if Path(file_path).is_absolute():
         return tool_error("File path must be relative to the import directory. Make sure the file is from the list of available files.")
+    if strategy not in SAMPLING_STRATEGIES:
+        return tool_error(f"Unknown sampling strategy {strategy}. Use one of {SAMPLING_STRATEGIES}.")
     
     import_dir = Path(get_neo4j_import_dir())
 
@@ -68,14 +99,40 @@ def sample_file(file_path: str, tool_context: ToolContext) -> dict:
     # of course, _that_ may not exist
     if not full_path_to_file.exists():
         return tool_error(f"File does not exist in import directory. Make sure {file_path} is from the list of available files.")
-    
+
+    suffix = full_path_to_file.suffix.lower()
+    if strategy == "auto":
+        strategy = {".csv": "columnar", ".md": "sections", ".markdown": "sections"}.get(suffix, "spread")
+
     try:
-        # Treat all files as text
-        with open(full_path_to_file, 'r', encoding='utf-8') as file:
-            # Read up to 100 lines
-            lines = list(islice(file, 100))
-            content = ''.join(lines)
-            return tool_success("content", content)
+        full_path = str(full_path_to_file)
+        if detect_format(file_path) in STREAMED_FORMATS:
+            # compressed and columnar files are streamed from the start, never loaded whole
+            if record_format(full_path) in ("csv", "parquet") and strategy in ("columnar", "spread"):
+                content = f"[{detect_format(file_path)} file, first rows]\n"
+                content += render_columnar(head_records_as_csv(full_path, max_lines))
+            else:
+                content = ''.join(islice(iter_lines(full_path), max_lines))
+        elif strategy == "head":
+            # Treat all files as text
+            with open(full_path_to_file, 'r', encoding='utf-8') as file:
+                content = ''.join(islice(file, max_lines))
+        elif strategy == "sections":
+            content, total_sections = markdown_sections(full_path, max_sections=min(max_lines, 6),
+                                                        max_section_chars=max_bytes // 6)
+            content = f"[markdown with {total_sections} sections]\n" + content
+        else:
+            head_count = max(2, max_lines // 5)
+            head, spread, estimated_lines = spread_lines(full_path, head_count, max_lines - head_count)
+            if strategy == "columnar":
+                content = f"[~{estimated_lines} lines, first {len(head) - 1} rows and {len(spread)} rows from across the file]\n"
+                content += render_columnar(head + spread)
+            else:
+                content = ''.join(head)
+                if spread:
+                    content += f"[... {len(spread)} lines sampled from across ~{estimated_lines} lines ...]\n"
+                    content += ''.join(spread)
+        return tool_success("content", apply_byte_budget(content, max_bytes))
     
     except Exception as e:
         return tool_error(f"Error reading or processing file {file_path}: {e}")
@@ -128,7 +185,7 @@ def approve_suggested_files(tool_context:ToolContext) -> Dict[str, Any]:
     tool_context.state[APPROVED_FILES] = tool_context.state[SUGGESTED_FILES]
     
 # List of tools for the file suggestion agent
-file_suggestion_agent_tools = [approve_perceived_user_goal, list_available_files, sample_file, 
+file_suggestion_agent_tools = govern_tools([approve_perceived_user_goal, offloaded(list_available_files), offloaded(sample_file), 
     set_suggested_files, get_suggested_files,
     approve_suggested_files
-]
\ No newline at end of file
+])
\ No newline at end of file
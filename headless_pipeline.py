@@ -0,0 +1,251 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from google.genai import types
+
+from neo4j_for_adk import get_neo4j_import_dir
+from session_service import get_session_service, get_runner, PIPELINE_APP_NAME, PIPELINE_USER_ID
+from knowledge_graph.tools import iter_construct_domain_graph
+from indent_agent.tools import APPROVED_USER_GOAL
+from file_suggestion_agent.tools import APPROVED_FILES
+from structured_data_agents.tools import APPROVED_CONSTRUCTION_PLAN
+from structured_data_agents.validation import validate_construction_plan
+from structured_data_agents.plan_registry import get_plan_registry
+
+# the stages in pipeline order, each producing one approved state key
+STAGES = [APPROVED_USER_GOAL, APPROVED_FILES, APPROVED_CONSTRUCTION_PLAN]
+
+# what the agent of a stage is told when the config leaves the stage out. The user intent
+# stage starts from the config's 'user_goal' instead, as the goal can not be guessed.
+DEFAULT_STAGE_MESSAGES = {
+    APPROVED_USER_GOAL: ["Approve that goal."],
+    APPROVED_FILES: ["What files can we use for import?", "Yes, approve those files."],
+    APPROVED_CONSTRUCTION_PLAN: ["How can these files be imported?", "Yes, let's do it!"],
+}
+
+REQUIRED_RULE_KEYS = {
+    "node": ["source_file", "label", "unique_column_name", "properties"],
+    "relationship": ["source_file", "relationship_type", "from_node_label", "from_node_column",
+                     "to_node_label", "to_node_column", "properties"],
+}
+
+
+def load_config(config_path: str) -> Dict[str, Any]:
+    """Loads a pipeline config from a YAML (.yaml, .yml) or JSON file."""
+    with open(config_path, encoding="utf-8") as file:
+        if Path(config_path).suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("Reading YAML configs requires PyYAML. Install it with 'pip install pyyaml'.") from e
+            config = yaml.safe_load(file)
+        else:
+            config = json.load(file)
+    if not isinstance(config, dict):
+        raise ValueError(f"The config {config_path} must be a mapping of stage names to values.")
+    return config
+
+
+def validate_user_goal(goal: Any) -> List[str]:
+    if not isinstance(goal, dict) or not str(goal.get("kind_of_graph") or "").strip():
+        return [f"{APPROVED_USER_GOAL} must have a 'kind_of_graph'."]
+    if not str(goal.get("description") or goal.get("graph_description") or "").strip():
+        return [f"{APPROVED_USER_GOAL} must have a 'description'."]
+    return []
+
+
+def validate_files(files: Any) -> List[str]:
+    if not isinstance(files, list) or not files or not all(isinstance(f, str) and f for f in files):
+        return [f"{APPROVED_FILES} must be a non-empty list of file paths."]
+    import_dir = Path(get_neo4j_import_dir())
+    problems = []
+    for file_path in files:
+        if Path(file_path).is_absolute():
+            problems.append(f"File {file_path} must be relative to the import directory.")
+        elif not (import_dir / file_path).is_file():
+            problems.append(f"File {file_path} does not exist in the import directory {import_dir}.")
+    duplicates = sorted({f for f in files if files.count(f) > 1})
+    if duplicates:
+        problems.append(f"Files are listed more than once: {', '.join(duplicates)}.")
+    return problems
+
+
+def validate_plan(plan: Any, files: Optional[List[str]]) -> List[str]:
+    if not isinstance(plan, dict) or not plan:
+        return [f"{APPROVED_CONSTRUCTION_PLAN} must be a non-empty mapping of construction rules."]
+    problems = []
+    for key, rule in plan.items():
+        construction_type = rule.get("construction_type") if isinstance(rule, dict) else None
+        if construction_type not in REQUIRED_RULE_KEYS:
+            problems.append(f"Construction rule {key} must have a 'construction_type' of 'node' or 'relationship'.")
+            continue
+        missing = [name for name in REQUIRED_RULE_KEYS[construction_type] if name not in rule]
+        if missing:
+            problems.append(f"Construction rule {key} is missing {', '.join(missing)}.")
+        elif files is not None and rule["source_file"] not in files:
+            problems.append(f"Construction rule {key} reads {rule['source_file']}, which is not an approved file.")
+    # the structural checks need complete rules
+    return problems or validate_construction_plan(plan)
+
+
+def validate_config(config: Dict[str, Any]) -> List[str]:
+    """Validates the stages a config provides with the deterministic validators. Missing stages are not errors.
+
+    Returns:
+        List[str]: a description of each problem, empty if the provided stages are valid
+    """
+    problems = []
+    if APPROVED_USER_GOAL in config:
+        problems += validate_user_goal(config[APPROVED_USER_GOAL])
+    elif not str(config.get("user_goal") or "").strip():
+        problems.append(f"The config needs either {APPROVED_USER_GOAL} or a 'user_goal' to describe it to the agent.")
+    if APPROVED_FILES in config:
+        problems += validate_files(config[APPROVED_FILES])
+    if APPROVED_CONSTRUCTION_PLAN in config:
+        files = config.get(APPROVED_FILES) if isinstance(config.get(APPROVED_FILES), list) else None
+        problems += validate_plan(config[APPROVED_CONSTRUCTION_PLAN], files)
+    return problems
+
+
+def stage_agent(stage: str):
+    """The agent which produces a stage, imported only when a stage needs it."""
+    if stage == APPROVED_USER_GOAL:
+        from indent_agent.agent import user_intent_agent
+        return user_intent_agent
+    if stage == APPROVED_FILES:
+        from file_suggestion_agent.agent import file_suggestion_agent
+        return file_suggestion_agent
+    from structured_data_agents.agent import schema_proposal_coordinator
+    return schema_proposal_coordinator
+
+
+def report(event: Dict[str, Any]) -> None:
+    """Prints a progress event as one line."""
+    if event["kind"] == "construct":
+        line = (f"[construct {event['step']}/{event['total_steps']}] {event['construction_type']} {event['name']}: "
+                f"{event['status']} in {event['duration_s']}s")
+        if event.get("error_message"):
+            line += f" ({event['error_message']})"
+    elif event["kind"] == "agent":
+        line = f"[{event['stage']}] {event['author']}: {event['text']}"
+    else:
+        line = f"[{event.get('stage', event['kind'])}] {event['message']}"
+    print(line, flush=True)
+
+
+async def run_agent_stage(stage: str, config: Dict[str, Any], session_id: str, user_id: str,
+                          on_progress: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Runs the agent of a stage in the pipeline session, and returns the session state afterwards."""
+    custom_messages = config.get("messages", {}).get(stage)
+    messages = custom_messages or DEFAULT_STAGE_MESSAGES[stage]
+    if stage == APPROVED_USER_GOAL and not custom_messages:
+        messages = [config["user_goal"]] + messages
+    runner = get_runner(stage_agent(stage))
+    for message in messages:
+        on_progress({"kind": "stage", "stage": stage, "message": f"user: {message}"})
+        content = types.Content(role="user", parts=[types.Part(text=message)])
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=content):
+            if event.is_final_response() and event.content and event.content.parts:
+                text = "".join(part.text or "" for part in event.content.parts).strip()
+                if text:
+                    on_progress({"kind": "agent", "stage": stage, "author": event.author, "text": text})
+    session = await get_session_service().get_session(app_name=PIPELINE_APP_NAME, user_id=user_id, session_id=session_id)
+    return session.state
+
+
+async def prepare_state(config: Dict[str, Any], on_progress: Callable[[Dict[str, Any]], None] = report,
+                        user_id: str = PIPELINE_USER_ID) -> Dict[str, Any]:
+    """Fills in the stages the config leaves out, calling agents only for those.
+
+    A missing construction plan is first looked up in the plan registry, so a plan approved
+    earlier for the same goal and files is reused without calling the agents.
+
+    Returns:
+        Dict[str, Any]: 'state' with the approved stages, 'agent_stages' with the stages the agents ran
+            and 'problems', empty if every stage is present and valid
+    """
+    problems = validate_config(config)
+    if problems:
+        return {"state": {}, "agent_stages": [], "problems": problems}
+
+    state = {stage: config[stage] for stage in STAGES if stage in config}
+    for stage in state:
+        on_progress({"kind": "stage", "stage": stage, "message": "provided by the config"})
+    missing = [stage for stage in STAGES if stage not in state]
+    if APPROVED_CONSTRUCTION_PLAN in missing and APPROVED_FILES in state and APPROVED_USER_GOAL in state:
+        try:
+            cached = get_plan_registry().lookup(state[APPROVED_USER_GOAL], state[APPROVED_FILES])
+        except Exception as e:
+            # the registry is a cache, so without it the plan is made by the agent
+            on_progress({"kind": "stage", "stage": APPROVED_CONSTRUCTION_PLAN,
+                         "message": f"plan registry unavailable: {e}"})
+            cached = None
+        if cached is not None:
+            state[APPROVED_CONSTRUCTION_PLAN] = cached["construction_plan"]
+            missing.remove(APPROVED_CONSTRUCTION_PLAN)
+            on_progress({"kind": "stage", "stage": APPROVED_CONSTRUCTION_PLAN,
+                         "message": f"using version {cached['version']} from the plan registry"})
+
+    agent_stages = []
+    if missing:
+        session = await get_session_service().create_session(
+            app_name=PIPELINE_APP_NAME, user_id=user_id, state=dict(state, feedback=""))
+        for stage in missing:
+            on_progress({"kind": "stage", "stage": stage, "message": "running the agent"})
+            try:
+                session_state = await run_agent_stage(stage, config, session.id, user_id, on_progress)
+            except Exception as e:
+                return {"state": state, "agent_stages": agent_stages,
+                        "problems": [f"The agent of {stage} failed: {type(e).__name__}: {e}"]}
+            agent_stages.append(stage)
+            if session_state.get(stage) is None:
+                return {"state": state, "agent_stages": agent_stages,
+                        "problems": [f"The agent did not approve {stage}. Add it to the config or adjust the messages."]}
+            state[stage] = session_state[stage]
+
+    # stages from agents are held to the same checks as stages from the config
+    problems = validate_config(state)
+    return {"state": state, "agent_stages": agent_stages, "problems": problems}
+
+
+async def run_pipeline(config: Dict[str, Any], construct: bool = True,
+                       on_progress: Callable[[Dict[str, Any]], None] = report) -> Dict[str, Any]:
+    """Runs the pipeline without user interaction: validates the config, fills in missing stages
+    with the agents, and constructs the domain graph from the approved construction plan.
+
+    Returns:
+        Dict[str, Any]: the 'status' ('success' or 'error'), the 'problems', the 'agent_stages' which were run,
+            the approved 'state' and the 'construction_steps'
+    """
+    prepared = await prepare_state(config, on_progress)
+    result = dict(prepared, status="error" if prepared["problems"] else "success", construction_steps=[])
+    if prepared["problems"]:
+        for problem in prepared["problems"]:
+            on_progress({"kind": "validate", "message": problem})
+        return result
+    on_progress({"kind": "validate", "message": "the approved stages are valid"})
+    if not construct:
+        return result
+
+    for step in iter_construct_domain_graph(prepared["state"][APPROVED_CONSTRUCTION_PLAN]):
+        result["construction_steps"].append(step)
+        on_progress(dict(step, kind="construct"))
+        if step["status"] == "error":
+            # later steps depend on the earlier ones, relationships on their nodes
+            result["status"] = "error"
+            break
+    return result
+
+
+def main(argv: List[str]) -> int:
+    # usage: python headless_pipeline.py config.yaml [--validate-only]
+    config = load_config(argv[0])
+    result = asyncio.run(run_pipeline(config, construct="--validate-only" not in argv[1:]))
+    return 0 if result["status"] == "success" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,11 +1,11 @@
 from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
+from llm_cache import CachingLiteLlm
 from dotenv import load_dotenv
 from indent_agent.tools import user_intent_agent_tools
 
 load_dotenv()
 
-llm = LiteLlm(model="gemini/gemini-2.5-flash")
+llm = CachingLiteLlm(model="gemini/gemini-2.5-flash")
 
 prompt_indent_agent = """
     You are an expert at knowledge graph use cases. 
@@ -26,6 +26,8 @@ async def main():
 
 if __name__ == "__main__":
     session_end = asyncio.run(main())
-    asyncio.run(session_end.get_session())
+    session = asyncio.run(session_end.get_session())
+    # the next stage continues this session, with the approved user goal in its state
+    print(f"Continue with: python -m file_suggestion_agent.call {session.id}")
     
 
@@ -1,5 +1,6 @@
 from google.adk.tools import ToolContext
 from neo4j_for_adk import tool_success, tool_error
+from tool_budget import govern_tools
 
 PERCEIVED_USER_GOAL = "perceived_user_goal"
 
@@ -36,4 +37,4 @@ def approve_perceived_user_goal(tool_context: ToolContext):
 
     return tool_success(APPROVED_USER_GOAL, tool_context.state[APPROVED_USER_GOAL])
 
-user_intent_agent_tools = [set_perceived_user_goal, approve_perceived_user_goal]
\ No newline at end of file
+user_intent_agent_tools = govern_tools([set_perceived_user_goal, approve_perceived_user_goal])
\ No newline at end of file
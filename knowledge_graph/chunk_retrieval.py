@@ -0,0 +1,285 @@
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from google.adk.tools.tool_context import ToolContext
+
+from neo4j_for_adk import graphdb, tool_success, tool_error
+from knowledge_graph.provenance import chunk_key, content_hash
+
+CHUNK_VECTOR_INDEX = "chunk_embedding"
+RETRIEVED_CHUNKS = "retrieved_chunks"
+
+_embedder = None
+_database_available = False
+# when the last failed connectivity check ran, None before the first check
+_database_checked_at: Optional[float] = None
+# seconds before a failed connectivity check is retried, so a database which is still starting is picked up
+DATABASE_RECHECK_S = 30.0
+# dimensions of the vector index created by this process, so it is only created once
+_vector_index_dimensions = None
+
+def get_embedder():
+    """Gets the embedder used for chunks and queries, defaulting to the one configured in helper.py."""
+    global _embedder
+    if _embedder is None:
+        from knowledge_graph.helper import embedder
+        _embedder = embedder
+    return _embedder
+
+def set_embedder(embedder) -> None:
+    """Overrides the embedder, for example with a local model when running offline."""
+    global _embedder
+    _embedder = embedder
+
+def database_available() -> bool:
+    """Checks whether Neo4j can be reached. Without it, chunks are kept in the offline index.
+
+    A successful check is kept for the life of the process, a failed one for DATABASE_RECHECK_S seconds.
+    """
+    global _database_available, _database_checked_at
+    if _database_available:
+        return True
+    now = time.monotonic()
+    if _database_checked_at is None or now - _database_checked_at >= DATABASE_RECHECK_S:
+        try:
+            graphdb.get_driver().verify_connectivity()
+            _database_available = True
+        except Exception:
+            _database_checked_at = now
+    return _database_available
+
+
+class InMemoryChunkIndex:
+    """Exact cosine similarity search over chunk embeddings with NumPy.
+
+    Used as a fallback when no database is available. Embeddings are kept
+    L2-normalized in a single matrix, so a search is one matrix-vector product.
+    """
+    def __init__(self):
+        self.chunks: List[Dict[str, Any]] = []
+        self.positions: Dict[str, int] = {}
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def add(self, chunks: List[Dict[str, Any]]) -> None:
+        """Adds or replaces chunks, each a dictionary with 'id', 'text', 'document_path' and 'embedding' keys."""
+        if not chunks:
+            return
+        vectors = np.asarray([chunk["embedding"] for chunk in chunks], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        if len(self.chunks) == 0:
+            self.matrix = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+
+        new_rows = []
+        for chunk, vector in zip(chunks, vectors):
+            entry = {k: v for k, v in chunk.items() if k != "embedding"}
+            if chunk["id"] in self.positions:
+                position = self.positions[chunk["id"]]
+                self.chunks[position] = entry
+                self.matrix[position] = vector
+            else:
+                self.positions[chunk["id"]] = len(self.chunks) + len(new_rows)
+                new_rows.append((entry, vector))
+        if new_rows:
+            self.chunks.extend(entry for entry, _ in new_rows)
+            self.matrix = np.vstack([self.matrix, np.stack([vector for _, vector in new_rows])])
+
+    def remove(self, chunk_ids: List[str]) -> None:
+        """Removes chunks by id."""
+        drop = {self.positions[chunk_id] for chunk_id in chunk_ids if chunk_id in self.positions}
+        if not drop:
+            return
+        keep = [position for position in range(len(self.chunks)) if position not in drop]
+        self.chunks = [self.chunks[position] for position in keep]
+        self.matrix = self.matrix[keep]
+        self.positions = {chunk["id"]: position for position, chunk in enumerate(self.chunks)}
+
+    def search(self, embedding: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """Returns the top_k most similar chunks with a cosine 'score'."""
+        if len(self.chunks) == 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+        scores = self.matrix @ query
+        top_k = min(top_k, len(scores))
+        # argpartition is O(n), only the top_k winners get sorted
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [dict(self.chunks[i], score=float(scores[i])) for i in best]
+
+# used when no database is available
+offline_chunk_index = InMemoryChunkIndex()
+
+
+def create_chunk_vector_index(dimensions: int, similarity_function: str = "cosine") -> Dict[str, Any]:
+    """Creates the vector index over Chunk embeddings, if it does not already exist.
+
+    Args:
+        dimensions: the size of the embedding vectors
+        similarity_function: 'cosine' or 'euclidean'
+
+    Returns:
+        A dictionary with a status key ('success' or 'error').
+        On error, includes an 'error_message' key.
+    """
+    # index options cannot be parameterized, so make sure they are what we expect
+    if similarity_function not in ("cosine", "euclidean"):
+        return tool_error(f"Unsupported similarity function {similarity_function}. Use 'cosine' or 'euclidean'.")
+    query = f"""CREATE VECTOR INDEX `{CHUNK_VECTOR_INDEX}` IF NOT EXISTS
+    FOR (c:Chunk) ON c.embedding
+    OPTIONS {{ indexConfig: {{
+        `vector.dimensions`: {int(dimensions)},
+        `vector.similarity_function`: '{similarity_function}'
+    }} }}"""
+    return graphdb.send_query(query)
+
+def write_chunks(document_path: str, chunks: List[Dict[str, Any]], title: Optional[str] = None,
+                 batch_size: int = 500) -> Dict[str, Any]:
+    """Writes a document and its chunks as a lexical graph.
+
+    Each chunk becomes a Chunk node connected to its Document with FROM_DOCUMENT,
+    and consecutive chunks are connected with NEXT_CHUNK. The chunk vector index is
+    created first, with the dimensions of the embeddings, if it does not exist yet.
+
+    Args:
+        document_path: path of the source document, used as the Document key
+        chunks: dictionaries with 'id', 'index', 'text' and 'embedding' keys, in document order,
+            and optionally the content 'hash' used for incremental updates
+        title: optional document title
+        batch_size: number of chunks per UNWIND statement
+
+    Returns:
+        A dictionary with a status key ('success' or 'error').
+        On success, includes a 'chunks_written' key with the number of chunks.
+    """
+    global _vector_index_dimensions
+    rows = [dict(chunk, document_path=document_path) for chunk in chunks]
+    if not database_available():
+        offline_chunk_index.add(rows)
+        return tool_success("chunks_written", len(rows))
+
+    if rows and _vector_index_dimensions != len(rows[0]["embedding"]):
+        # find_supporting_chunks queries this index, so it must exist before chunks are searched
+        results = create_chunk_vector_index(len(rows[0]["embedding"]))
+        if results["status"] == "error":
+            return results
+        _vector_index_dimensions = len(rows[0]["embedding"])
+
+    results = graphdb.send_query(
+        "MERGE (d:Document {path: $path}) SET d.title = coalesce($title, d.title)",
+        {"path": document_path, "title": title}
+    )
+    if results["status"] == "error":
+        return results
+
+    chunk_query = """UNWIND $rows AS row
+    MERGE (c:Chunk {id: row.id})
+    SET c.index = row.index, c.text = row.text, c.hash = row.hash
+    WITH c, row
+    CALL db.create.setNodeVectorProperty(c, 'embedding', row.embedding)
+    WITH c, row
+    MATCH (d:Document {path: row.document_path})
+    MERGE (c)-[:FROM_DOCUMENT]->(d)
+    """
+    for start in range(0, len(rows), batch_size):
+        results = graphdb.send_query(chunk_query, {"rows": rows[start:start + batch_size]})
+        if results["status"] == "error":
+            return results
+
+    # link consecutive chunks, including across batch boundaries
+    ordered = sorted(rows, key=lambda row: row["index"])
+    pairs = [{"from_id": a["id"], "to_id": b["id"]} for a, b in zip(ordered, ordered[1:])]
+    next_query = """UNWIND $pairs AS pair
+    MATCH (a:Chunk {id: pair.from_id}), (b:Chunk {id: pair.to_id})
+    MERGE (a)-[:NEXT_CHUNK]->(b)
+    """
+    for start in range(0, len(pairs), batch_size):
+        results = graphdb.send_query(next_query, {"pairs": pairs[start:start + batch_size]})
+        if results["status"] == "error":
+            return results
+    return tool_success("chunks_written", len(rows))
+
+def embed_and_write_chunks(document_path: str, texts: List[str], title: Optional[str] = None) -> Dict[str, Any]:
+    """Embeds chunk texts with the configured embedder and writes them as a lexical graph."""
+    embedder = get_embedder()
+    chunks = [{
+        "id": chunk_key(document_path, index, text),
+        "hash": content_hash(text),
+        "index": index,
+        "text": text,
+        "embedding": embedder.embed_query(text),
+    } for index, text in enumerate(texts)]
+    return write_chunks(document_path, chunks, title)
+
+
+# Tool: Find Review Passages
+def find_supporting_chunks(query: str, top_k: int = 5, include_products: bool = True) -> dict:
+    """Finds text passages similar to the query using the chunk vector index.
+
+    Args:
+      query: natural language description of what the passages should be about
+      top_k: the number of passages to return
+      include_products: also return the Product nodes mentioned by each passage
+
+    Returns:
+        dict: A dictionary with 'status' ('success' or 'error').
+              If 'success', includes 'retrieved_chunks', a list of dictionaries
+              with 'text', 'document_path', 'score' and, if requested, 'products' keys.
+              If 'error', includes an 'error_message'.
+    """
+    try:
+        embedding = get_embedder().embed_query(query)
+    except Exception as e:
+        return tool_error(f"Could not embed the query: {e}")
+
+    if not database_available():
+        # graph expansion needs the database, so offline results only have the passages
+        return tool_success(RETRIEVED_CHUNKS, offline_chunk_index.search(embedding, top_k))
+
+    expansion = """
+    CALL (node) {
+        OPTIONAL MATCH (node)<-[:FROM_CHUNK]-()-[:MENTIONS]->(product:Product)
+        RETURN collect(DISTINCT product { .product_id, .product_name }) AS products
+    }""" if include_products else """
+    WITH node, score, document, [] AS products"""
+    results = graphdb.send_query(f"""
+    CALL db.index.vector.queryNodes($index_name, $top_k, $embedding) YIELD node, score
+    OPTIONAL MATCH (node)-[:FROM_DOCUMENT]->(document:Document)
+    WITH node, score, document
+    {expansion}
+    RETURN node.text AS text, document.path AS document_path, score, products
+    ORDER BY score DESC""", {
+        "index_name": CHUNK_VECTOR_INDEX,
+        "top_k": top_k,
+        "embedding": embedding,
+    })
+    if results["status"] == "error":
+        return results
+    chunks = results["query_result"]
+    if not include_products:
+        for chunk in chunks:
+            chunk.pop("products", None)
+    return tool_success(RETRIEVED_CHUNKS, chunks)
+
+def find_review_passages(query: str, tool_context: ToolContext, top_k: int = 5, include_products: bool = True) -> dict:
+    """Finds review passages that support or illustrate the query, instead of re-reading whole files.
+
+    Args:
+      query: natural language description of what the passages should be about, for example "wobbly desk legs"
+      top_k: the number of passages to return
+      include_products: also return the Product nodes mentioned by each passage
+
+    Returns:
+        dict: A dictionary with 'status' ('success' or 'error').
+              If 'success', includes 'retrieved_chunks', a list of dictionaries
+              with 'text', 'document_path', 'score' and, if requested, 'products' keys.
+              If 'error', includes an 'error_message'.
+    """
+    results = find_supporting_chunks(query, top_k, include_products)
+    if results["status"] == "success":
+        tool_context.state[RETRIEVED_CHUNKS] = results[RETRIEVED_CHUNKS]
+    return results
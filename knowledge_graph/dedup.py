@@ -0,0 +1,172 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from neo4j_graphrag.experimental.components.text_splitters.base import TextSplitter
+from neo4j_graphrag.experimental.components.types import TextChunk, TextChunks
+
+from neo4j_for_adk import graphdb, tool_success
+
+# a prime just below 2**32, so (a * x + b) fits in 64 bits for 32-bit a, b and x
+_MINHASH_PRIME = np.uint64(4294967291)
+
+
+class MinHasher:
+    """Computes MinHash signatures of texts from character shingles."""
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, int(_MINHASH_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(_MINHASH_PRIME), size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """32-bit hashes of the character shingles of whitespace and case normalized text."""
+        normalized = re.sub(r"\s+", " ", text.lower()).strip()
+        k = self.shingle_size
+        if len(normalized) <= k:
+            grams = {normalized}
+        else:
+            grams = {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> np.ndarray:
+        """The MinHash signature, one minimum per permutation."""
+        hashes = self.shingles(text)
+        permuted = (np.outer(hashes, self.a) + self.b) % _MINHASH_PRIME
+        return permuted.min(axis=0)
+
+
+class LSHIndex:
+    """Locality sensitive hashing over MinHash signatures using the banding technique.
+
+    Signatures are cut into bands; two signatures become candidates when any
+    band is identical, so lookups never compare against the whole corpus.
+    """
+    def __init__(self, num_perm: int = 128, bands: int = 16):
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+        self.signatures: Dict[str, np.ndarray] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def insert(self, key: str, signature: np.ndarray) -> None:
+        self.signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self.buckets[band][band_key].append(key)
+
+    def query(self, signature: np.ndarray, threshold: float) -> Optional[str]:
+        """Returns the most similar indexed key with estimated Jaccard similarity >= threshold, if any."""
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self.buckets[band].get(band_key, ()))
+        best_key, best_similarity = None, threshold
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+
+class DeduplicatingTextSplitter(TextSplitter):
+    """Wraps a text splitter and drops chunks that are near-duplicates of chunks already seen.
+
+    Only one representative of each group of near-identical chunks is passed on to
+    entity extraction. The index persists across documents, so a review reposted in
+    another file is also recognized. Use `write_duplicate_provenance` after each document
+    has been processed to link the extracted entities to every duplicate as well.
+    """
+    def __init__(self, splitter: TextSplitter, threshold: float = 0.8, num_perm: int = 128,
+                 bands: int = 16, shingle_size: int = 5):
+        self.splitter = splitter
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.index = LSHIndex(num_perm=num_perm, bands=bands)
+        # duplicates found since the last call to write_duplicate_provenance
+        self.pending_duplicates: List[Dict[str, Any]] = []
+        self.chunks_seen = 0
+        self.duplicates_found = 0
+
+    async def run(self, text: str) -> TextChunks:
+        """Splits text with the wrapped splitter, returning only the representative chunks.
+
+        Args:
+            text (str): The text to be split.
+
+        Returns:
+            TextChunks: The chunks which are not near-duplicates of earlier chunks.
+        """
+        split = await self.splitter.run(text)
+        representatives = []
+        for chunk in split.chunks:
+            self.chunks_seen += 1
+            signature = self.hasher.signature(chunk.text)
+            representative_id = self.index.query(signature, self.threshold)
+            if representative_id is None:
+                self.index.insert(chunk.chunk_id, signature)
+                representatives.append(chunk)
+            else:
+                self.duplicates_found += 1
+                self.pending_duplicates.append({
+                    "id": chunk.chunk_id,
+                    "index": chunk.index,
+                    "text": chunk.text,
+                    "representative_id": representative_id,
+                })
+        # keep indexes contiguous, since NEXT_CHUNK relationships are built from the returned order.
+        # the chunk id is stored as a property so duplicates can find their representative later
+        return TextChunks(chunks=[
+            TextChunk(text=chunk.text, index=i, metadata={**(chunk.metadata or {}), "id": chunk.chunk_id},
+                      uid=chunk.uid)
+            for i, chunk in enumerate(representatives)
+        ])
+
+    def report(self) -> Dict[str, Any]:
+        """Summarizes how many chunks were collapsed, which equals the extraction calls saved."""
+        return {
+            "chunks_seen": self.chunks_seen,
+            "chunks_extracted": self.chunks_seen - self.duplicates_found,
+            "llm_calls_saved": self.duplicates_found,
+        }
+
+    def write_duplicate_provenance(self, document_path: str) -> Dict[str, Any]:
+        """Writes the pending duplicate chunks of a document and fans out the entities of their representatives.
+
+        Each duplicate becomes a Chunk node connected to the document with FROM_DOCUMENT and to its
+        representative with DUPLICATE_OF. Every entity extracted from the representative also gets a
+        FROM_CHUNK relationship to the duplicate, so provenance is the same as if it had been extracted.
+
+        Args:
+            document_path: path of the document that was just processed
+
+        Returns:
+            A dictionary with a status key ('success' or 'error').
+            On success, includes a 'duplicates_written' key with the number of duplicate chunks.
+        """
+        duplicates, self.pending_duplicates = self.pending_duplicates, []
+        if not duplicates:
+            return tool_success("duplicates_written", 0)
+        results = graphdb.send_query("""UNWIND $duplicates AS duplicate
+        MATCH (representative:Chunk {id: duplicate.representative_id})
+        MATCH (document:Document {path: $document_path})
+        MERGE (chunk:Chunk {id: duplicate.id})
+        SET chunk.text = duplicate.text, chunk.index = duplicate.index
+        MERGE (chunk)-[:FROM_DOCUMENT]->(document)
+        MERGE (chunk)-[:DUPLICATE_OF]->(representative)
+        WITH representative, chunk
+        CALL (representative, chunk) {
+            MATCH (entity)-[:FROM_CHUNK]->(representative)
+            MERGE (entity)-[:FROM_CHUNK]->(chunk)
+        }
+        """, {"duplicates": duplicates, "document_path": document_path})
+        if results["status"] == "error":
+            # keep them around so the write can be retried
+            self.pending_duplicates = duplicates + self.pending_duplicates
+            return results
+        return tool_success("duplicates_written", len(duplicates))
@@ -0,0 +1,215 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from neo4j_for_adk import graphdb, tool_success, tool_error
+
+# property holding the human readable name for each domain label loaded from CSV
+DEFAULT_NAME_PROPERTIES = {
+    "Product": "product_name",
+    "Part": "part_name",
+    "Supplier": "name",
+}
+
+# words that carry no identity, e.g. "the Malmo" should block with "Malmö Desk"
+STOP_WORDS = {"the", "a", "an", "my", "our", "this", "that"}
+
+def normalize_name(name: str) -> str:
+    """Normalizes a name for matching: strips accents, case, punctuation and stop words.
+
+    Args:
+        name (str): The raw name, for example "Malmö Desk"
+
+    Returns:
+        str: The normalized name, for example "malmo desk"
+    """
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    tokens = re.findall(r"[a-z0-9]+", ascii_name.lower())
+    return " ".join(token for token in tokens if token not in STOP_WORDS)
+
+def blocking_keys(normalized_name: str, n: int = 3) -> set:
+    """Character n-grams of every token in a normalized name, used as blocking keys.
+
+    Tokens shorter than n are used as-is so that short names still get a key.
+    """
+    keys = set()
+    for token in normalized_name.split():
+        if len(token) < n:
+            keys.add(token)
+            continue
+        for i in range(len(token) - n + 1):
+            keys.add(token[i:i + n])
+    return keys
+
+
+class EntityResolver:
+    """Links free-text mentions to domain graph nodes using a blocking index and RapidFuzz.
+
+    Domain names are indexed once by character n-grams. Each mention only gets
+    compared with nodes that share enough n-grams with it, and all comparisons
+    of a batch are scored in a single `rapidfuzz.process.cdist` call.
+    """
+    def __init__(self, nodes: List[Dict[str, Any]], ngram: int = 3, min_shared_keys: int = 2,
+                 max_candidates: int = 50):
+        """
+        Args:
+            nodes: dictionaries with 'id', 'label' and 'name' keys
+            ngram: length of the character n-grams used for blocking
+            min_shared_keys: a node is a candidate if it shares at least this many keys with a mention
+            max_candidates: upper bound of candidates kept per mention, by number of shared keys
+        """
+        self.ngram = ngram
+        self.min_shared_keys = min_shared_keys
+        self.max_candidates = max_candidates
+        self.nodes = [node for node in nodes if node.get("name")]
+        self.normalized_names = [normalize_name(node["name"]) for node in self.nodes]
+        self.index = defaultdict(list)
+        for position, normalized in enumerate(self.normalized_names):
+            for key in blocking_keys(normalized, ngram):
+                self.index[key].append(position)
+
+    @classmethod
+    def from_graph(cls, name_properties: Optional[Dict[str, str]] = None, **kwargs) -> "EntityResolver":
+        """Builds a resolver over the domain nodes currently stored in Neo4j.
+
+        Args:
+            name_properties: mapping of node label to the property holding its name.
+                Defaults to the Product, Part and Supplier labels loaded from CSV.
+        """
+        name_properties = name_properties or DEFAULT_NAME_PROPERTIES
+        nodes = []
+        for label, name_property in name_properties.items():
+            results = graphdb.send_query(
+                """MATCH (n:$($label)) WHERE n[$name_property] IS NOT NULL
+                RETURN elementId(n) AS id, $label AS label, n[$name_property] AS name""",
+                {"label": label, "name_property": name_property}
+            )
+            if results["status"] == "error":
+                raise RuntimeError(results["error_message"])
+            nodes.extend(results["query_result"])
+        return cls(nodes, **kwargs)
+
+    def candidates(self, normalized_mention: str) -> List[int]:
+        """Positions of the nodes sharing enough blocking keys with a normalized mention."""
+        shared = defaultdict(int)
+        keys = blocking_keys(normalized_mention, self.ngram)
+        for key in keys:
+            for position in self.index.get(key, ()):
+                shared[position] += 1
+        # a one-token mention like "malmo" may only produce a few keys
+        threshold = min(self.min_shared_keys, len(keys))
+        ranked = sorted((p for p, count in shared.items() if count >= threshold),
+                        key=lambda p: -shared[p])
+        return ranked[:self.max_candidates]
+
+    def resolve(self, mentions: Iterable[Dict[str, Any]], score_cutoff: float = 85.0,
+                batch_size: int = 1000) -> List[Dict[str, Any]]:
+        """Resolves mentions to the best matching domain node.
+
+        Args:
+            mentions: dictionaries with an 'id' (element id of the mentioning node) and a 'name'
+            score_cutoff: minimum RapidFuzz WRatio score (0-100) for a link
+            batch_size: number of mentions scored per cdist call
+
+        Returns:
+            List[Dict[str, Any]]: one link per resolved mention, with 'mention_id',
+                'node_id', 'label' and 'score' keys. Unresolved mentions are omitted.
+        """
+        mentions = [mention for mention in mentions if mention.get("name")]
+        links = []
+        for start in range(0, len(mentions), batch_size):
+            batch = mentions[start:start + batch_size]
+            normalized_batch = [normalize_name(mention["name"]) for mention in batch]
+            candidate_lists = [self.candidates(normalized) for normalized in normalized_batch]
+
+            # score every mention against the union of candidates of the batch in one call,
+            # then mask out the pairs which were not in the same block
+            union = sorted({p for candidates in candidate_lists for p in candidates})
+            if not union:
+                continue
+            column_of = {p: column for column, p in enumerate(union)}
+            scores = process.cdist(
+                normalized_batch,
+                [self.normalized_names[p] for p in union],
+                scorer=fuzz.WRatio,
+                score_cutoff=score_cutoff,
+                dtype=np.float32,
+                workers=-1,
+            )
+            mask = np.zeros(scores.shape, dtype=bool)
+            for row, candidates in enumerate(candidate_lists):
+                mask[row, [column_of[p] for p in candidates]] = True
+            scores = np.where(mask, scores, 0)
+
+            best_columns = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(batch)), best_columns]
+            for mention, column, score in zip(batch, best_columns, best_scores):
+                if score < score_cutoff or score == 0:
+                    continue
+                node = self.nodes[union[column]]
+                links.append({
+                    "mention_id": mention["id"],
+                    "node_id": node["id"],
+                    "label": node["label"],
+                    "score": float(score),
+                })
+        return links
+
+
+def write_mentions(links: List[Dict[str, Any]], batch_size: int = 1000) -> Dict[str, Any]:
+    """Writes MENTIONS relationships from mentioning nodes to resolved domain nodes.
+
+    Args:
+        links: the output of EntityResolver.resolve
+        batch_size: number of links per UNWIND statement
+
+    Returns:
+        A dictionary with a status key ('success' or 'error').
+        On success, includes a 'mentions_written' key with the number of links written.
+    """
+    query = """UNWIND $links AS link
+    MATCH (mention) WHERE elementId(mention) = link.mention_id
+    MATCH (node) WHERE elementId(node) = link.node_id
+    MERGE (mention)-[r:MENTIONS]->(node)
+    SET r.score = link.score
+    """
+    for start in range(0, len(links), batch_size):
+        results = graphdb.send_query(query, {"links": links[start:start + batch_size]})
+        if results["status"] == "error":
+            return results
+    return tool_success("mentions_written", len(links))
+
+def resolve_extracted_entities(entity_label: str, name_property: str = "name",
+                               score_cutoff: float = 85.0) -> Dict[str, Any]:
+    """Links extracted entities of a label to Product, Part and Supplier nodes with MENTIONS relationships.
+
+    Args:
+        entity_label: the label of the nodes extracted from text, for example "Product"
+        name_property: the property of the extracted nodes holding the mentioned name
+        score_cutoff: minimum RapidFuzz WRatio score (0-100) for a link
+
+    Returns:
+        A dictionary with a status key ('success' or 'error').
+        On success, includes a 'mentions_written' key with the number of links written.
+    """
+    # extracted entities live in the lexical graph, connected to the chunks they came from
+    results = graphdb.send_query(
+        """MATCH (n:$($entity_label))-[:FROM_CHUNK]->(:Chunk)
+        WHERE n[$name_property] IS NOT NULL
+        RETURN DISTINCT elementId(n) AS id, n[$name_property] AS name""",
+        {"entity_label": entity_label, "name_property": name_property}
+    )
+    if results["status"] == "error":
+        return results
+
+    try:
+        resolver = EntityResolver.from_graph()
+    except RuntimeError as e:
+        return tool_error(f"Could not load domain nodes for entity resolution: {e}")
+
+    links = resolver.resolve(results["query_result"], score_cutoff=score_cutoff)
+    return write_mentions(links)
@@ -0,0 +1,194 @@
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from neo4j_for_adk import graphdb, tool_success, tool_error
+
+def _quote(name: str) -> str:
+    """Backtick-quotes a label, relationship type or property key for use in Cypher text."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+class FactWriteError(Exception):
+    """Raised when buffered nodes or facts could not be written to Neo4j."""
+
+
+class FactWriter:
+    """Buffers extracted nodes and facts, deduplicates them in memory and writes them in bulk.
+
+    Nodes are deduplicated by (label, key) and facts by (subject, predicate, object)
+    before anything is sent to Neo4j, with properties of repeated entries merged.
+    A flush sends one `UNWIND ... MERGE` statement per label and per
+    (subject label, predicate, object label) combination. Labels and types are written
+    into the query text rather than passed as dynamic labels, so each combination has
+    a single query text which stays in the plan cache.
+
+    The buffer is flushed when it holds `max_buffered` entries or when `flush_interval`
+    seconds passed since the previous flush, which keeps memory bounded. If such a flush
+    or the flush at the end of a `with` block fails, FactWriteError is raised. After a failed
+    flush, adding raises FactWriteError until an explicit `flush()` succeeds, so a failing
+    database is not retried on every add and the buffer does not grow past `max_buffered`.
+
+    Example:
+        with FactWriter(approved_fact_types=state["approved_fact_types"]) as writer:
+            writer.add_fact("Product", "Malmö Desk", "HAS_ISSUE", "Issue", "wobbly legs")
+    """
+    def __init__(self, key_property: str = "name", approved_fact_types: Optional[Dict[str, Dict[str, str]]] = None,
+                 max_buffered: int = 10000, flush_interval: float = 30.0, batch_size: int = 1000):
+        """
+        Args:
+            key_property: the node property used as the MERGE key
+            approved_fact_types: optional approved fact types, as recorded by 'approve_proposed_facts'.
+                When given, facts which do not match an approved (subject, predicate, object) are rejected.
+            max_buffered: number of buffered nodes plus facts which triggers a flush
+            flush_interval: seconds after which the next add triggers a flush
+            batch_size: rows per UNWIND statement
+        """
+        self.key_property = key_property
+        self.max_buffered = max_buffered
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.allowed_facts = None
+        if approved_fact_types is not None:
+            self.allowed_facts = {
+                (fact["subject_label"], fact["predicate_label"], fact["object_label"])
+                for fact in approved_fact_types.values()
+            }
+        self.nodes: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        self.facts: Dict[Tuple[str, Any, str, str, Any], Dict[str, Any]] = {}
+        self.last_flush = time.monotonic()
+        self.stats = defaultdict(int)
+        # the error message of the last failed flush, None once a flush succeeds
+        self.error: Optional[str] = None
+
+    def __enter__(self) -> "FactWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None and self.error is not None:
+            # the block failed because of the failed flush, do not retry it
+            return
+        results = self.flush()
+        if results["status"] == "error" and exc_type is None:
+            raise FactWriteError(results["error_message"])
+
+    def __len__(self) -> int:
+        return len(self.nodes) + len(self.facts)
+
+    def add_node(self, label: str, key: Any, properties: Optional[Dict[str, Any]] = None) -> None:
+        """Buffers a node, merging its properties into an already buffered node with the same label and key."""
+        self._check_writable()
+        node_key = (label, key)
+        if node_key in self.nodes:
+            self.stats["duplicate_nodes"] += 1
+            self.nodes[node_key].update(properties or {})
+        else:
+            self.nodes[node_key] = dict(properties or {})
+        self._maybe_flush()
+
+    def add_fact(self, subject_label: str, subject_key: Any, predicate: str,
+                 object_label: str, object_key: Any, properties: Optional[Dict[str, Any]] = None) -> bool:
+        """Buffers a (subject, predicate, object) fact along with its subject and object nodes.
+
+        Returns:
+            bool: False if the fact does not match an approved fact type and was rejected.
+        """
+        if self.allowed_facts is not None and (subject_label, predicate, object_label) not in self.allowed_facts:
+            self.stats["rejected_facts"] += 1
+            return False
+        self._check_writable()
+        self.nodes.setdefault((subject_label, subject_key), {})
+        self.nodes.setdefault((object_label, object_key), {})
+        fact_key = (subject_label, subject_key, predicate, object_label, object_key)
+        if fact_key in self.facts:
+            self.stats["duplicate_facts"] += 1
+            self.facts[fact_key].update(properties or {})
+        else:
+            self.facts[fact_key] = dict(properties or {})
+        self._maybe_flush()
+        return True
+
+    def add_graph(self, graph) -> None:
+        """Buffers the entities and relationships of an extracted Neo4jGraph.
+
+        Nodes without the key property, such as the lexical graph's Document and Chunk nodes, are skipped.
+        """
+        keys = {}
+        for node in graph.nodes:
+            key = (node.properties or {}).get(self.key_property)
+            if key is None:
+                continue
+            keys[node.id] = (node.label, key)
+            self.add_node(node.label, key, node.properties)
+        for rel in graph.relationships:
+            if rel.start_node_id in keys and rel.end_node_id in keys:
+                subject_label, subject_key = keys[rel.start_node_id]
+                object_label, object_key = keys[rel.end_node_id]
+                self.add_fact(subject_label, subject_key, rel.type, object_label, object_key, rel.properties)
+
+    def _check_writable(self) -> None:
+        if self.error is not None:
+            raise FactWriteError(f"A previous flush failed and {len(self)} entries are still buffered: {self.error}")
+
+    def _maybe_flush(self) -> None:
+        if len(self) >= self.max_buffered or time.monotonic() - self.last_flush >= self.flush_interval:
+            results = self.flush()
+            if results["status"] == "error":
+                raise FactWriteError(results["error_message"])
+
+    def _send_batches(self, query: str, rows: list) -> Dict[str, Any]:
+        for start in range(0, len(rows), self.batch_size):
+            results = graphdb.send_query(query, {"rows": rows[start:start + self.batch_size]})
+            if results["status"] == "error":
+                return results
+        return tool_success("rows_written", len(rows))
+
+    def flush(self) -> Dict[str, Any]:
+        """Writes all buffered nodes, then all buffered facts, and empties the buffer.
+
+        Returns:
+            A dictionary with a status key ('success' or 'error').
+            On success, includes a 'fact_writer' key with the running write statistics.
+            On error, the entries which were not written stay buffered and adding
+            raises FactWriteError until a flush succeeds.
+        """
+        self.last_flush = time.monotonic()
+        key = _quote(self.key_property)
+
+        nodes_by_label = defaultdict(list)
+        for (label, node_key), properties in self.nodes.items():
+            nodes_by_label[label].append({"key": node_key, "properties": properties})
+        for label, rows in nodes_by_label.items():
+            query = f"""UNWIND $rows AS row
+            MERGE (n:{_quote(label)} {{ {key}: row.key }})
+            SET n += row.properties"""
+            results = self._send_batches(query, rows)
+            if results["status"] == "error":
+                self.error = f"Error writing {label} nodes: {results['error_message']}"
+                return tool_error(self.error)
+            self.stats["nodes_written"] += len(rows)
+            for row in rows:
+                del self.nodes[(label, row["key"])]
+
+        facts_by_type = defaultdict(list)
+        for (subject_label, subject_key, predicate, object_label, object_key), properties in self.facts.items():
+            facts_by_type[(subject_label, predicate, object_label)].append({
+                "subject": subject_key, "object": object_key, "properties": properties
+            })
+        for (subject_label, predicate, object_label), rows in facts_by_type.items():
+            query = f"""UNWIND $rows AS row
+            MATCH (s:{_quote(subject_label)} {{ {key}: row.subject }})
+            MATCH (o:{_quote(object_label)} {{ {key}: row.object }})
+            MERGE (s)-[r:{_quote(predicate)}]->(o)
+            SET r += row.properties"""
+            results = self._send_batches(query, rows)
+            if results["status"] == "error":
+                self.error = f"Error writing {predicate} facts: {results['error_message']}"
+                return tool_error(self.error)
+            self.stats["facts_written"] += len(rows)
+            for row in rows:
+                del self.facts[(subject_label, row["subject"], predicate, object_label, row["object"])]
+
+        self.error = None
+        self.stats["flushes"] += 1
+        return tool_success("fact_writer", dict(self.stats))
@@ -0,0 +1,236 @@
+import hashlib
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from neo4j_graphrag.experimental.components.text_splitters.base import TextSplitter
+from neo4j_graphrag.experimental.components.types import TextChunk, TextChunks, LexicalGraphConfig
+from neo4j_graphrag.experimental.components.pdf_loader import DataLoader
+
+from neo4j_for_adk import graphdb, tool_success, tool_error
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a chunk's text, used to recognize unchanged chunks across runs."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def chunk_key(document_path: str, index: int, text: str) -> str:
+    """Id of a new chunk, derived from its document, its position and its content.
+
+    The position keeps identical chunks of one document apart. An unchanged chunk keeps
+    the id it was created with when it moves, since chunks are matched by content hash.
+    """
+    return f"{document_path}#{index}:{content_hash(text)[:16]}"
+
+def get_stored_chunks(document_path: str) -> Dict[str, Any]:
+    """Gets the id, content hash and index of the chunks currently stored for a document.
+
+    Returns:
+        A dictionary with a status key ('success' or 'error').
+        On success, includes a 'stored_chunks' key with a list of dictionaries
+        with 'id', 'hash' and 'index' keys.
+    """
+    results = graphdb.send_query("""MATCH (:Document {path: $path})<-[:FROM_DOCUMENT]-(c:Chunk)
+    WHERE c.hash IS NOT NULL
+    RETURN c.id AS id, c.hash AS hash, c.index AS index""", {"path": document_path})
+    if results["status"] == "error":
+        return results
+    return tool_success("stored_chunks", results["query_result"])
+
+def remove_chunks(document_path: str, chunk_ids: List[str]) -> Dict[str, Any]:
+    """Removes chunks of a document, along with the facts that were only extracted from them.
+
+    An extracted entity is deleted when it is no longer connected to any chunk.
+    A relationship between two extracted entities is deleted when the entities
+    no longer share a chunk which could have stated it.
+
+    Args:
+        document_path: path of the document the chunks belong to
+        chunk_ids: ids of the chunks to remove
+
+    Returns:
+        A dictionary with a status key ('success' or 'error').
+        On success, includes a 'chunks_removed' key with the number of chunks removed.
+    """
+    if not chunk_ids:
+        return tool_success("chunks_removed", 0)
+    results = graphdb.send_query("""MATCH (:Document {path: $path})<-[:FROM_DOCUMENT]-(c:Chunk)
+    WHERE c.id IN $chunk_ids
+    OPTIONAL MATCH (entity:__Entity__)-[:FROM_CHUNK]->(c)
+    WITH collect(DISTINCT c) AS chunks, collect(DISTINCT entity) AS entities
+    FOREACH (c IN chunks | DETACH DELETE c)
+    WITH entities
+    CALL (entities) {
+        UNWIND entities AS entity
+        MATCH (entity)-[r]-(other:__Entity__)
+        WHERE NOT EXISTS { (entity)-[:FROM_CHUNK]->(:Chunk)<-[:FROM_CHUNK]-(other) }
+        WITH DISTINCT r
+        DELETE r
+    }
+    UNWIND entities AS entity
+    WITH entity WHERE NOT EXISTS { (entity)-[:FROM_CHUNK]->() }
+    DETACH DELETE entity
+    """, {"path": document_path, "chunk_ids": chunk_ids})
+    if results["status"] == "error":
+        return results
+    return tool_success("chunks_removed", len(chunk_ids))
+
+def link_document_chunks(document_path: str, chunks: List[TextChunk], added: List[TextChunk],
+                         title: Optional[str] = None) -> Dict[str, Any]:
+    """Attaches the current chunks of a document to its Document node and rebuilds their order.
+
+    Added chunks are connected to the document, unchanged chunks may have moved so every
+    chunk gets its current index, and the NEXT_CHUNK chain of the document is rebuilt.
+    None of this requires the LLM.
+    """
+    results = graphdb.send_query("""MERGE (d:Document {path: $path})
+    SET d.title = coalesce($title, d.title)
+    WITH d
+    UNWIND $added AS id
+    MATCH (c:Chunk {id: id})
+    MERGE (c)-[:FROM_DOCUMENT]->(d)
+    """, {"path": document_path, "title": title, "added": [chunk.metadata["id"] for chunk in added]})
+    if results["status"] == "error":
+        return results
+
+    rows = [{"id": chunk.metadata["id"], "index": chunk.index} for chunk in chunks]
+    results = graphdb.send_query("""UNWIND $rows AS row
+    MATCH (:Document {path: $path})<-[:FROM_DOCUMENT]-(c:Chunk {id: row.id})
+    SET c.index = row.index
+    """, {"path": document_path, "rows": rows})
+    if results["status"] == "error":
+        return results
+    return graphdb.send_query("""MATCH (d:Document {path: $path})<-[:FROM_DOCUMENT]-(c:Chunk)
+    OPTIONAL MATCH (c)-[old:NEXT_CHUNK]->()
+    DELETE old
+    WITH DISTINCT d, c ORDER BY c.index
+    WITH collect(c) AS ordered
+    UNWIND range(0, size(ordered) - 2) AS i
+    WITH ordered[i] AS a, ordered[i + 1] AS b
+    MERGE (a)-[:NEXT_CHUNK]->(b)
+    """, {"path": document_path})
+
+
+class IncrementalExtractor:
+    """Re-extracts only the chunks of a document which changed since the last run.
+
+    Chunks are identified by the content hash of their text and grouped by the
+    `DocumentInfo.path` returned by the loader. On each run the new chunk set is
+    diffed against the stored one: only the added chunks are sent to the extractor, and
+    once their facts are written the removed chunks and the facts only they supported
+    are deleted. The cost of an
+    update therefore scales with the size of the edit, not with the size of the corpus.
+    """
+    def __init__(self, loader: DataLoader, splitter: TextSplitter, extractor, writer,
+                 schema=None, lexical_graph_config: Optional[LexicalGraphConfig] = None):
+        """
+        Args:
+            loader: a data loader such as MarkdownDataLoader
+            splitter: a text splitter such as RegexTextSplitter
+            extractor: an entity relation extractor such as LLMEntityRelationExtractor
+            writer: a graph writer such as Neo4jWriter
+            schema: optional GraphSchema passed to the extractor
+            lexical_graph_config: optional configuration of the lexical graph labels and types
+        """
+        self.loader = loader
+        self.splitter = splitter
+        self.extractor = extractor
+        self.writer = writer
+        self.schema = schema
+        self.lexical_graph_config = lexical_graph_config or LexicalGraphConfig()
+
+    async def run(self, file_path: str) -> Dict[str, Any]:
+        """Brings the graph up to date with the current content of a file.
+
+        Returns:
+            A dictionary with a status key ('success' or 'error').
+            On success, includes an 'incremental_extraction' key with the number of
+            chunks that were added, removed and left unchanged.
+        """
+        document = await self.loader.run(Path(file_path))
+        document_path = document.document_info.path
+        title = (document.document_info.metadata or {}).get("title")
+
+        split = await self.splitter.run(document.text)
+        chunks = []
+        for chunk in split.chunks:
+            metadata = dict(chunk.metadata or {})
+            metadata["hash"] = content_hash(chunk.text)
+            # keep an id assigned by an upstream stage, such as the near-duplicate splitter
+            metadata.setdefault("id", chunk_key(document_path, chunk.index, chunk.text))
+            chunks.append(TextChunk(text=chunk.text, index=chunk.index, metadata=metadata, uid=chunk.uid))
+
+        stored = get_stored_chunks(document_path)
+        if stored["status"] == "error":
+            return stored
+        added, removed = self._diff(chunks, stored["stored_chunks"])
+
+        if added:
+            # without document_info the extractor does not create another Document node;
+            # link_document_chunks merges the existing one instead
+            try:
+                graph = await self.extractor.run(
+                    chunks=TextChunks(chunks=added),
+                    lexical_graph_config=self.lexical_graph_config,
+                    schema=self.schema,
+                )
+            except Exception as e:
+                return tool_error(f"Error extracting facts from {document_path}: {e}")
+            # NEXT_CHUNK between added chunks only is wrong once unchanged chunks sit in between
+            graph.relationships = [
+                rel for rel in graph.relationships
+                if rel.type != self.lexical_graph_config.next_chunk_relationship_type
+            ]
+            try:
+                written = await self.writer.run(graph, self.lexical_graph_config)
+            except Exception as e:
+                return tool_error(f"Error writing extracted graph for {document_path}: {e}")
+            # Neo4jWriter reports a failed write in its result instead of raising
+            if written.status != "SUCCESS":
+                error = (written.metadata or {}).get("error", "unknown error")
+                return tool_error(f"Error writing extracted graph for {document_path}: {error}")
+
+        # old facts are only removed once their replacements are written
+        results = remove_chunks(document_path, removed)
+        if results["status"] == "error":
+            return results
+
+        results = link_document_chunks(document_path, chunks, added, title)
+        if results["status"] == "error":
+            return results
+
+        return tool_success("incremental_extraction", {
+            "path": document_path,
+            "chunks_added": len(added),
+            "chunks_removed": len(removed),
+            "chunks_unchanged": len(chunks) - len(added),
+        })
+
+    @staticmethod
+    def _diff(chunks: List[TextChunk], stored: List[Dict[str, Any]]) -> Tuple[List[TextChunk], List[str]]:
+        """Matches the current chunks to the stored ones, returning the added chunks and removed ids.
+
+        A chunk is unchanged when a stored chunk has its id, or otherwise the same content hash;
+        identical chunks are paired in document order. Unchanged chunks take the id of the
+        stored chunk, so link_document_chunks can give it its new index.
+        """
+        unmatched = {row["id"]: row for row in stored}
+        pending = []
+        for chunk in chunks:
+            row = unmatched.get(chunk.metadata["id"])
+            if row is not None and row["hash"] == chunk.metadata["hash"]:
+                del unmatched[row["id"]]
+            else:
+                pending.append(chunk)
+
+        by_hash: Dict[str, deque] = defaultdict(deque)
+        for row in sorted(unmatched.values(), key=lambda row: row["index"] if row["index"] is not None else -1):
+            by_hash[row["hash"]].append(row["id"])
+        added = []
+        for chunk in pending:
+            candidates = by_hash.get(chunk.metadata["hash"])
+            if candidates:
+                chunk.metadata["id"] = candidates.popleft()
+            else:
+                added.append(chunk)
+        removed = [chunk_id for candidates in by_hash.values() for chunk_id in candidates]
+        return added, removed
@@ -1,5 +1,9 @@
-from neo4j_for_adk import graphdb
-from typing import Dict, Any
+from neo4j_for_adk import graphdb, tool_success, tool_error, get_neo4j_import_dir
+from file_suggestion_agent.readers import record_format, iter_records
+from structured_data_agents.headers import get_file_header
+from pathlib import Path
+import time
+from typing import Dict, Any, Iterator, List
 
 def create_uniqueness_constraint(
     label: str,
@@ -49,8 +53,102 @@ def load_nodes_from_csv(
     })
     return results
 
+def needs_client_side_import(source_file: str) -> bool:
+    """LOAD CSV only reads plain, comma separated CSV, so compressed, JSONL and Parquet files
+    and CSV files with another delimiter are streamed by the client."""
+    if record_format(source_file) != "csv" or source_file.lower().endswith(".gz"):
+        return True
+    return get_file_header(source_file)["delimiter"] != ","
+
+def _client_side_import(source_file: str) -> Dict[str, Any]:
+    """needs_client_side_import as a tool result, with an error for a missing or unreadable file."""
+    try:
+        return tool_success("client_side", needs_client_side_import(source_file))
+    except Exception as e:
+        return tool_error(f"Could not read the header of {source_file}: {e}")
+
+def iter_record_batches(source_file: str, columns: List[str], key_columns: List[str],
+                        batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Streams batches of records from a file in the import directory, reading only the given columns.
+
+    Key columns are converted to strings, as LOAD CSV would, so that nodes and relationships
+    imported from different formats still match on their keys.
+    """
+    full_path = str(Path(get_neo4j_import_dir()) / source_file)
+    batch = []
+    for record in iter_records(full_path, columns=columns):
+        for key in key_columns:
+            if record.get(key) is not None:
+                record[key] = str(record[key])
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def load_nodes_from_records(
+    source_file: str,
+    label: str,
+    unique_column_name: str,
+    properties: list[str],
+    batch_size: int = 1000,
+) -> Dict[str, Any]:
+    """Batch loading of nodes from a compressed, JSONL or Parquet file, streamed by the client"""
+
+    # same merge as load_nodes_from_csv, with rows sent as parameters instead of read by the server
+    query = f"""UNWIND $rows AS row
+    MERGE (n:$($label) {{ {unique_column_name} : row[$unique_column_name] }})
+    FOREACH (k IN $properties | SET n[k] = row[k])
+    """
+    columns = list(dict.fromkeys([unique_column_name] + properties))
+    rows_loaded = 0
+    for batch in iter_record_batches(source_file, columns, [unique_column_name], batch_size):
+        results = graphdb.send_query(query, {
+            "rows": batch,
+            "label": label,
+            "unique_column_name": unique_column_name,
+            "properties": properties
+        })
+        if results["status"] == "error":
+            return results
+        rows_loaded += len(batch)
+    return tool_success("rows_loaded", rows_loaded)
+
+def load_relationships_from_records(relationship_construction: dict, batch_size: int = 1000) -> Dict[str, Any]:
+    """Batch loading of relationships from a compressed, JSONL or Parquet file, streamed by the client"""
+    from_node_column = relationship_construction["from_node_column"]
+    to_node_column = relationship_construction["to_node_column"]
+    properties = relationship_construction["properties"]
+    query = f"""UNWIND $rows AS row
+    MATCH (from_node:$($from_node_label) {{ {from_node_column} : row[$from_node_column] }}),
+          (to_node:$($to_node_label) {{ {to_node_column} : row[$to_node_column] }} )
+    MERGE (from_node)-[r:$($relationship_type)]->(to_node)
+    FOREACH (k IN $properties | SET r[k] = row[k])
+    """
+    columns = list(dict.fromkeys([from_node_column, to_node_column] + properties))
+    rows_loaded = 0
+    for batch in iter_record_batches(relationship_construction["source_file"], columns,
+                                     [from_node_column, to_node_column], batch_size):
+        results = graphdb.send_query(query, {
+            "rows": batch,
+            "from_node_label": relationship_construction["from_node_label"],
+            "from_node_column": from_node_column,
+            "to_node_label": relationship_construction["to_node_label"],
+            "to_node_column": to_node_column,
+            "relationship_type": relationship_construction["relationship_type"],
+            "properties": properties
+        })
+        if results["status"] == "error":
+            return results
+        rows_loaded += len(batch)
+    return tool_success("rows_loaded", rows_loaded)
+
 def import_nodes(node_construction: dict) -> dict:
     """Import nodes as defined by a node construction rule."""
+    client_side = _client_side_import(node_construction["source_file"])
+    if client_side["status"] == "error":
+        return client_side
 
     # create a uniqueness constraint for the unique_column
     uniqueness_result = create_uniqueness_constraint(
@@ -61,8 +159,9 @@ def import_nodes(node_construction: dict) -> dict:
     if (uniqueness_result["status"] == "error"):
         return uniqueness_result
 
-    # import nodes from csv
-    load_nodes_result = load_nodes_from_csv(
+    # import nodes from csv, or stream them from other formats
+    load_nodes = load_nodes_from_records if client_side["client_side"] else load_nodes_from_csv
+    load_nodes_result = load_nodes(
         node_construction["source_file"],
         node_construction["label"],
         node_construction["unique_column_name"],
@@ -73,6 +172,11 @@ def import_nodes(node_construction: dict) -> dict:
 
 def import_relationships(relationship_construction: dict) -> Dict[str, Any]:
     """Import relationships as defined by a relationship construction rule."""
+    client_side = _client_side_import(relationship_construction["source_file"])
+    if client_side["status"] == "error":
+        return client_side
+    if client_side["client_side"]:
+        return load_relationships_from_records(relationship_construction)
 
     # load nodes from CSV file by merging on the unique_column_name value 
     from_node_column = relationship_construction["from_node_column"]
@@ -98,14 +202,36 @@ def import_relationships(relationship_construction: dict) -> Dict[str, Any]:
     return results
 
 
-def construct_domain_graph(construction_plan: dict) -> Dict[str, Any]:
-    """Construct a domain graph according to a construction plan."""
-    # first, import nodes
-    node_constructions = [value for value in construction_plan.values() if value['construction_type'] == 'node']
-    for node_construction in node_constructions:
-        import_nodes(node_construction)
+def iter_construct_domain_graph(construction_plan: dict) -> Iterator[Dict[str, Any]]:
+    """Construct a domain graph according to a construction plan, yielding progress after each construction rule.
 
-    # second, import relationships
+    Each progress event has the 'step' and 'total_steps', the 'construction_type', the 'name' (label or
+    relationship type), the 'status' ('success' or 'error'), the 'duration_s' and, on error, the 'error_message'.
+    """
+    # first nodes, then relationships, which match on the imported nodes
+    node_constructions = [value for value in construction_plan.values() if value['construction_type'] == 'node']
     relationship_constructions = [value for value in construction_plan.values() if value['construction_type'] == 'relationship']
-    for relationship_construction in relationship_constructions:
-        import_relationships(relationship_construction)
\ No newline at end of file
+    constructions = node_constructions + relationship_constructions
+    for step, construction in enumerate(constructions, start=1):
+        started = time.monotonic()
+        if construction['construction_type'] == 'node':
+            name, result = construction["label"], import_nodes(construction)
+        else:
+            name, result = construction["relationship_type"], import_relationships(construction)
+        event = {
+            "step": step,
+            "total_steps": len(constructions),
+            "construction_type": construction['construction_type'],
+            "name": name,
+            "status": result["status"],
+            "duration_s": round(time.monotonic() - started, 3)
+        }
+        if result["status"] == "error":
+            event["error_message"] = result["error_message"]
+        yield event
+
+
+def construct_domain_graph(construction_plan: dict) -> Dict[str, Any]:
+    """Construct a domain graph according to a construction plan."""
+    steps = list(iter_construct_domain_graph(construction_plan))
+    return tool_success("construction_steps", steps)
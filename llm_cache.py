@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from neo4j_for_adk import get_cache_dir
+
+LLM_CACHE_MODES = ("live", "record", "replay")
+
+
+class ReplayMissError(RuntimeError):
+    """Raised in replay mode for a request which was never recorded."""
+
+
+def _strip_call_ids(value: Any) -> Any:
+    # function call ids are generated per run, so they must not change the request hash
+    if isinstance(value, dict):
+        return {k: _strip_call_ids(v) for k, v in value.items()
+                if not (k == "id" and ("name" in value and ("args" in value or "response" in value)))}
+    if isinstance(value, list):
+        return [_strip_call_ids(v) for v in value]
+    return value
+
+
+def canonical_request(model: str, llm_request: LlmRequest, additional_args: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a request which determine the response: model, messages, system instruction,
+    tool declarations and generation parameters."""
+    config = llm_request.config.model_dump(mode="json", exclude_none=True) if llm_request.config else {}
+    return _strip_call_ids({
+        "model": model,
+        "contents": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+        "config": config,
+        "params": additional_args,
+    })
+
+
+def request_hash(canonical: Dict[str, Any]) -> str:
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CachingLiteLlm(LiteLlm):
+    """A LiteLlm model which can record responses to disk and replay them.
+
+    Modes:
+    - live: every call goes to the model, as with LiteLlm
+    - record: recorded responses are reused, other calls go to the model and are recorded
+    - replay: only recorded responses are returned, a request which was never recorded raises
+      ReplayMissError. Replay makes no network calls and is deterministic.
+
+    Responses are keyed on a hash of the canonical request: the model, the messages, the system
+    instruction, the tool declarations and the generation parameters. The mode and the cache
+    directory default to the AGENTIC_KG_LLM_CACHE_MODE and AGENTIC_KG_LLM_CACHE_DIR
+    environment variables, and to "live" and the llm_cache directory in the cache directory.
+    """
+    mode: str = "live"
+    cache_dir: Optional[str] = None
+    hits: int = 0
+    misses: int = 0
+
+    def __init__(self, model: str, mode: Optional[str] = None, cache_dir: Optional[str] = None, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.mode = mode or os.getenv("AGENTIC_KG_LLM_CACHE_MODE") or "live"
+        if self.mode not in LLM_CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode '{self.mode}', use one of {', '.join(LLM_CACHE_MODES)}")
+        self.cache_dir = cache_dir or os.getenv("AGENTIC_KG_LLM_CACHE_DIR") or str(get_cache_dir() / "llm_cache")
+
+    def _entry_path(self, key: str) -> Path:
+        return Path(self.cache_dir) / key[:2] / f"{key}.json"
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if self.mode == "live":
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+            return
+
+        # LiteLlm adds a user message to requests without one, which must be part of the key
+        self._maybe_append_user_content(llm_request)
+        canonical = canonical_request(self.model, llm_request, self._additional_args)
+        key = request_hash(canonical)
+        path = self._entry_path(key)
+
+        if path.exists():
+            self.hits += 1
+            with open(path, encoding="utf-8") as file:
+                recorded = json.load(file)
+            for response in recorded["responses"]:
+                yield LlmResponse.model_validate(response)
+            return
+
+        if self.mode == "replay":
+            self.misses += 1
+            raise ReplayMissError(f"No recorded response for request {key} to {self.model} in {self.cache_dir}. "
+                                  f"Run in record mode first.")
+
+        self.misses += 1
+        responses = []
+        async for response in super().generate_content_async(llm_request, stream):
+            responses.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
+        if any(response.get("error_code") for response in responses):
+            return  # errors are not recorded, so the next run retries
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"request": canonical, "responses": responses}, file, indent=1, sort_keys=True)
+        os.replace(temporary, path)
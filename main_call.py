@@ -1,30 +1,48 @@
-from google.adk.sessions import InMemorySessionService
-from google.adk.runners import Runner
+from google.adk.events import Event, EventActions
 from normal_agent.agent import AgentCaller
 from typing import Dict, Any, Optional
 from google.adk.agents import Agent
+import uuid
 
+from session_service import get_session_service, get_runner, PIPELINE_APP_NAME, PIPELINE_USER_ID
 
 
-async def make_agent_caller(agent: Agent, initial_state: Optional[Dict[str, Any]] = {}) -> AgentCaller:
-    """Create and return an AgentCaller instance for the given agent."""
-    app_name = agent.name + "_app"
-    user_id = agent.name + "_user"
-    session_id = agent.name + "_session_01"
-    
-    # Initialize a session service and a session
-    session_service = InMemorySessionService()
-    await session_service.create_session(
-        app_name=app_name,
-        user_id=user_id,
-        session_id=session_id,
-        state=initial_state
-    )
-    
-    runner = Runner(
-        agent=agent,
-        app_name=app_name,
-        session_service=session_service
-    )
-    
-    return AgentCaller(agent, runner, user_id, session_id)
+async def make_agent_caller(agent: Agent, initial_state: Optional[Dict[str, Any]] = {},
+                            session_id: Optional[str] = None, user_id: Optional[str] = None) -> AgentCaller:
+    """Create and return an AgentCaller instance for the given agent.
+
+    Sessions are kept in the shared SQLite session service. Pass the session_id of an earlier
+    stage to continue its session, so its state carries over; initial_state is then merged into it.
+    Without a session_id, a new session is started. Every stage uses the same user_id by default,
+    so a session started by one stage is found by the next.
+
+    Raises:
+        ValueError: if session_id is given but there is no such session for the user
+    """
+    app_name = PIPELINE_APP_NAME
+    user_id = user_id or PIPELINE_USER_ID
+    session_service = get_session_service()
+
+    if session_id:
+        session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if session is None:
+            raise ValueError(f"Session {session_id} of user {user_id} not found in {app_name}. "
+                             f"Pass the session_id and user_id of an earlier stage, or no session_id to start a new session.")
+    else:
+        session = await session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=f"{agent.name}_{uuid.uuid4().hex[:12]}",
+            state=initial_state
+        )
+        initial_state = None
+    if initial_state:
+        # only the seeded keys are written
+        await session_service.append_event(session, Event(
+            author="user",
+            invocation_id=f"seed_{uuid.uuid4().hex[:12]}",
+            actions=EventActions(state_delta=dict(initial_state))
+        ))
+
+    runner = get_runner(agent, app_name)
+    return AgentCaller(agent, runner, user_id, session.id)
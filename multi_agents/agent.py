@@ -1,12 +1,13 @@
 
 from google.adk.agents import Agent
 from multi_agents.tools import say_hello_stateful, say_goodbye_stateful
-from google.adk.models.lite_llm import LiteLlm
+from llm_cache import CachingLiteLlm
+from tool_budget import govern_tools
 from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = LiteLlm(model="gemini/gemini-2.5-flash")
+llm = CachingLiteLlm(model="gemini/gemini-2.5-flash")
 
 # define a stateful greeting agent. the only difference is that this agent will use the stateful say_hello_stateful tool
 greeting_agent_stateful = Agent(
@@ -14,7 +15,7 @@ greeting_agent_stateful = Agent(
     name="greeting_agent_stateful_v1",
     instruction="You are the Greeting Agent. Your ONLY task is to provide a friendly greeting using the 'say_hello' tool. Do nothing else.",
     description="Handles simple greetings and hellos using the 'say_hello_stateful' tool.",
-    tools=[say_hello_stateful],
+    tools=govern_tools([say_hello_stateful]),
 )
 
 # define a stateful farewell agent. the only difference is that this agent will use the stateful say_goodbye_stateful tool
@@ -23,7 +24,7 @@ farewell_agent_stateful = Agent(
     name="farewell_agent_stateful_v1",
     instruction="You are the Farewell Agent. Your ONLY task is to provide a polite goodbye message using the 'say_goodbye_stateful' tool. Do not perform any other actions.",
     description="Handles simple farewells and goodbyes using the 'say_goodbye_stateful' tool.",
-    tools=[say_goodbye_stateful],
+    tools=govern_tools([say_goodbye_stateful]),
 )
 
 # define the root agent that uses the stateful sub-agents
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from typing import Any, Dict
 import atexit
 
@@ -16,6 +17,14 @@ def get_neo4j_import_dir():
     neo4j_import_dir = os.getenv("NEO4J_IMPORT_DIR")
     return neo4j_import_dir
 
+def get_cache_dir():
+    """Gets the directory for local caches from an environment variable,
+    defaulting to ~/.cache/agentic_knowledge_graph. The directory is created if needed.
+    """
+    cache_dir = Path(os.getenv("AGENTIC_KG_CACHE_DIR") or Path.home() / ".cache" / "agentic_knowledge_graph")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
 def tool_success(key:str,result: Any) -> Dict[str, Any]:
     """Convenience function to return a success result."""
     return {
@@ -0,0 +1,180 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+from neo4j_for_adk import get_cache_dir
+from tracing import get_tracer
+
+# all pipeline stages share one app and one user, so a session started by one stage can be continued by the next
+PIPELINE_APP_NAME = "agentic_knowledge_graph"
+PIPELINE_USER_ID = "pipeline_user"
+
+
+class SqliteSessionService(BaseSessionService):
+    """A session service which keeps sessions, state and events in SQLite.
+
+    One connection is opened per service and reused for every call. State is stored one row
+    per key, so appending an event only writes the keys in its state delta instead of
+    rewriting the whole state. Keys prefixed with 'app:' and 'user:' are stored once per app
+    and per user and merged into every session of that app or user, and 'temp:' keys are
+    never stored, like the other ADK session services.
+    """
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: the SQLite file, by default sessions.sqlite in the cache directory
+        """
+        self.db_path = str(db_path or get_cache_dir() / "sessions.sqlite")
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # write-ahead logging lets readers proceed while a session is written
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS sessions (app_name TEXT, user_id TEXT, id TEXT, last_update_time REAL,
+                                             PRIMARY KEY (app_name, user_id, id));
+        CREATE TABLE IF NOT EXISTS session_state (app_name TEXT, user_id TEXT, session_id TEXT, key TEXT, value TEXT,
+                                                  PRIMARY KEY (app_name, user_id, session_id, key));
+        CREATE TABLE IF NOT EXISTS app_state (app_name TEXT, key TEXT, value TEXT, PRIMARY KEY (app_name, key));
+        CREATE TABLE IF NOT EXISTS user_state (app_name TEXT, user_id TEXT, key TEXT, value TEXT,
+                                               PRIMARY KEY (app_name, user_id, key));
+        CREATE TABLE IF NOT EXISTS events (app_name TEXT, user_id TEXT, session_id TEXT, seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                                           timestamp REAL, event TEXT);
+        CREATE INDEX IF NOT EXISTS events_session ON events (app_name, user_id, session_id, seq);
+        """)
+
+    def _write_state(self, app_name: str, user_id: str, session_id: str, delta: Dict[str, Any]) -> None:
+        for key, value in delta.items():
+            if key.startswith(State.TEMP_PREFIX):
+                continue
+            encoded = json.dumps(value, default=str)
+            if key.startswith(State.APP_PREFIX):
+                self.conn.execute("INSERT OR REPLACE INTO app_state VALUES (?, ?, ?)",
+                                  (app_name, key.removeprefix(State.APP_PREFIX), encoded))
+            elif key.startswith(State.USER_PREFIX):
+                self.conn.execute("INSERT OR REPLACE INTO user_state VALUES (?, ?, ?, ?)",
+                                  (app_name, user_id, key.removeprefix(State.USER_PREFIX), encoded))
+            else:
+                self.conn.execute("INSERT OR REPLACE INTO session_state VALUES (?, ?, ?, ?, ?)",
+                                  (app_name, user_id, session_id, key, encoded))
+
+    def _read_state(self, app_name: str, user_id: str, session_id: str) -> Dict[str, Any]:
+        state = {key: json.loads(value) for key, value in self.conn.execute(
+            "SELECT key, value FROM session_state WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (app_name, user_id, session_id))}
+        for key, value in self.conn.execute("SELECT key, value FROM app_state WHERE app_name = ?", (app_name,)):
+            state[State.APP_PREFIX + key] = json.loads(value)
+        for key, value in self.conn.execute(
+                "SELECT key, value FROM user_state WHERE app_name = ? AND user_id = ?", (app_name, user_id)):
+            state[State.USER_PREFIX + key] = json.loads(value)
+        return state
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        now = time.time()
+        with self.lock:
+            try:
+                self.conn.execute("INSERT INTO sessions VALUES (?, ?, ?, ?)", (app_name, user_id, session_id, now))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Session {session_id} already exists for {app_name}/{user_id}")
+            self._write_state(app_name, user_id, session_id, state or {})
+            self.conn.commit()
+            merged_state = self._read_state(app_name, user_id, session_id)
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=merged_state, last_update_time=now)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT last_update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id)).fetchone()
+            if row is None:
+                return None
+            query = "SELECT event FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            params = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                query += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            query += " ORDER BY seq DESC"
+            if config and config.num_recent_events:
+                query += " LIMIT ?"
+                params.append(config.num_recent_events)
+            events = [Event.model_validate_json(event) for (event,) in self.conn.execute(query, params)]
+            state = self._read_state(app_name, user_id, session_id)
+        events.reverse()
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=state,
+                       events=events, last_update_time=row[0])
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, last_update_time FROM sessions WHERE app_name = ? AND user_id = ? ORDER BY last_update_time",
+                (app_name, user_id)).fetchall()
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=user_id, id=session_id, state={}, last_update_time=last_update_time)
+            for session_id, last_update_time in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        with self.lock:
+            for table, id_column in (("sessions", "id"), ("session_state", "session_id"), ("events", "session_id")):
+                self.conn.execute(f"DELETE FROM {table} WHERE app_name = ? AND user_id = ? AND {id_column} = ?",
+                                  (app_name, user_id, session_id))
+            self.conn.commit()
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        # updates the in-memory session, then persists the event and only the changed state keys
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        with self.lock:
+            if event.actions and event.actions.state_delta:
+                self._write_state(session.app_name, session.user_id, session.id, event.actions.state_delta)
+            self.conn.execute("INSERT INTO events (app_name, user_id, session_id, timestamp, event) VALUES (?, ?, ?, ?, ?)",
+                              (session.app_name, session.user_id, session.id, event.timestamp,
+                               event.model_dump_json(exclude_none=True)))
+            self.conn.execute("UPDATE sessions SET last_update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                              (event.timestamp, session.app_name, session.user_id, session.id))
+            self.conn.commit()
+        return event
+
+
+_session_services: Dict[str, SqliteSessionService] = {}
+
+def get_session_service(db_path: Optional[str] = None) -> SqliteSessionService:
+    """Gets the process-wide session service for a database file, creating it on first use."""
+    key = str(Path(db_path)) if db_path else ""
+    if key not in _session_services:
+        _session_services[key] = SqliteSessionService(db_path)
+    return _session_services[key]
+
+
+# runners are stateless between calls, so one per agent is shared by every caller in the process
+_runners: Dict[Tuple[int, str], Runner] = {}
+
+def get_runner(agent: BaseAgent, app_name: str = PIPELINE_APP_NAME) -> Runner:
+    """Gets the shared runner of an agent, creating it on first use."""
+    key = (id(agent), app_name)
+    if key not in _runners:
+        tracer = get_tracer()
+        if tracer:
+            tracer.install(agent)
+        _runners[key] = Runner(
+            agent=agent,
+            app_name=app_name,
+            session_service=get_session_service()
+        )
+    return _runners[key]
@@ -1,11 +1,12 @@
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.llm_agent import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
+from llm_cache import CachingLiteLlm
 from dotenv import load_dotenv
-from structured_data_agents.tools import structured_schema_proposal_agent_tools, schema_critic_agent_tools, get_proposed_construction_plan, approve_proposed_construction_plan, initialize_feedback, get_proposed_schema
-from structured_data_agents.loop import CheckStatusAndEscalate
+from structured_data_agents.tools import structured_schema_proposal_agent_tools, schema_critic_agent_tools, get_proposed_construction_plan, approve_proposed_construction_plan, initialize_feedback, get_proposed_schema, seed_construction_plan, get_cached_construction_plan
+from structured_data_agents.loop import CheckStatusAndEscalate, ValidateThenCritique, reset_refinement_progress, record_refinement_stop
 from google.adk.agents.loop_agent import LoopAgent
 from google.adk.tools import agent_tool
+from tool_budget import govern_tools
 
 load_dotenv()
 
@@ -25,7 +26,7 @@ proposal_agent_prompt = """
     identifiers found within the file.
 
     Because unique identifiers are so important for determining the structure of the graph,
-    always verify the uniqueness of suspected unique identifiers using the 'search_file' tool.
+    always verify the uniqueness of suspected unique identifiers using the 'verify_unique_column' tool.
 
     General guidance for identifying a node or a relationship:
     - If the file name is singular and has only 1 unique identifier it is likely a node
@@ -56,11 +57,17 @@ proposal_agent_prompt = """
     Prepare for the task:
     - get the user goal using the 'approve_perceived_user_goal' tool
     - get the list of approved files using the 'approve_suggested_files' tool
-    - get the current construction plan using the 'get_proposed_construction_plan' tool
+    - get the current construction plan using the 'get_proposed_construction_plan' tool.
+      The first plan is a draft derived from the unique identifiers and references found in the approved files.
+      Review and refine it rather than starting over; its relationship types are placeholders to rename.
+      The 'discover_keys_and_references' tool shows the evidence behind the draft.
+
+    Each tool call takes time. Prefer the batched 'sample_files' and 'search_files' tools to look at
+    several files or check several identifiers in a single call.
 
     Think carefully, using tools to perform actions and reconsidering your actions when a tool returns an error:
-    1. For each approved file, consider whether it represents a node or relationship. Check the content for potential unique identifiers using the 'sample_file' tool.
-    2. For each identifier, verify that it is unique by using the 'search_file' tool.
+    1. For each approved file, consider whether it represents a node or relationship. Use the 'profile_file' tool to see its columns, types and potential unique identifiers in one call, and the 'sample_file' tool if you need to see actual rows.
+    2. For each identifier, verify that it is unique using the 'verify_unique_column' tool. For a suspected reference, verify that its values exist in the referenced node file using the 'verify_column_references' tool.
     3. Use the node vs relationship guidance for deciding whether the file represents a node or a relationship.
     4. For a node file, propose a node construction using the 'propose_node_construction' tool. 
     5. If the node contains a reference relationship, use the 'propose_relationship_construction' tool to propose a relationship construction. 
@@ -69,7 +76,7 @@ proposal_agent_prompt = """
     8. When you are done with construction proposals, use the 'get_proposed_construction_plan' tool to present the plan to the user
 """
 
-llm = LiteLlm(model="gemini/gemini-2.5-flash")
+llm = CachingLiteLlm(model="gemini/gemini-2.5-flash")
 
 # a helper function to log the agent name during execution
 def log_agent(callback_context: CallbackContext) -> None:
@@ -88,11 +95,17 @@ critic_agent_prompt = """
     You are an expert at knowledge graph modeling with property graphs. 
     Criticize the proposed schema for relevance to the user goal and approved files
     
+    The plan has already passed structural checks: every relationship connects nodes in the plan,
+    every referenced column exists, no two relationships duplicate each other's columns, and the graph is connected.
+    Focus on semantic review.
+
     Criticize the proposed schema for relevance and correctness:
-    - Are unique identifiers actually unique? Use the 'search_file' tool to validate. Composite identifier are not acceptable.
-    - Could any nodes be relationships instead? Double-check that unique identifiers are unique and not references to other nodes. Use the 'search_file' tool to validate
+    - Are unique identifiers actually unique? Use the 'verify_unique_column' tool to validate. Composite identifier are not acceptable.
+    - Could any nodes be relationships instead? Double-check that unique identifiers are unique and not references to other nodes.
+      Use the 'verify_column_references' tool to check whether a column references the identifiers of another file,
+      and the 'search_file' tool with a column-scoped query like "assembly_id=A-1062" to look at individual rows
     - Can you manually trace through the source data to find the necessary information for anwering a hypothetical question?
-    - Is every node in the schema connected? What relationships could be missing? Every node should connect to at least one other node.
+    - What relationships could be missing? Connectivity is already checked, but a connected graph may still lack relationships the user goal needs.
     - Are hierarchical container relationships missing? 
     - Are any relationships redundant? A relationship between two nodes is redundant if it is semantically equivalent to or the inverse of another relationship between those two nodes.
     
@@ -100,7 +113,8 @@ critic_agent_prompt = """
     - get the user goal using the 'approve_perceived_user_goal' tool
     - get the list of approved files using the 'approve_suggested_files' tool
     - get the construction plan using the 'get_proposed_construction_plan' tool
-    - use the 'sample_file' and 'search_file' tools to validate the schema design
+    - use the 'profile_file', 'sample_file', 'search_file', 'verify_unique_column' and 'verify_column_references' tools to validate the schema design,
+      or their batched variants 'sample_files' and 'search_files' to check several files in one call
 
     Think carefully, using tools to perform actions and reconsidering your actions when a tool returns an error:
     1. Analyze each construction rule in the proposed construction plan.
@@ -123,8 +137,13 @@ schema_refinement_loop = LoopAgent(
     name="schema_refinement_loop",
     description="Analyzes approved files to propose a schema based on user intent and feedback",
     max_iterations=3,
-    sub_agents=[schema_proposal_agent, schema_critic_agent, CheckStatusAndEscalate(name="StopChecker")],
-    before_agent_callback=log_agent
+    sub_agents=[
+        schema_proposal_agent,
+        ValidateThenCritique(name="PlanValidator", critic=schema_critic_agent),
+        CheckStatusAndEscalate(name="StopChecker")
+    ],
+    before_agent_callback=[log_agent, seed_construction_plan, reset_refinement_progress],
+    after_agent_callback=record_refinement_stop
 )
 
 schema_proposal_coordinator_instruction = """
@@ -134,6 +153,8 @@ schema_proposal_coordinator_instruction = """
     When the schema approval has been recorded, use the 'finished' tool.
 
     Guidance for tool use:
+    - First use the 'get_cached_construction_plan' tool. If it finds a plan approved earlier for the same goal and files,
+      present that plan to the user for approval right away, and only use the refinement loop if they disapprove.
     - Use the 'schema_refinement_loop' tool to produce or update a proposed schema with construction rules. 
     - Use the 'get_proposed_schema' tool to get the proposed schema
     - Use the 'get_proposed_construction_plan' tool to get the construction rules for transforming approved files into the schema
@@ -148,12 +169,13 @@ schema_proposal_coordinator = LlmAgent(
     name="schema_proposal_coordinator",
     model=llm,
     instruction=schema_proposal_coordinator_instruction,
-    tools=[
+    tools=govern_tools([
         refinement_loop_as_tool, 
+        get_cached_construction_plan,
         get_proposed_construction_plan, 
         approve_proposed_construction_plan,
         get_proposed_schema
-    ], 
+    ]), 
     before_agent_callback=initialize_feedback
 )
 
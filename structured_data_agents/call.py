@@ -1,9 +1,11 @@
 import asyncio
+import sys
+from typing import Optional
 from main_call import make_agent_caller
 from structured_data_agents.agent import schema_proposal_coordinator
 
-async def main():
-    structured_schema_proposal_caller = await make_agent_caller(schema_proposal_coordinator, {
+# state of the earlier stages, used when no earlier session is continued
+DEFAULT_STATE = {
     "feedback": "",
     "approved_user_goal": {
         "kind_of_graph": "supply chain analysis",
@@ -16,7 +18,12 @@ async def main():
         'products.csv', 
         'suppliers.csv'
     ]
-    })
+}
+
+async def main(session_id: Optional[str] = None):
+    # continue the session of the file suggestion stage if given, otherwise start from the default state
+    structured_schema_proposal_caller = await make_agent_caller(
+        schema_proposal_coordinator, {"feedback": ""} if session_id else DEFAULT_STATE, session_id=session_id)
     
     # Run the Initial Conversation
     await structured_schema_proposal_caller.call("How can these files be imported?")
@@ -29,7 +36,11 @@ async def main():
 
     session_end = await structured_schema_proposal_caller.get_session()
 
-    print("Approved construction plan: ", session_end.state['approved_user_goal'])
+    print("Approved construction plan: ", session_end.state.get('approved_construction_plan'))
+    return structured_schema_proposal_caller
         
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # usage: python -m structured_data_agents.call [session_id]
+    session_end = asyncio.run(main(*sys.argv[1:2]))
+    session = asyncio.run(session_end.get_session())
+    print(f"Continue with: python -m unstructured_data_agents.call {session.id}")
\ No newline at end of file
@@ -0,0 +1,254 @@
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from file_suggestion_agent.readers import iter_records, record_format
+from structured_data_agents.profiler import NULL_VALUES, get_profile
+
+# distinct values per column checked against the key sketches of other files
+SAMPLE_DISTINCT = 10000
+# beyond the profiler's exact limit, a column counts as unique if its estimated distinct count is this close to the row count
+APPROXIMATE_UNIQUE_RATIO = 0.98
+
+
+class BloomFilter:
+    """A set membership sketch with no false negatives and a configurable false positive rate."""
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.num_bits = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, value: str) -> List[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        # double hashing: h1 + i * h2 gives num_hashes independent enough positions
+        h1, h2 = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def label_for_file(file_path: str) -> str:
+    """A node label from a file name, singular and in PascalCase, for example 'assemblies.csv' -> 'Assembly'."""
+    stem = Path(file_path).name.split(".")[0]
+    words = [w for w in re.split(r"[^A-Za-z0-9]+", stem) if w]
+    if not words:
+        return "Node"
+    last = words[-1].lower()
+    if last.endswith("ies"):
+        last = last[:-3] + "y"
+    elif re.search(r"(ss|x|ch|sh)es$", last):
+        last = last[:-2]
+    elif last.endswith("s") and not last.endswith("ss"):
+        last = last[:-1]
+    words[-1] = last
+    return "".join(w[:1].upper() + w[1:] for w in words)
+
+
+def _is_id_like(column: str) -> bool:
+    return bool(re.search(r"(^|_|\b)id$|Id$|ID$|_key$|_code$", column))
+
+
+def candidate_keys(profile: Dict[str, Any]) -> List[str]:
+    """Columns of a profiled file which could be its unique identifier, most likely first."""
+    row_count = profile["row_count"]
+    candidates = []
+    for position, column in enumerate(profile["columns"]):
+        if row_count == 0 or column["null_ratio"] > 0:
+            continue
+        unique = column["unique"]
+        if unique is None:
+            unique = column["distinct_count"] >= APPROXIMATE_UNIQUE_RATIO * row_count
+        if unique and column["inferred_type"] in ("string", "integer"):
+            candidates.append((not _is_id_like(column["name"]), position, column["name"]))
+    return [name for _, _, name in sorted(candidates)]
+
+
+def _column_samples(full_path: str, columns: List[str]) -> Dict[str, set]:
+    """Up to SAMPLE_DISTINCT distinct non-null values per column, in one streaming pass."""
+    samples = {column: set() for column in columns}
+    open_columns = set(columns)
+    for record in iter_records(full_path, columns=columns):
+        for column in list(open_columns):
+            value = record.get(column)
+            if value is None:
+                continue
+            value = str(value).strip()
+            if value.lower() in NULL_VALUES:
+                continue
+            samples[column].add(value)
+            if len(samples[column]) >= SAMPLE_DISTINCT:
+                open_columns.discard(column)
+        if not open_columns:
+            break
+    return samples
+
+
+def discover_keys_and_references(import_dir: str, file_paths: List[str]) -> Dict[str, Any]:
+    """Finds the candidate keys of each file and the inclusion dependencies between files.
+
+    A file's key candidates are its unique, non-null columns. Each key gets a Bloom filter of
+    its values. Every other column is then checked by testing a sample of its distinct values
+    against the key filters of the other files: a column is included in a key if every sampled
+    value is in the filter. Filters have no false negatives, so a real reference is never missed;
+    values beyond the sample are not checked, which use 'verify_column_references' to confirm.
+
+    Returns:
+        Dict[str, Any]: 'keys' mapping each file to 'key' (the most likely key, or None) and
+            'candidates', 'inclusions' as a list of {file, column, referenced_file, referenced_column},
+            and 'skipped_files' which are not record files.
+    """
+    import_dir = Path(import_dir)
+    profiles, skipped = {}, []
+    for file_path in file_paths:
+        if record_format(file_path) == "text":
+            skipped.append(file_path)
+            continue
+        profiles[file_path] = get_profile(str(import_dir / file_path))
+
+    keys, filters, types = {}, {}, {}
+    for file_path, profile in profiles.items():
+        candidates = candidate_keys(profile)
+        keys[file_path] = {"key": candidates[0] if candidates else None, "candidates": candidates}
+        types[file_path] = {column["name"]: column["inferred_type"] for column in profile["columns"]}
+        if candidates:
+            key = candidates[0]
+            bloom = BloomFilter(profile["row_count"])
+            for record in iter_records(str(import_dir / file_path), columns=[key]):
+                if record.get(key) is not None:
+                    bloom.add(str(record.get(key)).strip())
+            filters[file_path] = (key, bloom)
+
+    inclusions = []
+    for file_path, profile in profiles.items():
+        own_key = keys[file_path]["key"]
+        columns = [c["name"] for c in profile["columns"]
+                   if c["name"] != own_key and c["inferred_type"] in ("string", "integer")]
+        if not columns:
+            continue
+        samples = _column_samples(str(import_dir / file_path), columns)
+        for column, values in samples.items():
+            if not values:
+                continue
+            for referenced_file, (referenced_key, bloom) in filters.items():
+                if referenced_file == file_path and referenced_key == column:
+                    continue
+                if types[file_path][column] != types[referenced_file][referenced_key]:
+                    continue
+                if all(value in bloom for value in values):
+                    inclusions.append({
+                        "file": file_path,
+                        "column": column,
+                        "referenced_file": referenced_file,
+                        "referenced_column": referenced_key,
+                    })
+    return {"keys": keys, "inclusions": inclusions, "skipped_files": skipped}
+
+
+def draft_construction_plan(discovery: Dict[str, Any], import_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Drafts a construction plan from discovered keys and references, in the shape of the proposed construction plan.
+
+    Files with a key become nodes. A node file column which references another node's key,
+    under the same column name, becomes a reference relationship. A file without a key which
+    references two node keys becomes a full relationship. Relationship types are placeholders
+    for the proposal agent to refine.
+    """
+    keys = discovery["keys"]
+    node_files = {f: k["key"] for f, k in keys.items() if k["key"]}
+    labels = {f: label_for_file(f) for f in node_files}
+    # the import matches target nodes on the referencing column name, so only same-name references are usable
+    references: Dict[str, List[Dict[str, str]]] = {}
+    for inclusion in discovery["inclusions"]:
+        if inclusion["referenced_file"] in node_files and inclusion["column"] == inclusion["referenced_column"]:
+            references.setdefault(inclusion["file"], []).append(inclusion)
+
+    plan: Dict[str, Dict[str, Any]] = {}
+    columns_of = {}
+    for file_path in keys:
+        profile = get_profile(str(Path(import_dir) / file_path))
+        columns_of[file_path] = [c["name"] for c in profile["columns"]]
+
+    def add_relationship(rule: Dict[str, Any]) -> None:
+        relationship_type = rule["relationship_type"]
+        if relationship_type in plan:
+            relationship_type = f"{rule['from_node_label'].upper()}_{relationship_type}"
+            rule["relationship_type"] = relationship_type
+        plan[relationship_type] = rule
+
+    for file_path, key in node_files.items():
+        reference_columns = {r["column"] for r in references.get(file_path, [])}
+        plan[labels[file_path]] = {
+            "construction_type": "node",
+            "source_file": file_path,
+            "label": labels[file_path],
+            "unique_column_name": key,
+            "properties": [c for c in columns_of[file_path] if c != key and c not in reference_columns],
+        }
+
+    for file_path, file_references in references.items():
+        if file_path in node_files:
+            for reference in file_references:
+                to_label = labels[reference["referenced_file"]]
+                add_relationship({
+                    "construction_type": "relationship",
+                    "source_file": file_path,
+                    "relationship_type": f"BELONGS_TO_{to_label.upper()}",
+                    "from_node_label": labels[file_path],
+                    "from_node_column": node_files[file_path],
+                    "to_node_label": to_label,
+                    "to_node_column": reference["column"],
+                    "properties": [],
+                })
+        elif len(file_references) >= 2:
+            source, target = file_references[0], file_references[1]
+            # columns repeated from either node file are already node properties
+            node_columns = set(columns_of[source["referenced_file"]]) | set(columns_of[target["referenced_file"]])
+            to_label = labels[target["referenced_file"]]
+            add_relationship({
+                "construction_type": "relationship",
+                "source_file": file_path,
+                "relationship_type": f"HAS_{to_label.upper()}",
+                "from_node_label": labels[source["referenced_file"]],
+                "from_node_column": source["column"],
+                "to_node_label": to_label,
+                "to_node_column": target["column"],
+                "properties": [c for c in columns_of[file_path] if c not in node_columns],
+            })
+    return plan
+
+
+_discoveries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_discoveries_lock = threading.Lock()
+# as many as search indexes are kept; each key is a set of file versions, older ones are not looked up again
+MAX_DISCOVERIES = 16
+
+def get_discovery(import_dir: str, file_paths: List[str]) -> Dict[str, Any]:
+    """Discovers keys and references and drafts a plan, cached by the versions of all files."""
+    versions = []
+    for file_path in sorted(file_paths):
+        stat = os.stat(Path(import_dir) / file_path)
+        versions.append((file_path, stat.st_mtime_ns, stat.st_size))
+    key = (str(import_dir), tuple(versions))
+    with _discoveries_lock:
+        if key in _discoveries:
+            _discoveries.move_to_end(key)
+            return _discoveries[key]
+    discovery = discover_keys_and_references(import_dir, file_paths)
+    discovery["draft_plan"] = draft_construction_plan(discovery, import_dir)
+    with _discoveries_lock:
+        _discoveries[key] = discovery
+        if len(_discoveries) > MAX_DISCOVERIES:
+            _discoveries.popitem(last=False)
+    return discovery
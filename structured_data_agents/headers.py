@@ -0,0 +1,124 @@
+import csv
+import difflib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from neo4j_for_adk import get_neo4j_import_dir
+from file_suggestion_agent.readers import open_text, read_header, record_format
+
+
+def _parse_header(full_path: str) -> Dict[str, Any]:
+    """Reads the column names of a file, and for CSV and TSV files also the dialect."""
+    file_format = record_format(full_path)
+    if file_format not in ("csv", "tsv"):
+        return {"columns": read_header(full_path), "delimiter": None, "quotechar": None}
+    with open_text(full_path) as file:
+        sample = file.read(64 * 1024)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel_tab if file_format == "tsv" else csv.excel
+    columns = next(csv.reader(sample.splitlines(), dialect), [])
+    if columns:
+        # a byte order mark would otherwise stick to the first column name
+        columns[0] = columns[0].lstrip("\ufeff")
+    return {
+        "columns": [column.strip() for column in columns],
+        "delimiter": dialect.delimiter,
+        "quotechar": dialect.quotechar,
+    }
+
+
+_headers: Dict[str, Dict[str, Any]] = {}
+_headers_lock = threading.Lock()
+
+def get_header(full_path: str) -> Dict[str, Any]:
+    """Gets the header of a file, parsed once per file version.
+
+    This is the one place the CSV dialect of a file is decided: the readers, the profiler,
+    the integrity checks, the search index and the import all read CSV and TSV files with
+    the delimiter and quote character recorded here, and the columns named here.
+
+    Returns:
+        Dict[str, Any]: 'columns', and 'delimiter' and 'quotechar' of the sniffed CSV dialect
+            (None for JSONL and Parquet files)
+
+    Raises:
+        FileNotFoundError: if the file does not exist
+    """
+    full_path = str(full_path)
+    stat = os.stat(full_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _headers_lock:
+        cached = _headers.get(full_path)
+    if cached is None or cached["version"] != version:
+        cached = {"version": version, **_parse_header(full_path)}
+        with _headers_lock:
+            _headers[full_path] = cached
+    return cached
+
+def get_file_header(file_path: str) -> Dict[str, Any]:
+    """Gets the header of a file relative to the import directory, see get_header."""
+    return get_header(str(Path(get_neo4j_import_dir()) / file_path))
+
+
+def suggest_columns(column: str, columns: List[str], n: int = 3) -> List[str]:
+    """Column names close to a misspelled one, case-insensitive matches first."""
+    same_case = [c for c in columns if c.lower() == column.lower()]
+    by_lower = {c.lower(): c for c in columns}
+    close = [by_lower[c] for c in difflib.get_close_matches(column.lower(), list(by_lower), n=n, cutoff=0.6)]
+    return list(dict.fromkeys(same_case + close))[:n]
+
+
+def check_columns(file_path: str, columns: Dict[str, Any]) -> Optional[str]:
+    """Checks that a file has the columns a construction rule refers to.
+
+    Args:
+        file_path: file relative to the import directory
+        columns: the columns to check by their role in the rule, for example
+            {"unique": "part_id", "property": ["part_name", "quantity"]}
+
+    Returns:
+        None if all columns exist, otherwise an error message naming each missing
+        column with close matches and the columns of the file.
+    """
+    try:
+        header = get_file_header(file_path)
+    except FileNotFoundError:
+        return f"File does not exist: {file_path}"
+    except Exception as e:
+        return f"Could not read the header of {file_path}: {e}"
+
+    known = header["columns"]
+    problems = []
+    for role, names in columns.items():
+        for name in ([names] if isinstance(names, str) else names):
+            if name in known:
+                continue
+            suggestions = suggest_columns(name, known)
+            hint = f" Did you mean {' or '.join(repr(s) for s in suggestions)}?" if suggestions else ""
+            problems.append(f"{file_path} does not have the {role} column '{name}'.{hint}")
+    if not problems:
+        return None
+    return " ".join(problems) + f" The columns of {file_path} are: {', '.join(known)}."
+
+
+def check_plan_columns(construction_plan: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Checks every column reference of a construction plan against the headers of its source files.
+
+    Returns:
+        Dict[str, str]: an error message for each construction rule with missing columns
+    """
+    errors = {}
+    for key, rule in construction_plan.items():
+        if rule.get("construction_type") == "node":
+            columns = {"unique": rule.get("unique_column_name", ""), "property": rule.get("properties", [])}
+        else:
+            columns = {"from node": rule.get("from_node_column", ""), "to node": rule.get("to_node_column", ""),
+                       "property": rule.get("properties", [])}
+        error = check_columns(rule.get("source_file", ""), columns)
+        if error:
+            errors[key] = error
+    return errors
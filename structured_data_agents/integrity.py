@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterator, Optional, Set
+
+from file_suggestion_agent.readers import iter_records
+from structured_data_agents.profiler import NULL_VALUES
+
+
+def iter_column_values(full_path: str, column: str) -> Iterator[Optional[str]]:
+    """Streams the values of one column as stripped strings, with None for null values."""
+    for record in iter_records(full_path, columns=[column]):
+        value = record.get(column)
+        if value is None:
+            yield None
+            continue
+        value = str(value).strip()
+        yield None if value.lower() in NULL_VALUES else value
+
+
+def check_uniqueness(full_path: str, column: str, max_examples: int = 5) -> Dict[str, Any]:
+    """Checks exactly whether a column is unique, in one pass with a hash set of the values seen.
+
+    Returns:
+        Dict[str, Any]: 'unique', 'row_count', 'null_count', 'distinct_count',
+            'duplicate_count' (rows repeating a value seen before), 'duplicated_values'
+            (distinct values occurring more than once) and up to max_examples
+            '[value, occurrences]' pairs of the most repeated values
+    """
+    seen: Set[str] = set()
+    # only repeated values are counted, so memory beyond the set stays small for near-unique columns
+    repeats: Counter = Counter()
+    row_count = null_count = 0
+    for value in iter_column_values(full_path, column):
+        row_count += 1
+        if value is None:
+            null_count += 1
+        elif value in seen:
+            repeats[value] += 1
+        else:
+            seen.add(value)
+    duplicate_count = sum(repeats.values())
+    return {
+        "unique": duplicate_count == 0 and null_count == 0,
+        "row_count": row_count,
+        "null_count": null_count,
+        "distinct_count": len(seen),
+        "duplicate_count": duplicate_count,
+        "duplicated_values": len(repeats),
+        "examples": [[value, count + 1] for value, count in repeats.most_common(max_examples)],
+    }
+
+
+def distinct_values(full_path: str, column: str) -> Set[str]:
+    """The set of distinct non-null values of a column."""
+    return {value for value in iter_column_values(full_path, column) if value is not None}
+
+
+def check_inclusion(full_path: str, column: str, referenced_path: str, referenced_column: str,
+                    max_examples: int = 5) -> Dict[str, Any]:
+    """Checks the inclusion dependency column ⊆ referenced_column: every non-null value of the
+    column must occur in the referenced column, as a foreign key references a key.
+
+    Returns:
+        Dict[str, Any]: 'holds', 'row_count', 'null_count', 'distinct_count', 'referenced_distinct_count',
+            'missing_count' (rows whose value is not referenced), 'missing_distinct' and
+            up to max_examples missing values
+    """
+    referenced = distinct_values(referenced_path, referenced_column)
+    row_count = null_count = missing_count = 0
+    present: Set[str] = set()
+    missing: Counter = Counter()
+    for value in iter_column_values(full_path, column):
+        row_count += 1
+        if value is None:
+            null_count += 1
+        elif value in referenced:
+            present.add(value)
+        else:
+            missing_count += 1
+            missing[value] += 1
+    return {
+        "holds": missing_count == 0,
+        "row_count": row_count,
+        "null_count": null_count,
+        "distinct_count": len(present) + len(missing),
+        "referenced_distinct_count": len(referenced),
+        "missing_count": missing_count,
+        "missing_distinct": len(missing),
+        "examples": [value for value, _ in missing.most_common(max_examples)],
+    }
+
+
+def file_version(full_path: str) -> tuple:
+    stat = os.stat(full_path)
+    return (str(full_path), stat.st_mtime_ns, stat.st_size)
+
+_results: Dict[tuple, Dict[str, Any]] = {}
+_results_lock = threading.Lock()
+MAX_CACHED_RESULTS = 512
+
+def _cached(key: tuple, compute) -> Dict[str, Any]:
+    with _results_lock:
+        if key in _results:
+            return _results[key]
+    result = compute()
+    with _results_lock:
+        _results[key] = result
+        if len(_results) > MAX_CACHED_RESULTS:
+            # results of older file versions are never looked up again, drop the oldest
+            del _results[next(iter(_results))]
+    return result
+
+def get_uniqueness(full_path: str, column: str, max_examples: int = 5) -> Dict[str, Any]:
+    """check_uniqueness, cached per file version."""
+    key = ("unique", file_version(full_path), column, max_examples)
+    return _cached(key, lambda: check_uniqueness(full_path, column, max_examples))
+
+def get_inclusion(full_path: str, column: str, referenced_path: str, referenced_column: str,
+                  max_examples: int = 5) -> Dict[str, Any]:
+    """check_inclusion, cached per version of both files."""
+    key = ("inclusion", file_version(full_path), column, file_version(referenced_path), referenced_column, max_examples)
+    return _cached(key, lambda: check_inclusion(full_path, column, referenced_path, referenced_column, max_examples))
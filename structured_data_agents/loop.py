@@ -1,10 +1,103 @@
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
 from google.adk.events import Event, EventActions
-from typing import AsyncGenerator
+from google.genai import types
+from typing import AsyncGenerator, Dict
+import hashlib
+import json
+import threading
+
+from indent_agent.tools import APPROVED_USER_GOAL
+from file_suggestion_agent.tools import APPROVED_FILES
+from structured_data_agents.tools import PROPOSED_CONSTRUCTION_PLAN
+from structured_data_agents.validation import validate_construction_plan
+from structured_data_agents.plans import plan_hash, file_versions
+
+# state keys describing the progress of the refinement loop
+REFINEMENT_ITERATIONS = "refinement_iterations"
+REFINEMENT_STOP_REASON = "refinement_stop_reason"
+CHECKED_PLAN_HASH = "checked_plan_hash"
+
+# critic verdicts by plan hash, user goal and approved file versions
+_verdicts: Dict[str, str] = {}
+_verdicts_lock = threading.Lock()
+MAX_VERDICTS = 1024
+
+def verdict_key(state) -> str:
+    key = json.dumps([
+        plan_hash(state.get(PROPOSED_CONSTRUCTION_PLAN, {})),
+        state.get(APPROVED_USER_GOAL),
+        file_versions(state.get(APPROVED_FILES, []))
+    ], sort_keys=True, default=str)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def _feedback_event(agent: BaseAgent, ctx: InvocationContext, feedback: str) -> Event:
+    return Event(
+        author=agent.name,
+        invocation_id=ctx.invocation_id,
+        branch=ctx.branch,
+        content=types.Content(role="model", parts=[types.Part(text=feedback)]),
+        actions=EventActions(state_delta={"feedback": feedback})
+    )
 
 class CheckStatusAndEscalate(BaseAgent):
     async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
-        feedback = ctx.session.state.get("feedback", "valid")
-        should_stop = (feedback == "valid")
-        yield Event(author=self.name, actions=EventActions(escalate=should_stop))
\ No newline at end of file
+        state = ctx.session.state
+        feedback = state.get("feedback", "valid")
+        current_hash = plan_hash(state.get(PROPOSED_CONSTRUCTION_PLAN, {}))
+        iterations = state.get(REFINEMENT_ITERATIONS, 0) + 1
+
+        stop_reason = None
+        if feedback == "valid":
+            stop_reason = "valid"
+        elif state.get(CHECKED_PLAN_HASH) == current_hash:
+            # the proposal agent did not change the plan after feedback, another round would not either
+            stop_reason = "plan_unchanged"
+        state_delta = {REFINEMENT_ITERATIONS: iterations, CHECKED_PLAN_HASH: current_hash}
+        if stop_reason:
+            state_delta[REFINEMENT_STOP_REASON] = stop_reason
+        yield Event(author=self.name, actions=EventActions(escalate=stop_reason is not None, state_delta=state_delta))
+
+# Structural problems of the plan are found in code, and reported as the critic's feedback
+# without calling the critic. The critic only runs on structurally valid plans, for semantic review.
+# A plan the critic already reviewed, for the same goal and files, gets the same verdict again.
+class ValidateThenCritique(BaseAgent):
+    critic: BaseAgent
+
+    def __init__(self, name: str, critic: BaseAgent):
+        super().__init__(name=name, critic=critic, sub_agents=[critic])
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        construction_plan = ctx.session.state.get(PROPOSED_CONSTRUCTION_PLAN, {})
+        problems = validate_construction_plan(construction_plan)
+        if problems:
+            yield _feedback_event(self, ctx, "retry\n" + "\n".join(f"- {problem}" for problem in problems))
+            return
+
+        key = verdict_key(ctx.session.state)
+        with _verdicts_lock:
+            cached = _verdicts.get(key)
+        if cached is not None:
+            yield _feedback_event(self, ctx, cached)
+            return
+
+        async for event in self.critic.run_async(ctx):
+            yield event
+        feedback = ctx.session.state.get("feedback")
+        if feedback:
+            with _verdicts_lock:
+                _verdicts[key] = feedback
+                if len(_verdicts) > MAX_VERDICTS:
+                    del _verdicts[next(iter(_verdicts))]
+
+# reset the loop progress when the refinement loop starts
+def reset_refinement_progress(callback_context: CallbackContext) -> None:
+    callback_context.state[REFINEMENT_ITERATIONS] = 0
+    callback_context.state[REFINEMENT_STOP_REASON] = ""
+    callback_context.state[CHECKED_PLAN_HASH] = ""
+
+# a loop which ran out of iterations has no stop reason yet
+def record_refinement_stop(callback_context: CallbackContext) -> None:
+    if not callback_context.state.get(REFINEMENT_STOP_REASON):
+        callback_context.state[REFINEMENT_STOP_REASON] = "max_iterations"
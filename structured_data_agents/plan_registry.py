@@ -0,0 +1,176 @@
+import difflib
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from neo4j_for_adk import get_cache_dir, get_neo4j_import_dir
+from file_suggestion_agent.readers import iter_records, record_format
+from structured_data_agents.headers import get_file_header
+from structured_data_agents.plans import plan_hash
+from structured_data_agents.profiler import NULL_VALUES, infer_type, _widen
+
+logger = logging.getLogger(__name__)
+
+# a version which can not be read or checked: missing or corrupt JSON, or a record without the expected fields
+UNREADABLE_VERSION_ERRORS = (OSError, ValueError, KeyError, TypeError)
+
+# records read to infer column types for a fingerprint
+FINGERPRINT_SAMPLE_RECORDS = 1000
+
+
+def normalize_goal(goal: Optional[Dict[str, Any]]) -> str:
+    """The user goal as lowercase text with collapsed whitespace, so rephrased spacing or case hits the same plans."""
+    if not goal:
+        return ""
+    text = " | ".join(str(goal[key]) for key in sorted(goal))
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def schema_fingerprint(file_path: str) -> str:
+    """A fingerprint of the schema of a file: its columns and their inferred types.
+
+    Types are inferred from the first records, so edits which keep the schema keep the fingerprint.
+    Text files are fingerprinted by content, since they have no schema.
+    """
+    full_path = Path(get_neo4j_import_dir()) / file_path
+    if record_format(file_path) == "text":
+        with open(full_path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()[:16]
+    columns = get_file_header(file_path)["columns"]
+    types: Dict[str, Optional[str]] = dict.fromkeys(columns)
+    for record in islice(iter_records(str(full_path), columns=columns), FINGERPRINT_SAMPLE_RECORDS):
+        for column in columns:
+            value = record.get(column)
+            if value is not None and str(value).strip().lower() not in NULL_VALUES:
+                types[column] = _widen(types[column], infer_type(str(value).strip()))
+    encoded = json.dumps([[column, types[column] or "empty"] for column in columns])
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+class PlanRegistry:
+    """An on-disk registry of approved construction plans.
+
+    Plans are registered under a normalized user goal and the approved file list. Each entry
+    directory holds numbered versions as indented, key-sorted JSON files, so versions can be
+    compared with 'diff'. Every version records the schema fingerprints of the files it was
+    approved for; an entry whose files changed schema since is stale and not returned by lookup,
+    but its versions are kept, and the next approved plan is saved as its next version.
+    """
+    def __init__(self, registry_dir: Optional[Path] = None):
+        self.registry_dir = Path(registry_dir) if registry_dir else get_cache_dir() / "plan_registry"
+        self.registry_dir.mkdir(parents=True, exist_ok=True)
+
+    def entry_dir(self, goal: Optional[Dict[str, Any]], file_paths: List[str]) -> Path:
+        key = json.dumps([normalize_goal(goal), sorted(file_paths)])
+        return self.registry_dir / hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    def versions(self, goal: Optional[Dict[str, Any]], file_paths: List[str]) -> List[Path]:
+        entry_dir = self.entry_dir(goal, file_paths)
+        if not entry_dir.exists():
+            return []
+        return sorted(entry_dir.glob("v*.json"))
+
+    def save(self, goal: Optional[Dict[str, Any]], file_paths: List[str],
+             construction_plan: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Saves a plan as a new version, unless it equals the latest version.
+
+        Returns:
+            Dict[str, Any]: the saved or unchanged latest version
+        """
+        latest = self.latest(goal, file_paths)
+        fingerprints = {file_path: schema_fingerprint(file_path) for file_path in sorted(file_paths)}
+        current_hash = plan_hash(construction_plan)
+        if latest and latest["plan_hash"] == current_hash and latest["fingerprints"] == fingerprints:
+            return latest
+
+        entry_dir = self.entry_dir(goal, file_paths)
+        entry_dir.mkdir(exist_ok=True)
+        version = (latest["version"] if latest else 0) + 1
+        record = {
+            "version": version,
+            "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "goal": goal,
+            "approved_files": sorted(file_paths),
+            "fingerprints": fingerprints,
+            "plan_hash": current_hash,
+            "construction_plan": construction_plan,
+        }
+        path = entry_dir / f"v{version:04d}.json"
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(record, file, indent=2, sort_keys=True)
+        os.replace(temporary, path)
+        return record
+
+    def latest(self, goal: Optional[Dict[str, Any]], file_paths: List[str]) -> Optional[Dict[str, Any]]:
+        """The latest version of the plan for a goal and files, without checking fingerprints."""
+        versions = self.versions(goal, file_paths)
+        if not versions:
+            return None
+        with open(versions[-1], encoding="utf-8") as file:
+            return json.load(file)
+
+    def lookup(self, goal: Optional[Dict[str, Any]], file_paths: List[str]) -> Optional[Dict[str, Any]]:
+        """The latest plan for a goal and files, if the file schemas still match. A stale entry is kept, but not returned.
+
+        A version which can not be read counts as a miss, so the caller plans again.
+        """
+        try:
+            latest = self.latest(goal, file_paths)
+            if latest is None or self.is_stale(latest):
+                return None
+            if not isinstance(latest["construction_plan"], dict):
+                raise ValueError("the construction plan is not a JSON object")
+            return latest
+        except UNREADABLE_VERSION_ERRORS as e:
+            logger.warning("Ignoring an unreadable plan registry entry for %s: %s", sorted(file_paths), e)
+            return None
+
+    def is_stale(self, record: Dict[str, Any]) -> bool:
+        """Whether the files of a saved version changed schema or disappeared since it was saved."""
+        try:
+            fingerprints = {file_path: schema_fingerprint(file_path) for file_path in record["approved_files"]}
+            return fingerprints != record["fingerprints"]
+        except UNREADABLE_VERSION_ERRORS:
+            return True
+
+    def diff(self, goal: Optional[Dict[str, Any]], file_paths: List[str], from_version: int, to_version: int) -> str:
+        """A unified diff between two versions of a plan."""
+        entry_dir = self.entry_dir(goal, file_paths)
+        texts = []
+        for version in (from_version, to_version):
+            with open(entry_dir / f"v{version:04d}.json", encoding="utf-8") as file:
+                texts.append(json.dumps(json.load(file)["construction_plan"], indent=2, sort_keys=True).splitlines(keepends=True))
+        return "".join(difflib.unified_diff(texts[0], texts[1], f"v{from_version}", f"v{to_version}"))
+
+    def stale_entries(self) -> List[Dict[str, Any]]:
+        """The latest versions of every entry whose files changed schema or disappeared."""
+        stale = []
+        for entry_dir in [d for d in self.registry_dir.iterdir() if d.is_dir()]:
+            versions = sorted(entry_dir.glob("v*.json"))
+            if not versions:
+                continue
+            try:
+                with open(versions[-1], encoding="utf-8") as file:
+                    latest = json.load(file)
+            except UNREADABLE_VERSION_ERRORS as e:
+                logger.warning("Skipping an unreadable plan registry version %s: %s", versions[-1], e)
+                continue
+            if self.is_stale(latest):
+                stale.append(latest)
+        return stale
+
+_registry: Optional[PlanRegistry] = None
+
+def get_plan_registry() -> PlanRegistry:
+    """Gets the shared plan registry in the cache directory."""
+    global _registry
+    if _registry is None:
+        _registry = PlanRegistry()
+    return _registry
@@ -0,0 +1,36 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+from neo4j_for_adk import get_neo4j_import_dir
+
+
+def canonical_plan(construction_plan: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """A construction plan in canonical form: property lists sorted, since their order has no meaning."""
+    canonical = {}
+    for key, rule in construction_plan.items():
+        rule = dict(rule)
+        if isinstance(rule.get("properties"), list):
+            rule["properties"] = sorted(rule["properties"])
+        canonical[key] = rule
+    return canonical
+
+def plan_hash(construction_plan: Dict[str, Dict[str, Any]]) -> str:
+    """A hash of a construction plan which is equal for plans differing only in key or property order."""
+    encoded = json.dumps(canonical_plan(construction_plan or {}), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def file_versions(file_paths: List[str]) -> List[List[Any]]:
+    """[path, mtime_ns, size] of each file relative to the import directory, sorted by path.
+    Missing files have a version of [path, None, None]."""
+    import_dir = Path(get_neo4j_import_dir())
+    versions = []
+    for file_path in sorted(file_paths or []):
+        try:
+            stat = os.stat(import_dir / file_path)
+            versions.append([file_path, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            versions.append([file_path, None, None])
+    return versions
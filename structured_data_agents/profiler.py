@@ -0,0 +1,237 @@
+import csv
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from async_tools import CANCEL_CHECK_INTERVAL, raise_if_cancelled
+from file_suggestion_agent.readers import csv_header, open_text, read_header, iter_records
+
+NULL_VALUES = {"", "null", "none", "nan", "n/a", "na"}
+BOOLEAN_VALUES = {"true", "false", "yes", "no"}
+_INTEGER = re.compile(r"^[+-]?\d+$")
+_FLOAT = re.compile(r"^[+-]?(\d+\.\d*|\.\d+|\d+)([eE][+-]?\d+)?$")
+
+
+class HyperLogLog:
+    """Approximate distinct counting in fixed memory (2**precision registers)."""
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = bytearray(self.num_registers)
+        # bias correction constant for m >= 128
+        self.alpha = 0.7213 / (1 + 1.079 / self.num_registers)
+
+    def add(self, value: str) -> None:
+        hashed = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        register = hashed >> (64 - self.precision)
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+        # position of the leftmost 1-bit in the remaining bits
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    def count(self) -> int:
+        estimate = self.alpha * self.num_registers ** 2 / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.num_registers and zeros:
+            # linear counting is more accurate for small cardinalities
+            estimate = self.num_registers * math.log(self.num_registers / zeros)
+        return int(round(estimate))
+
+
+class HeavyHitters:
+    """Misra-Gries summary of the most frequent values, in memory bounded by capacity."""
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counters: Dict[str, int] = {}
+
+    def add(self, value: str) -> None:
+        if value in self.counters:
+            self.counters[value] += 1
+        elif len(self.counters) < self.capacity:
+            self.counters[value] = 1
+        else:
+            for key in list(self.counters):
+                self.counters[key] -= 1
+                if self.counters[key] == 0:
+                    del self.counters[key]
+
+    def top(self, k: int) -> List[List[Any]]:
+        return [[value, count] for value, count in
+                sorted(self.counters.items(), key=lambda item: -item[1])[:k]]
+
+
+def infer_type(value: str) -> str:
+    """Infers the type of a single non-null value: integer, float, boolean, date or string."""
+    if _INTEGER.match(value):
+        return "integer"
+    if _FLOAT.match(value):
+        return "float"
+    if value.lower() in BOOLEAN_VALUES:
+        return "boolean"
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            date.fromisoformat(value)
+            return "date"
+        except ValueError:
+            pass
+    return "string"
+
+# the most specific type which covers both types
+def _widen(current: Optional[str], observed: str) -> str:
+    if current is None or current == observed:
+        return observed
+    if {current, observed} == {"integer", "float"}:
+        return "float"
+    return "string"
+
+
+class ColumnProfile:
+    """Statistics of one column, updated one value at a time."""
+    def __init__(self, name: str, max_exact_distinct: int, top_k: int):
+        self.name = name
+        self.max_exact_distinct = max_exact_distinct
+        self.top_k = top_k
+        self.count = 0
+        self.nulls = 0
+        self.inferred_type: Optional[str] = None
+        self.hll = HyperLogLog()
+        self.heavy_hitters = HeavyHitters(capacity=max(top_k * 10, 50))
+        self.distinct: Optional[set] = set()
+        self.duplicates = 0
+        self.min_number = self.max_number = None
+        self.min_text = self.max_text = None
+
+    def add(self, value: Optional[str]) -> None:
+        self.count += 1
+        if value is None or value.strip().lower() in NULL_VALUES:
+            self.nulls += 1
+            return
+        value = value.strip()
+        self.inferred_type = _widen(self.inferred_type, infer_type(value))
+        self.hll.add(value)
+        self.heavy_hitters.add(value)
+
+        if self.distinct is not None:
+            if value in self.distinct:
+                self.duplicates += 1
+            else:
+                self.distinct.add(value)
+                if len(self.distinct) > self.max_exact_distinct:
+                    # give up on exact distinct values to keep memory bounded
+                    self.distinct = None
+        elif self.duplicates == 0:
+            # past the exact limit, duplicates are only detected through the heavy hitters
+            if self.heavy_hitters.counters.get(value, 0) > 1:
+                self.duplicates = 1
+
+        if self.inferred_type in ("integer", "float"):
+            number = float(value)
+            self.min_number = number if self.min_number is None else min(self.min_number, number)
+            self.max_number = number if self.max_number is None else max(self.max_number, number)
+        self.min_text = value if self.min_text is None else min(self.min_text, value)
+        self.max_text = value if self.max_text is None else max(self.max_text, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        non_null = self.count - self.nulls
+        if self.distinct is not None:
+            distinct_count, exact = len(self.distinct), True
+            unique = non_null > 0 and self.duplicates == 0
+        else:
+            distinct_count, exact = self.hll.count(), False
+            # without the exact set, a column can only be shown not to be unique
+            unique = False if self.duplicates else None
+        numeric = self.inferred_type in ("integer", "float")
+        minimum = self.min_number if numeric else self.min_text
+        maximum = self.max_number if numeric else self.max_text
+        if numeric and self.inferred_type == "integer" and minimum is not None:
+            minimum, maximum = int(minimum), int(maximum)
+        return {
+            "name": self.name,
+            "inferred_type": self.inferred_type or "empty",
+            "null_ratio": round(self.nulls / self.count, 4) if self.count else 0.0,
+            "distinct_count": distinct_count,
+            "distinct_count_exact": exact,
+            "unique": unique,
+            "min": minimum,
+            "max": maximum,
+            "top_values": self.heavy_hitters.top(self.top_k),
+        }
+
+
+def profile_rows(header: List[str], rows, max_exact_distinct: int = 100000, top_k: int = 5) -> Dict[str, Any]:
+    """Profiles rows (lists of values aligned with header) in a single pass."""
+    columns = [ColumnProfile(name, max_exact_distinct, top_k) for name in header]
+    row_count = 0
+    for row in rows:
+        row_count += 1
+        if row_count % CANCEL_CHECK_INTERVAL == 0:
+            raise_if_cancelled()
+        for i, column in enumerate(columns):
+            column.add(row[i] if i < len(row) else None)
+    return {
+        "row_count": row_count,
+        "columns": [column.to_dict() for column in columns],
+    }
+
+def profile_csv(full_path: str, max_exact_distinct: int = 100000, top_k: int = 5) -> Dict[str, Any]:
+    """Profiles every column of a CSV file in a single streaming pass."""
+    header = csv_header(full_path)
+    with open_text(full_path) as file:
+        reader = csv.reader(file, delimiter=header["delimiter"], quotechar=header["quotechar"])
+        next(reader, None)
+        return profile_rows(header["columns"], reader, max_exact_distinct, top_k)
+
+
+def profile_records(full_path: str, max_exact_distinct: int = 100000, top_k: int = 5) -> Dict[str, Any]:
+    """Profiles every column of a compressed, JSONL or Parquet file in a single streaming pass."""
+    header = read_header(full_path)
+    rows = ([None if record.get(name) is None else str(record.get(name)) for name in header]
+            for record in iter_records(full_path))
+    return profile_rows(header, rows, max_exact_distinct, top_k)
+
+
+_profile_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_profile_lock = threading.Lock()
+# one lock per file, so concurrent profiles of the same file compute it once
+_profile_build_locks: Dict[str, threading.Lock] = {}
+MAX_CACHED_PROFILES = 64
+
+def _cached_profile(key: tuple) -> Optional[Dict[str, Any]]:
+    with _profile_lock:
+        if key in _profile_cache:
+            _profile_cache.move_to_end(key)
+            return _profile_cache[key]
+    return None
+
+def get_profile(full_path: str, max_exact_distinct: int = 100000, top_k: int = 5) -> Dict[str, Any]:
+    """Gets the profile of a file, cached by path, mtime and size."""
+    stat = os.stat(full_path)
+    key = (str(full_path), stat.st_mtime_ns, stat.st_size, max_exact_distinct, top_k)
+    profile = _cached_profile(key)
+    if profile is not None:
+        return profile
+    with _profile_lock:
+        build_lock = _profile_build_locks.setdefault(key[0], threading.Lock())
+    with build_lock:
+        # another thread may have profiled the file while this one waited
+        profile = _cached_profile(key)
+        if profile is not None:
+            return profile
+        if key[0].lower().endswith(".csv"):
+            profile = profile_csv(full_path, max_exact_distinct, top_k)
+        else:
+            profile = profile_records(full_path, max_exact_distinct, top_k)
+        with _profile_lock:
+            # drop profiles of older versions of the same file
+            for stale in [k for k in _profile_cache if k[0] == key[0] and k[1:3] != key[1:3]]:
+                del _profile_cache[stale]
+            _profile_cache[key] = profile
+            if len(_profile_cache) > MAX_CACHED_PROFILES:
+                _profile_cache.popitem(last=False)
+    return profile
@@ -0,0 +1,250 @@
+import csv
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from neo4j_for_adk import get_cache_dir
+from async_tools import raise_if_cancelled
+from file_suggestion_agent.readers import csv_header, iter_lines, record_format
+
+# matches kept per cached query; requests for more lines are recomputed
+CACHED_MATCHES = 1000
+
+_index_ids = itertools.count()
+
+
+class FileSearchIndex:
+    """A case-insensitive search index over one file.
+
+    Built once per file version: the file is streamed (decompressing or decoding
+    columnar formats as needed) into a lowercase copy and an original-case copy
+    in the cache directory, both memory-mapped, with a table of line start offsets.
+    A search is a C-level `mmap.find` over the lowercase copy instead of lowercasing
+    every line in Python, and results of repeated queries are served from an LRU cache.
+
+    Readers hold the index between acquire() and release(). An index evicted from the
+    cache is retired, and its maps and files are only closed once its last reader released it.
+    """
+    def __init__(self, full_path: str, version: Tuple[int, int]):
+        self.full_path = full_path
+        self.version = version
+        self.file_format = record_format(full_path)
+        self.dialect = csv_header(full_path) if self.file_format in ("csv", "tsv") else None
+        # an evicted index of the same file version may still be read, so every index has its own files
+        key = hashlib.sha1(f"{full_path}:{version}:{os.getpid()}:{next(_index_ids)}".encode("utf-8")).hexdigest()[:16]
+        index_dir = get_cache_dir() / "search_index"
+        index_dir.mkdir(exist_ok=True)
+        self.lower_path = index_dir / f"{key}.lower"
+        self.original_path = index_dir / f"{key}.original"
+
+        lower_offsets, original_offsets = [0], [0]
+        try:
+            with open(self.lower_path, "wb") as lower_file, open(self.original_path, "wb") as original_file:
+                for line in iter_lines(full_path):
+                    line = line.rstrip("\r\n")
+                    original = (line + "\n").encode("utf-8", "replace")
+                    # lowercasing may change the byte length, so each copy has its own offsets
+                    lower = (line.lower() + "\n").encode("utf-8", "replace")
+                    original_file.write(original)
+                    lower_file.write(lower)
+                    original_offsets.append(original_offsets[-1] + len(original))
+                    lower_offsets.append(lower_offsets[-1] + len(lower))
+                    if len(lower_offsets) % 65536 == 0:
+                        raise_if_cancelled()
+        except BaseException:
+            self._remove_files()
+            raise
+        self.line_count = len(lower_offsets) - 1
+        self.lower_offsets = np.asarray(lower_offsets, dtype=np.int64)
+        self.original_offsets = np.asarray(original_offsets, dtype=np.int64)
+
+        self.lower = self._map(self.lower_path)
+        self.original = self._map(self.original_path)
+        self.header = self.line(0) if self.line_count else ""
+        self.query_cache: "OrderedDict[tuple, Tuple[int, List[int]]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.readers = 0
+        self.retired = False
+        self.closed = False
+
+    @staticmethod
+    def _map(path) -> Optional[mmap.mmap]:
+        if os.path.getsize(path) == 0:
+            return None
+        with open(path, "rb") as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _remove_files(self) -> None:
+        for path in (self.lower_path, self.original_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        for mapped in (self.lower, self.original):
+            if mapped is not None:
+                mapped.close()
+        self._remove_files()
+
+    def acquire(self) -> None:
+        with self.lock:
+            self.readers += 1
+
+    def release(self) -> None:
+        with self.lock:
+            self.readers -= 1
+            close = self.retired and self.readers == 0
+        if close:
+            self.close()
+
+    def retire(self) -> None:
+        """Closes the index once no reader holds it any more."""
+        with self.lock:
+            self.retired = True
+            close = self.readers == 0
+        if close:
+            self.close()
+
+    def line(self, index: int) -> str:
+        """The original text of a line, by zero-based index."""
+        start, end = self.original_offsets[index], self.original_offsets[index + 1]
+        return self.original[start:end].decode("utf-8", "replace").rstrip("\n")
+
+    def columns(self) -> List[str]:
+        """Column names, from the CSV header or the keys of the first JSON line."""
+        if self.dialect is not None:
+            return list(self.dialect["columns"])
+        if self.file_format in ("jsonl", "parquet") and self.header:
+            try:
+                return list(json.loads(self.header))
+            except ValueError:
+                return []
+        return []
+
+    def _column_value(self, line: str, column: str, position: int) -> Optional[str]:
+        if self.dialect is not None:
+            row = next(csv.reader([line], delimiter=self.dialect["delimiter"], quotechar=self.dialect["quotechar"]), [])
+            return row[position] if position < len(row) else None
+        try:
+            value = json.loads(line).get(column)
+        except (ValueError, AttributeError):
+            return None
+        return None if value is None else str(value)
+
+    def _scan(self, query: str, column: str, limit: int) -> Tuple[int, List[int]]:
+        """Finds matching line indexes: the total count and up to limit indexes."""
+        if self.lower is None:
+            return 0, []
+        needle = query.lower().encode("utf-8")
+        position = -1
+        if column:
+            columns = self.columns()
+            if column not in columns:
+                raise KeyError(column)
+            position = columns.index(column)
+
+        total, matches, start = 0, [], 0
+        while True:
+            found = self.lower.find(needle, start)
+            if found < 0:
+                break
+            index = int(np.searchsorted(self.lower_offsets, found, side="right")) - 1
+            # continue after this line, so each line counts once
+            start = int(self.lower_offsets[index + 1])
+            if column:
+                # the header and lines where the value only appears in another column do not count
+                if index == 0:
+                    continue
+                value = self._column_value(self.line(index), column, position)
+                if value is None or value.strip().lower() != query.lower():
+                    continue
+            total += 1
+            if len(matches) < limit:
+                matches.append(index)
+            if total % 4096 == 0:
+                raise_if_cancelled()
+        return total, matches
+
+    def search(self, query: str, column: str = "", max_lines: int = 100) -> Tuple[int, List[Dict[str, Any]]]:
+        """Searches lines containing query, or, with a column, rows whose column equals query.
+
+        Returns:
+            the total number of matching lines and up to max_lines matches with
+            'line_number' (1-based) and 'content'
+        """
+        key = (query.lower(), column)
+        with self.lock:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                self.query_cache.move_to_end(key)
+        if cached is None or (len(cached[1]) < min(max_lines, cached[0])):
+            cached = self._scan(query, column, max(max_lines, CACHED_MATCHES))
+            with self.lock:
+                self.query_cache[key] = cached
+                if len(self.query_cache) > 256:
+                    self.query_cache.popitem(last=False)
+        total, indexes = cached
+        return total, [{"line_number": i + 1, "content": self.line(i).strip()} for i in indexes[:max_lines]]
+
+
+_indexes: "OrderedDict[str, FileSearchIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+# one lock per file, so builds of different files run in parallel and a file is only built once.
+# The locks are kept, as a search waiting on a dropped lock would start a second build.
+_build_locks: Dict[str, threading.Lock] = {}
+MAX_INDEXES = 16
+
+def _cached_index(full_path: str, version: Tuple[int, int]) -> Optional[FileSearchIndex]:
+    """The cached index of a file version, acquired for the caller. Call with _indexes_lock held."""
+    index = _indexes.get(full_path)
+    if index is None or index.version != version:
+        return None
+    _indexes.move_to_end(full_path)
+    index.acquire()
+    return index
+
+@contextmanager
+def get_search_index(full_path: str) -> Iterator[FileSearchIndex]:
+    """Gets the search index of a file, building it on first use or when the file changed.
+
+    The index is held until the with block ends, so it is not closed while it is searched.
+    Only searches of the same file wait for a build; other files are served meanwhile.
+    """
+    stat = os.stat(full_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _indexes_lock:
+        index = _cached_index(full_path, version)
+        if index is None:
+            build_lock = _build_locks.setdefault(full_path, threading.Lock())
+    if index is None:
+        with build_lock:
+            # another search may have built it while this one waited
+            with _indexes_lock:
+                index = _cached_index(full_path, version)
+            if index is None:
+                index = FileSearchIndex(full_path, version)
+                index.acquire()
+                with _indexes_lock:
+                    retired = [_indexes.pop(full_path)] if full_path in _indexes else []
+                    _indexes[full_path] = index
+                    while len(_indexes) > MAX_INDEXES:
+                        retired.append(_indexes.popitem(last=False)[1])
+                for old_index in retired:
+                    old_index.retire()
+    try:
+        yield index
+    finally:
+        index.release()
@@ -1,26 +1,47 @@
+import copy
+import logging
 from dotenv import load_dotenv
 from neo4j_for_adk import tool_success, tool_error, get_neo4j_import_dir
+from tool_budget import govern_tools
+from async_tools import offloaded, raise_if_cancelled
 from google.adk.tools.tool_context import ToolContext
 from pathlib import Path
 from google.adk.tools import ToolContext
-from file_suggestion_agent.tools import approve_suggested_files, sample_file
-from indent_agent.tools import approve_perceived_user_goal
+from file_suggestion_agent.tools import approve_suggested_files, sample_file, APPROVED_FILES
+from indent_agent.tools import approve_perceived_user_goal, APPROVED_USER_GOAL
 from google.adk.agents.callback_context import CallbackContext
+from structured_data_agents.profiler import get_profile
+from structured_data_agents.search_index import get_search_index
+from structured_data_agents.headers import check_columns, check_plan_columns
+from structured_data_agents.integrity import get_uniqueness, get_inclusion
+from structured_data_agents.discovery import get_discovery
+from structured_data_agents.plan_registry import get_plan_registry
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SEARCH_RESULTS = "search_results"
 
 # A simple grep-like tool for searching text files
-def search_file(file_path: str, query: str) -> dict:
+# Searches run against a per-file index (see search_index.py), built on the first search
+# of a file and rebuilt when the file changes, so repeated searches do not re-read the file.
+def search_file(file_path: str, query: str, column: str = "", max_lines: int = 100) -> dict:
     """
     Searches any text file (markdown, csv, txt) for lines containing the given query string.
     Simple grep-like functionality that works with any text file.
+    Gzip compressed files are searched as text, and Parquet files one row per line as JSON.
     Search is always case insensitive.
 
+    For CSV, TSV, JSONL and Parquet files, a search can be scoped to one column, either
+    with the 'column' argument or with a query like "assembly_id=A-1062". Only rows whose
+    value in that column equals the query value are returned.
+
     Args:
       file_path: Path to the file, relative to the Neo4j import directory.
-      query: The string to search for.
+      query: The string to search for, or "column=value" for a column-scoped search.
+      column: Optional column to scope the search to. Use "" to search whole lines.
+      max_lines: Maximum number of matching lines to return. 'lines_found' is always the full count.
 
     Returns:
         dict: A dictionary with 'status' ('success' or 'error').
@@ -43,25 +64,23 @@ def search_file(file_path: str, query: str) -> dict:
             "metadata": {
                 "path": file_path,
                 "query": query,
-                "lines_found": 0
+                "lines_found": 0,
+                "lines_returned": 0
             },
             "matching_lines": []
         })
 
-    matching_lines = []
-    search_query = query.lower()
-    
     try:
-        with open(p, 'r', encoding='utf-8') as file:
-            # Process the file line by line
-            for i, line in enumerate(file, 1):
-                line_to_check = line.lower()
-                if search_query in line_to_check:
-                    matching_lines.append({
-                        "line_number": i,
-                        "content": line.strip()  # Remove trailing newlines
-                    })
-                        
+        with get_search_index(str(p)) as index:
+            value = query
+            if not column and "=" in query:
+                # "column=value" is column-scoped only if the left side names a column of the file
+                name, _, scoped_value = query.partition("=")
+                if name.strip() in index.columns():
+                    column, value = name.strip(), scoped_value.strip()
+            if column and column not in index.columns():
+                return tool_error(f"Column '{column}' not found in {file_path}. Columns are: {index.columns()}")
+            lines_found, matching_lines = index.search(value, column, max(max_lines, 0))
     except Exception as e:
         return tool_error(f"Error reading or searching file {file_path}: {e}")
 
@@ -69,8 +88,12 @@ def search_file(file_path: str, query: str) -> dict:
     metadata = {
         "path": file_path,
         "query": query,
-        "lines_found": len(matching_lines)
+        "lines_found": lines_found,
+        "lines_returned": len(matching_lines)
     }
+    if column:
+        metadata["column"] = column
+        metadata["value"] = value
     
     result_data = {
         "metadata": metadata,
@@ -78,6 +101,177 @@ def search_file(file_path: str, query: str) -> dict:
     }
     return tool_success(SEARCH_RESULTS, result_data)
 
+# Tools: Batched sampling and searching
+# Each tool call is an LLM round trip, so the agents can look at many files in one call.
+# The files are read one after another inside the offloaded call, so a batch takes a single
+# file tool thread and stops with its call; the combined result is bounded in size.
+SAMPLES = "samples"
+
+def sample_files(file_paths: list[str], tool_context: ToolContext, max_bytes: int = 24000) -> dict:
+    """
+    Samples several files in one call, using the 'auto' strategy of the 'sample_file' tool for each.
+
+    Args:
+      file_paths: files to sample, relative to the import directory
+      max_bytes: maximum combined size of all samples, shared equally between the files
+
+    Returns:
+        dict: A dictionary with 'status' ('success' or 'error').
+              If 'success', includes 'samples', a dictionary from file path to the result
+              of 'sample_file' for that file, which has its own 'status'.
+              If 'error', includes an 'error_message'.
+    """
+    if not file_paths:
+        return tool_error("No files to sample. Provide a list of file paths.")
+    per_file_bytes = max(max_bytes // len(file_paths), 256)
+    samples = {}
+    for file_path in file_paths:
+        raise_if_cancelled()
+        samples[file_path] = sample_file(file_path, tool_context, max_bytes=per_file_bytes)
+    return tool_success(SAMPLES, samples)
+
+def search_files(searches: list[list[str]], max_lines_per_search: int = 20, max_bytes: int = 24000) -> dict:
+    """
+    Runs several searches in one call, each like the 'search_file' tool.
+
+    Args:
+      searches: a list of [file_path, query] pairs, for example [["parts.csv", "S-1074"], ["assemblies.csv", "A-1062"]]
+      max_lines_per_search: maximum number of matching lines returned per search.
+        The 'lines_found' metadata always has the full count.
+      max_bytes: maximum combined size of all matching lines
+
+    Returns:
+        dict: A dictionary with 'status' ('success' or 'error').
+              If 'success', includes 'search_results', a list with one entry per search,
+              in the order given, each with 'file_path', 'query' and the result of 'search_file'.
+              If 'error', includes an 'error_message'.
+    """
+    if not searches:
+        return tool_error("No searches given. Provide a list of [file_path, query] pairs.")
+    if any(len(search) != 2 for search in searches):
+        return tool_error("Each search must be a [file_path, query] pair.")
+
+    results = []
+    for file_path, query in searches:
+        raise_if_cancelled()
+        results.append(search_file(file_path, query, max_lines=max_lines_per_search))
+
+    per_search_bytes = max(max_bytes // len(searches), 256)
+    combined = []
+    for (file_path, query), result in zip(searches, results):
+        if result["status"] == "success":
+            matching_lines, used = [], 0
+            for line in result[SEARCH_RESULTS]["matching_lines"][:max_lines_per_search]:
+                used += len(line["content"])
+                if used > per_search_bytes:
+                    break
+                matching_lines.append(line)
+            result[SEARCH_RESULTS]["matching_lines"] = matching_lines
+            result[SEARCH_RESULTS]["metadata"]["lines_returned"] = len(matching_lines)
+        combined.append({"file_path": file_path, "query": query, "result": result})
+    return tool_success(SEARCH_RESULTS, combined)
+
+# Tool: Profile File
+FILE_PROFILE = "file_profile"
+
+def profile_file(file_path: str, max_exact_distinct: int = 100000, top_k: int = 5) -> dict:
+    """
+    Profiles every column of a CSV, JSONL or Parquet file in a single pass, to judge its structure in one call.
+    Gzip compressed files are supported as well.
+
+    For each column, reports the inferred type, the ratio of null values, the number of
+    distinct values (approximate beyond max_exact_distinct), whether the column is unique,
+    min and max values, and the most frequent values.
+
+    Args:
+      file_path: Path to the file, relative to the Neo4j import directory.
+      max_exact_distinct: columns with up to this many distinct values are checked for uniqueness exactly
+      top_k: number of most frequent values to report per column
+
+    Returns:
+        dict: A dictionary with 'status' ('success' or 'error').
+              If 'success', includes 'file_profile' with 'row_count' and a list of 'columns'.
+              A column's 'unique' is true or false, or null if it has more distinct values than can be checked exactly.
+              If 'error', includes an 'error_message'.
+    """
+    import_dir = Path(get_neo4j_import_dir())
+    p = import_dir / file_path
+
+    if not p.exists():
+        return tool_error(f"File does not exist: {file_path}")
+    if not p.is_file():
+        return tool_error(f"Path is not a file: {file_path}")
+
+    try:
+        profile = get_profile(str(p), max_exact_distinct, top_k)
+    except Exception as e:
+        return tool_error(f"Error profiling file {file_path}: {e}")
+
+    return tool_success(FILE_PROFILE, dict(profile, path=file_path))
+
+# Tools: Verify Uniqueness and References
+# Exact checks in one streaming pass, instead of searching for individual values.
+UNIQUENESS_CHECK = "uniqueness_check"
+REFERENCE_CHECK = "reference_check"
+
+def verify_unique_column(file_path: str, column: str) -> dict:
+    """
+    Checks exactly whether every row of a file has a distinct, non-null value in a column,
+    which is required of a unique identifier column.
+
+    Args:
+      file_path: Path to the file, relative to the Neo4j import directory.
+      column: The column to check.
+
+    Returns:
+        dict: A dictionary with 'status' ('success' or 'error').
+              If 'success', includes 'uniqueness_check' with 'unique' (true or false),
+              'row_count', 'null_count', 'distinct_count', 'duplicate_count'
+              (rows repeating an earlier value), 'duplicated_values' and 'examples'
+              of the most repeated values as [value, occurrences] pairs.
+              If 'error', includes an 'error_message'.
+    """
+    column_error = check_columns(file_path, {"checked": column})
+    if column_error:
+        return tool_error(column_error)
+    try:
+        result = get_uniqueness(str(Path(get_neo4j_import_dir()) / file_path), column)
+    except Exception as e:
+        return tool_error(f"Error checking uniqueness of {column} in {file_path}: {e}")
+    return tool_success(UNIQUENESS_CHECK, dict(result, file_path=file_path, column=column))
+
+def verify_column_references(file_path: str, column: str, referenced_file: str, referenced_column: str) -> dict:
+    """
+    Checks exactly whether every non-null value of a column occurs in a column of another file,
+    for example whether every parts.csv assembly_id is an assembly_id in assemblies.csv.
+    This holds when the column refers to nodes identified by the referenced column.
+
+    Args:
+      file_path: The file with the referencing column, relative to the Neo4j import directory.
+      column: The referencing column.
+      referenced_file: The file with the referenced column, relative to the Neo4j import directory.
+      referenced_column: The referenced column, usually the unique identifier of a node.
+
+    Returns:
+        dict: A dictionary with 'status' ('success' or 'error').
+              If 'success', includes 'reference_check' with 'holds' (true or false), 'row_count',
+              'null_count', 'distinct_count', 'referenced_distinct_count', 'missing_count'
+              (rows whose value is not in the referenced column), 'missing_distinct'
+              and 'examples' of missing values.
+              If 'error', includes an 'error_message'.
+    """
+    column_error = (check_columns(file_path, {"referencing": column})
+                    or check_columns(referenced_file, {"referenced": referenced_column}))
+    if column_error:
+        return tool_error(column_error)
+    import_dir = Path(get_neo4j_import_dir())
+    try:
+        result = get_inclusion(str(import_dir / file_path), column, str(import_dir / referenced_file), referenced_column)
+    except Exception as e:
+        return tool_error(f"Error checking references from {file_path}.{column} to {referenced_file}.{referenced_column}: {e}")
+    return tool_success(REFERENCE_CHECK, dict(result, file_path=file_path, column=column,
+                                              referenced_file=referenced_file, referenced_column=referenced_column))
+
 #  Tool: Propose Node Construction
 
 PROPOSED_CONSTRUCTION_PLAN = "proposed_construction_plan"
@@ -108,12 +302,10 @@ def propose_node_construction(approved_file: str, proposed_label: str, unique_co
                 If 'error', includes an 'error_message' key.
                 The 'error_message' may have instructions about how to handle the error.
     """
-    # quick sanity check -- does the approved file have the unique column?
-    search_results = search_file(approved_file, unique_column_name)
-    if search_results["status"] == "error":
-        return search_results # return the error
-    if search_results["search_results"]["metadata"]["lines_found"] == 0:
-        return tool_error(f"{approved_file} does not have the column {unique_column_name}. Check the file content and try again.")
+    # quick sanity check -- does the approved file have the unique column and the property columns?
+    column_error = check_columns(approved_file, {"unique": unique_column_name, "property": proposed_properties})
+    if column_error:
+        return tool_error(f"{column_error} Check the file content and try again.")
 
     # get the current construction plan, or an empty one if none exists
     construction_plan = tool_context.state.get(PROPOSED_CONSTRUCTION_PLAN, {})
@@ -154,17 +346,14 @@ def propose_relationship_construction(approved_file: str, proposed_relationship_
                 If 'error', includes an 'error_message' key.
                 The 'error_message' may have instructions about how to handle the error.
     """
-    # quick sanity check -- does the approved file have the from_node_column?
-    search_results = search_file(approved_file, from_node_column)
-    if search_results["status"] == "error": 
-        return search_results  # return the error if there is one
-    if search_results["search_results"]["metadata"]["lines_found"] == 0:
-        return tool_error(f"{approved_file} does not have the from node column {from_node_column}. Check the content of the file and reconsider the relationship.")
-
-    # quick sanity check -- does the approved file have the to_node_column?
-    search_results = search_file(approved_file, to_node_column)
-    if search_results["status"] == "error" or search_results["search_results"]["metadata"]["lines_found"] == 0:
-        return tool_error(f"{approved_file} does not have the to node column {to_node_column}. Check the content of the file and reconsider the relationship.")
+    # quick sanity check -- does the approved file have the from, to and property columns?
+    column_error = check_columns(approved_file, {
+        "from node": from_node_column,
+        "to node": to_node_column,
+        "property": proposed_properties
+    })
+    if column_error:
+        return tool_error(f"{column_error} Check the content of the file and reconsider the relationship.")
 
     construction_plan = tool_context.state.get(PROPOSED_CONSTRUCTION_PLAN, {})
     relationship_construction_rule = {
@@ -239,12 +428,63 @@ def get_proposed_construction_plan(tool_context:ToolContext) -> dict:
 APPROVED_CONSTRUCTION_PLAN = "approved_construction_plan"
 
 def approve_proposed_construction_plan(tool_context:ToolContext) -> dict:
-    """Approve the proposed construction plan, if there is one."""
+    """Approve the proposed construction plan, if there is one.
+    If the plan could not be saved for reuse by later sessions, the result includes a 'warning'."""
     if not PROPOSED_CONSTRUCTION_PLAN in tool_context.state:
         return tool_error("No proposed construction plan found. Propose a plan first.")
+
+    # the files may have changed since the rules were proposed, so check every column again
+    column_errors = check_plan_columns(tool_context.state.get(PROPOSED_CONSTRUCTION_PLAN))
+    if column_errors:
+        return tool_error("The proposed construction plan refers to missing columns. " + " ".join(column_errors.values()))
     
     tool_context.state[APPROVED_CONSTRUCTION_PLAN] = tool_context.state.get(PROPOSED_CONSTRUCTION_PLAN)
-    return tool_success(APPROVED_CONSTRUCTION_PLAN, tool_context.state[APPROVED_CONSTRUCTION_PLAN])
+
+    results = tool_success(APPROVED_CONSTRUCTION_PLAN, tool_context.state[APPROVED_CONSTRUCTION_PLAN])
+    # remember the approved plan, so a later session with the same goal and files can reuse it
+    try:
+        get_plan_registry().save(
+            tool_context.state.get(APPROVED_USER_GOAL),
+            tool_context.state.get(APPROVED_FILES, []),
+            tool_context.state[APPROVED_CONSTRUCTION_PLAN]
+        )
+    except Exception as e:
+        # the plan is approved either way, it just can not be reused by later sessions
+        logger.warning("Could not save the approved construction plan to the plan registry: %s", e)
+        results["warning"] = f"The plan is approved, but could not be saved to the plan registry for reuse: {e}"
+    return results
+
+# Tool: Get Cached Construction Plan
+CACHED_CONSTRUCTION_PLAN = "cached_construction_plan"
+
+def get_cached_construction_plan(tool_context:ToolContext) -> dict:
+    """Looks up a construction plan approved in an earlier session for the same user goal and approved files.
+
+    A plan is only returned if the files still have the columns and column types they had when
+    the plan was approved. A found plan becomes the proposed construction plan.
+
+    Returns:
+        dict: A dictionary with 'status' ('success' or 'error').
+              If 'success', includes 'cached_construction_plan' with 'construction_plan',
+              its 'version' and when it was 'saved_at', or null if there is no cached plan.
+              If 'error', includes an 'error_message'.
+    """
+    approved_files = tool_context.state.get(APPROVED_FILES)
+    if not approved_files:
+        return tool_error("No approved files found. Approve files first.")
+    try:
+        cached = get_plan_registry().lookup(tool_context.state.get(APPROVED_USER_GOAL), approved_files)
+    except Exception as e:
+        return tool_error(f"Error looking up a cached construction plan: {e}")
+    if cached is None:
+        return tool_success(CACHED_CONSTRUCTION_PLAN, None)
+
+    tool_context.state[PROPOSED_CONSTRUCTION_PLAN] = cached["construction_plan"]
+    return tool_success(CACHED_CONSTRUCTION_PLAN, {
+        "construction_plan": cached["construction_plan"],
+        "version": cached["version"],
+        "saved_at": cached["saved_at"]
+    })
 
 def get_proposed_schema(tool_context:ToolContext) -> dict:
     """Get the proposed schema, derived from the proposed construction plan."""
@@ -277,21 +517,69 @@ def get_proposed_schema(tool_context:ToolContext) -> dict:
             
     return tool_success("proposed_schema", schema)
 
+# Tool: Discover Keys and References
+# Finding keys and foreign keys is deterministic, so it is done up front rather than over several proposal rounds.
+DISCOVERED_KEYS = "discovered_keys"
+
+def discover_keys_and_references(tool_context: ToolContext) -> dict:
+    """Discovers the likely unique identifier of each approved file, and which columns
+    reference the identifiers of other approved files.
+
+    Returns:
+        dict: A dictionary with 'status' ('success' or 'error').
+              If 'success', includes 'discovered_keys' with 'keys' (per file, the likely 'key'
+              and all unique 'candidates'), 'inclusions' (columns whose values all occur in
+              another file's key column) and 'draft_plan', a construction plan derived from them.
+              If 'error', includes an 'error_message'.
+    """
+    approved_files = tool_context.state.get(APPROVED_FILES)
+    if not approved_files:
+        return tool_error("No approved files found. Approve files first.")
+    try:
+        discovery = get_discovery(get_neo4j_import_dir(), approved_files)
+    except Exception as e:
+        return tool_error(f"Error discovering keys and references: {e}")
+    return tool_success(DISCOVERED_KEYS, discovery)
+
+# seed the construction plan with a draft derived from discovered keys and references,
+# so the schema refinement loop starts from a plan instead of from scratch
+# A failed discovery leaves the plan empty for the agents to propose, with the reason in state.
+SEED_ERROR = "construction_plan_seed_error"
+
+def seed_construction_plan(callback_context: CallbackContext) -> None:
+    approved_files = callback_context.state.get(APPROVED_FILES)
+    if not approved_files or callback_context.state.get(PROPOSED_CONSTRUCTION_PLAN):
+        return
+    try:
+        discovery = get_discovery(get_neo4j_import_dir(), approved_files)
+    except Exception as e:
+        logger.warning("Could not seed the construction plan: %s", e)
+        callback_context.state[SEED_ERROR] = f"Could not seed the construction plan: {e}"
+        return
+    callback_context.state[SEED_ERROR] = None
+    # a copy, as the proposal tools edit the plan in state and the discovery is cached
+    callback_context.state[PROPOSED_CONSTRUCTION_PLAN] = copy.deepcopy(discovery["draft_plan"])
+
 # initialize context with blank feedback, which may get filled later by the schema_critic_agent
 def initialize_feedback(callback_context: CallbackContext) -> None:
     callback_context.state["feedback"] = ""
 
 # List of tools for the structured schema proposal agent
-structured_schema_proposal_agent_tools = [
+structured_schema_proposal_agent_tools = govern_tools([
     approve_perceived_user_goal, approve_suggested_files,
     get_proposed_construction_plan,
-    sample_file, search_file,
+    offloaded(sample_file), offloaded(search_file), offloaded(profile_file),
+    offloaded(sample_files), offloaded(search_files),
+    offloaded(verify_unique_column), offloaded(verify_column_references),
+    offloaded(discover_keys_and_references),
     propose_node_construction, propose_relationship_construction, 
     remove_node_construction, remove_relationship_construction
-]
+])
 
-schema_critic_agent_tools = [
+schema_critic_agent_tools = govern_tools([
     approve_perceived_user_goal, approve_suggested_files,
     get_proposed_construction_plan,
-    sample_file, search_file
-]
\ No newline at end of file
+    offloaded(sample_file), offloaded(search_file), offloaded(profile_file),
+    offloaded(sample_files), offloaded(search_files),
+    offloaded(verify_unique_column), offloaded(verify_column_references)
+])
\ No newline at end of file
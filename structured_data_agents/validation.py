@@ -0,0 +1,104 @@
+from typing import Any, Dict, List
+
+from structured_data_agents.headers import check_plan_columns
+
+
+class UnionFind:
+    """Disjoint sets with path compression and union by size."""
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def add(self, item: str) -> None:
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item: str) -> str:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: str, b: str) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+    def groups(self) -> List[List[str]]:
+        groups: Dict[str, List[str]] = {}
+        for item in self.parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return sorted((sorted(group) for group in groups.values()), key=lambda group: (-len(group), group))
+
+
+def validate_construction_plan(construction_plan: Dict[str, Dict[str, Any]], check_columns: bool = True) -> List[str]:
+    """Finds the structural problems of a construction plan, which need no judgement to detect.
+
+    Checks that:
+    - the plan has node constructions
+    - relationship endpoints are labels of node constructions in the plan
+    - relationship endpoint columns are properties of the endpoint nodes, since the import matches nodes on them
+    - the source files have every column the plan refers to
+    - no two relationships connect the same nodes through the same columns of the same file
+      (a duplicate, or an inverse of another relationship)
+    - the graph is connected: every node is reachable from every other node
+
+    Returns:
+        List[str]: a description of each problem, empty if the plan is structurally valid
+    """
+    problems = []
+    nodes = {rule["label"]: rule for rule in construction_plan.values() if rule.get("construction_type") == "node"}
+    relationships = [rule for rule in construction_plan.values() if rule.get("construction_type") == "relationship"]
+    if not nodes:
+        return ["The plan has no node constructions. Propose a node construction for each node file."]
+
+    connected = UnionFind()
+    for label in nodes:
+        connected.add(label)
+
+    seen_pairs: Dict[tuple, str] = {}
+    for rule in relationships:
+        relationship_type = rule.get("relationship_type")
+        endpoints_known = True
+        for end in ("from", "to"):
+            label, column = rule.get(f"{end}_node_label"), rule.get(f"{end}_node_column")
+            if label not in nodes:
+                problems.append(f"Relationship {relationship_type} has {end} node label '{label}', "
+                                f"which is not a node in the plan. Known node labels: {', '.join(sorted(nodes))}.")
+                endpoints_known = False
+                continue
+            node = nodes[label]
+            node_columns = [node.get("unique_column_name")] + list(node.get("properties", []))
+            if column not in node_columns:
+                problems.append(f"Relationship {relationship_type} matches {end} nodes on '{column}', "
+                                f"which is not a property of {label} nodes. {label} nodes are identified by "
+                                f"'{node.get('unique_column_name')}'.")
+        if not endpoints_known:
+            continue
+        connected.union(rule["from_node_label"], rule["to_node_label"])
+
+        pair = (rule.get("source_file"), frozenset([(rule["from_node_label"], rule.get("from_node_column")),
+                                                    (rule["to_node_label"], rule.get("to_node_column"))]))
+        if pair in seen_pairs:
+            problems.append(f"Relationship {relationship_type} is redundant with {seen_pairs[pair]}: both connect "
+                            f"{rule['from_node_label']} and {rule['to_node_label']} through the same columns of "
+                            f"{rule.get('source_file')}. Remove one of them.")
+        else:
+            seen_pairs[pair] = relationship_type
+
+    if check_columns:
+        problems.extend(check_plan_columns(construction_plan).values())
+
+    components = connected.groups()
+    if len(components) > 1:
+        described = "; ".join("{" + ", ".join(component) + "}" for component in components)
+        problems.append(f"The graph is not connected, it has {len(components)} separate parts: {described}. "
+                        f"Add relationships so every node connects to the others.")
+    return problems
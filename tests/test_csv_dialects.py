@@ -0,0 +1,51 @@
+import os
+
+# the tools import the Neo4j wrapper, which creates its driver on import; no connection is made
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+import pytest
+
+from structured_data_agents.integrity import check_uniqueness, check_inclusion
+from structured_data_agents.tools import search_file
+
+FILES = {
+    "semicolon.csv": "id;name;assembly_id\n1;bolt;A-1\n2;frame;A-2\n2;hinge;A-2\n3;;A-3\n",
+    "bom.csv": "\ufeffid,name,assembly_id\n1,bolt,A-1\n2,frame,A-2\n2,hinge,A-2\n3,,A-3\n",
+}
+
+
+@pytest.fixture(autouse=True)
+def import_dir(tmp_path, monkeypatch):
+    for name, content in FILES.items():
+        (tmp_path / name).write_text(content, encoding="utf-8")
+    (tmp_path / "assemblies.csv").write_text("assembly_id\nA-1\nA-2\n", encoding="utf-8")
+    monkeypatch.setenv("NEO4J_IMPORT_DIR", str(tmp_path))
+    monkeypatch.setenv("AGENTIC_KG_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path
+
+
+@pytest.mark.parametrize("file_name", sorted(FILES))
+def test_uniqueness(import_dir, file_name):
+    result = check_uniqueness(str(import_dir / file_name), "id")
+    assert result["unique"] is False
+    assert result["row_count"] == 4
+    assert result["null_count"] == 0
+    assert result["distinct_count"] == 3
+    assert result["examples"] == [["2", 2]]
+
+
+@pytest.mark.parametrize("file_name", sorted(FILES))
+def test_inclusion(import_dir, file_name):
+    result = check_inclusion(str(import_dir / file_name), "assembly_id",
+                             str(import_dir / "assemblies.csv"), "assembly_id")
+    assert result["holds"] is False
+    assert result["examples"] == ["A-3"]
+
+
+@pytest.mark.parametrize("file_name", sorted(FILES))
+def test_search_file_by_column(file_name):
+    result = search_file(file_name, "id=2")
+    assert result["status"] == "success"
+    metadata = result["search_results"]["metadata"]
+    assert (metadata["column"], metadata["lines_found"]) == ("id", 2)
+    assert [line["line_number"] for line in result["search_results"]["matching_lines"]] == [3, 4]
@@ -0,0 +1,86 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# the tools import the Neo4j wrapper, which creates its driver on import; no connection is made
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+import pytest
+
+from structured_data_agents import profiler
+from structured_data_agents.profiler import HeavyHitters, HyperLogLog, get_profile, profile_rows
+
+
+@pytest.mark.parametrize("distinct", [10, 1000, 50000])
+def test_hyperloglog_estimates_distinct_values(distinct):
+    hll = HyperLogLog()
+    for i in range(distinct):
+        hll.add(f"value-{i}")
+        # repeated values do not change the estimate
+        hll.add(f"value-{i}")
+    assert abs(hll.count() - distinct) <= max(2, distinct * 0.05)
+
+
+def test_heavy_hitters_keep_frequent_values():
+    heavy_hitters = HeavyHitters(capacity=10)
+    for i in range(5000):
+        heavy_hitters.add("frequent" if i % 3 == 0 else f"rare-{i}")
+    assert heavy_hitters.top(1)[0][0] == "frequent"
+    assert len(heavy_hitters.counters) <= 10
+
+
+def test_profile_rows_reports_types_nulls_and_uniqueness():
+    rows = [["1", "bolt", "2.5", ""], ["2", "frame", "3", "2024-01-02"], ["3", "bolt", "4", "null"]]
+    columns = {c["name"]: c for c in profile_rows(["id", "name", "weight", "shipped"], rows)["columns"]}
+
+    assert (columns["id"]["inferred_type"], columns["id"]["unique"]) == ("integer", True)
+    assert (columns["id"]["min"], columns["id"]["max"]) == (1, 3)
+    assert (columns["name"]["unique"], columns["name"]["top_values"][0]) == (False, ["bolt", 2])
+    assert (columns["weight"]["inferred_type"], columns["weight"]["max"]) == ("float", 4.0)
+    assert (columns["shipped"]["inferred_type"], columns["shipped"]["null_ratio"]) == ("date", 0.6667)
+
+
+def test_profile_rows_estimates_beyond_the_exact_limit():
+    rows = ([str(i)] for i in range(2000))
+    column = profile_rows(["id"], rows, max_exact_distinct=100)["columns"][0]
+    assert column["distinct_count_exact"] is False
+    assert abs(column["distinct_count"] - 2000) <= 100
+    # without the exact set, uniqueness can not be shown
+    assert column["unique"] is None
+
+
+def test_profile_rows_finds_frequent_duplicates_beyond_the_exact_limit():
+    # past the exact limit, only duplicates frequent enough to stay among the heavy hitters are seen
+    rows = (["P-0" if i % 10 == 0 else str(i)] for i in range(2000))
+    column = profile_rows(["id"], rows, max_exact_distinct=100)["columns"][0]
+    assert column["unique"] is False
+
+
+def test_get_profile_is_cached_per_file_version(tmp_path):
+    path = tmp_path / "parts.csv"
+    path.write_text("id,name\n1,bolt\n", encoding="utf-8")
+    first = get_profile(str(path))
+    assert get_profile(str(path)) is first
+
+    path.write_text("id,name\n1,bolt\n2,frame\n", encoding="utf-8")
+    assert get_profile(str(path))["row_count"] == 2
+
+
+def test_concurrent_profiles_of_a_file_compute_it_once(tmp_path, monkeypatch):
+    path = tmp_path / "parts.csv"
+    path.write_text("id,name\n1,bolt\n", encoding="utf-8")
+    calls, started = [], threading.Event()
+    profile_csv = profiler.profile_csv
+
+    def slow_profile_csv(*args):
+        calls.append(args)
+        started.wait(1)
+        return profile_csv(*args)
+
+    monkeypatch.setattr(profiler, "profile_csv", slow_profile_csv)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(get_profile, str(path)) for _ in range(4)]
+        started.set()
+        profiles = [future.result() for future in futures]
+    assert len(calls) == 1
+    assert all(profile is profiles[0] for profile in profiles)
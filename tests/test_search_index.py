@@ -0,0 +1,78 @@
+import os
+
+# the tools import the Neo4j wrapper, which creates its driver on import; no connection is made
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+import pytest
+
+from structured_data_agents.search_index import get_search_index
+
+# 'İ' lowercases to two code points, so the lowercase copy is longer than the original from line 2 on
+LINES = ["part_id,name", "P-1,İstanbul Bolt", "P-2,bolt", "P-3,Frame", "P-4,BOLT cover"]
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENTIC_KG_CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def parts(tmp_path):
+    path = tmp_path / "parts.csv"
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_search_is_case_insensitive(parts):
+    with get_search_index(parts) as index:
+        lines_found, matches = index.search("Bolt")
+    assert lines_found == 3
+    assert [match["line_number"] for match in matches] == [2, 3, 5]
+
+
+def test_offsets_follow_lines_whose_lowercase_changes_length(parts):
+    with get_search_index(parts) as index:
+        assert index.line_count == len(LINES)
+        assert [index.line(i) for i in range(index.line_count)] == LINES
+        _, matches = index.search("frame")
+    assert matches == [{"line_number": 4, "content": "P-3,Frame"}]
+
+
+def test_max_lines_limits_matches_but_not_the_count(parts):
+    with get_search_index(parts) as index:
+        lines_found, matches = index.search("bolt", max_lines=1)
+        assert (lines_found, len(matches)) == (3, 1)
+        # a repeated query for more lines than were cached is scanned again
+        lines_found, matches = index.search("bolt", max_lines=10)
+    assert (lines_found, len(matches)) == (3, 3)
+
+
+def test_column_search_matches_whole_values(parts):
+    with get_search_index(parts) as index:
+        assert index.columns() == ["part_id", "name"]
+        lines_found, matches = index.search("BOLT", column="name")
+    assert lines_found == 1
+    assert matches[0]["content"] == "P-2,bolt"
+
+
+def test_changed_file_is_indexed_again(parts):
+    with get_search_index(parts) as index:
+        assert index.search("hinge")[0] == 0
+    with open(parts, "a", encoding="utf-8") as file:
+        file.write("P-5,Hinge\n")
+    stat = os.stat(parts)
+    os.utime(parts, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    with get_search_index(parts) as rebuilt:
+        assert rebuilt is not index
+        assert rebuilt.search("hinge")[1] == [{"line_number": 6, "content": "P-5,Hinge"}]
+    # the replaced index is closed once its last reader released it
+    assert index.closed
+
+
+def test_unchanged_file_reuses_the_index(parts):
+    with get_search_index(parts) as first:
+        pass
+    with get_search_index(parts) as second:
+        assert second is first
+        assert not second.closed
@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+# the tools import the Neo4j wrapper, which creates its driver on import; no connection is made
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+import pytest
+from google.adk.events import Event, EventActions
+
+from session_service import SqliteSessionService
+
+APP = "app"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.sqlite")
+
+
+def append_state(service, session, delta):
+    event = Event(author="agent", invocation_id="invocation", actions=EventActions(state_delta=delta))
+    return asyncio.run(service.append_event(session, event))
+
+
+def get_state(service, user_id, session_id):
+    return asyncio.run(service.get_session(app_name=APP, user_id=user_id, session_id=session_id)).state
+
+
+def test_state_is_scoped_to_session_user_and_app(db_path):
+    service = SqliteSessionService(db_path)
+    first = asyncio.run(service.create_session(app_name=APP, user_id="alice", session_id="s1"))
+    second = asyncio.run(service.create_session(app_name=APP, user_id="alice", session_id="s2"))
+    other_user = asyncio.run(service.create_session(app_name=APP, user_id="bob", session_id="s1"))
+
+    append_state(service, first, {"approved_files": ["parts.csv"], "user:name": "Alice", "app:version": 2,
+                                  "temp:scratch": "not stored"})
+
+    assert get_state(service, "alice", "s1") == {"approved_files": ["parts.csv"], "user:name": "Alice", "app:version": 2}
+    # user state follows the user into their other sessions, session state does not
+    assert get_state(service, "alice", second.id) == {"user:name": "Alice", "app:version": 2}
+    # the same session id of another user is a separate session
+    assert get_state(service, "bob", other_user.id) == {"app:version": 2}
+
+
+def test_sessions_persist_across_service_instances(db_path):
+    service = SqliteSessionService(db_path)
+    session = asyncio.run(service.create_session(app_name=APP, user_id="alice", state={"feedback": ""}))
+    append_state(service, session, {"feedback": "looks good"})
+
+    reopened = SqliteSessionService(db_path)
+    stored = asyncio.run(reopened.get_session(app_name=APP, user_id="alice", session_id=session.id))
+    assert stored.state == {"feedback": "looks good"}
+    assert len(stored.events) == 1
+    assert stored.events[0].actions.state_delta == {"feedback": "looks good"}
+
+
+def test_unknown_and_duplicate_sessions(db_path):
+    service = SqliteSessionService(db_path)
+    assert asyncio.run(service.get_session(app_name=APP, user_id="alice", session_id="missing")) is None
+    asyncio.run(service.create_session(app_name=APP, user_id="alice", session_id="s1"))
+    with pytest.raises(ValueError):
+        asyncio.run(service.create_session(app_name=APP, user_id="alice", session_id="s1"))
+
+
+def test_deleted_session_keeps_user_state(db_path):
+    service = SqliteSessionService(db_path)
+    session = asyncio.run(service.create_session(app_name=APP, user_id="alice", session_id="s1"))
+    append_state(service, session, {"goal": "bill of materials", "user:name": "Alice"})
+    asyncio.run(service.delete_session(app_name=APP, user_id="alice", session_id="s1"))
+
+    assert asyncio.run(service.list_sessions(app_name=APP, user_id="alice")).sessions == []
+    recreated = asyncio.run(service.create_session(app_name=APP, user_id="alice", session_id="s1"))
+    assert recreated.state == {"user:name": "Alice"}
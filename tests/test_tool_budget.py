@@ -0,0 +1,96 @@
+import json
+import os
+
+# the tools import the Neo4j wrapper, which creates its driver on import; no connection is made
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+import pytest
+
+import tool_budget
+from tool_budget import ToolResultGovernor, budget_bytes, page, shrink
+
+
+def size(value):
+    return len(json.dumps(value).encode("utf-8"))
+
+
+def test_small_values_are_unchanged():
+    value = {"status": "success", "items": [1, 2, 3]}
+    cuts = []
+    assert shrink(value, 1000, (), cuts) is value
+    assert cuts == []
+
+
+def test_lists_keep_their_first_items():
+    value = [f"item-{i:03d}" for i in range(100)]
+    cuts = []
+    kept = shrink(value, 200, (), cuts)
+    assert kept == value[:len(kept)]
+    assert size(kept) <= 200
+    assert cuts == [{"path": [], "total_items": 100, "returned_items": len(kept)}]
+
+
+def test_large_entry_next_to_metadata_is_shrunk():
+    value = {"metadata": {"path": "parts.csv"}, "matching_lines": ["x" * 50] * 100}
+    cuts = []
+    kept = shrink(value, 500, (), cuts)
+    assert kept["metadata"] == value["metadata"]
+    assert 0 < len(kept["matching_lines"]) < 100
+    assert cuts[0]["path"] == ["matching_lines"]
+
+
+def test_strings_keep_their_start():
+    cuts = []
+    kept = shrink("é" * 100, 52, ("text",), cuts)
+    assert kept == "é" * 25
+    assert cuts == [{"path": ["text"], "total_chars": 100, "returned_chars": 25}]
+
+
+def test_sets_are_trimmed_as_sorted_lists():
+    value = {f"Type{i:02d}" for i in range(50)}
+    cuts = []
+    kept = shrink(value, 100, (), cuts)
+    assert kept == sorted(value)[:len(kept)]
+    assert size(kept) <= 100
+    assert cuts[0]["total_items"] == 50
+
+
+@pytest.mark.parametrize("value", [
+    [f"item-{i:03d}" for i in range(100)],
+    {f"key-{i:03d}": i for i in range(100)},
+    "abcdefghij" * 100,
+])
+def test_pages_cover_the_whole_value(value):
+    collected, offset = [], 0
+    while offset is not None:
+        result = page(value, offset, 120)
+        assert result["offset"] == offset
+        collected.append(result.get("items", result.get("entries", result.get("text"))))
+        offset = result["next_offset"]
+    if isinstance(value, dict):
+        assert {k: v for entries in collected for k, v in entries.items()} == value
+    elif isinstance(value, str):
+        assert "".join(collected) == value
+    else:
+        assert [item for items in collected for item in items] == value
+
+
+def test_budget_is_the_smaller_of_bytes_and_tokens(monkeypatch):
+    monkeypatch.setitem(tool_budget.TOOL_BUDGETS, "some_tool", {"max_bytes": 10000, "max_tokens": 1000})
+    assert budget_bytes("some_tool") == 1000 * tool_budget.BYTES_PER_TOKEN
+
+
+def test_governor_truncates_and_continues(monkeypatch):
+    monkeypatch.setitem(tool_budget.TOOL_BUDGETS, "some_tool", {"max_bytes": 2000, "max_tokens": 2000})
+    governor = ToolResultGovernor()
+    result = {"status": "success", "rows": [f"row-{i:04d}" for i in range(500)]}
+
+    governed = governor.govern("some_tool", result)
+    truncation = governed["truncation"]
+    returned = len(governed["rows"])
+    assert governed["rows"] == result["rows"][:returned]
+    assert truncation["cuts"][0]["path"] == ["rows"]
+
+    rest = governor.read(truncation["continuation"], returned)["truncated_result"]
+    assert rest["items"][0] == result["rows"][returned]
+    assert governor.get_metrics()["some_tool"]["truncated"] == 1
@@ -0,0 +1,88 @@
+import os
+
+# the tools import the Neo4j wrapper, which creates its driver on import; no connection is made
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+from structured_data_agents.validation import UnionFind, validate_construction_plan
+
+
+def node(label, source_file, unique_column_name, properties=()):
+    return {"construction_type": "node", "label": label, "source_file": source_file,
+            "unique_column_name": unique_column_name, "properties": list(properties)}
+
+
+def relationship(relationship_type, source_file, from_label, from_column, to_label, to_column):
+    return {"construction_type": "relationship", "relationship_type": relationship_type,
+            "source_file": source_file, "from_node_label": from_label, "from_node_column": from_column,
+            "to_node_label": to_label, "to_node_column": to_column, "properties": []}
+
+
+PLAN = {
+    "Part": node("Part", "parts.csv", "part_id", ["assembly_id"]),
+    "Assembly": node("Assembly", "assemblies.csv", "assembly_id", ["product_id"]),
+    "Product": node("Product", "products.csv", "product_id"),
+    "CONTAINS": relationship("CONTAINS", "parts.csv", "Assembly", "assembly_id", "Part", "assembly_id"),
+    "IS_PART_OF": relationship("IS_PART_OF", "assemblies.csv", "Assembly", "assembly_id", "Product", "product_id"),
+}
+
+
+def test_union_find_groups():
+    sets = UnionFind()
+    for item in "abcdef":
+        sets.add(item)
+    sets.union("a", "b")
+    sets.union("c", "d")
+    sets.union("b", "d")
+    assert sets.find("a") == sets.find("c")
+    assert sets.find("e") != sets.find("a")
+    assert sets.groups() == [["a", "b", "c", "d"], ["e"], ["f"]]
+
+
+def test_union_find_long_chain():
+    sets = UnionFind()
+    for i in range(10000):
+        sets.add(str(i))
+    for i in range(1, 10000):
+        sets.union(str(i - 1), str(i))
+    assert len(sets.groups()) == 1
+
+
+def test_valid_plan_has_no_problems():
+    assert validate_construction_plan(PLAN, check_columns=False) == []
+
+
+def test_plan_without_nodes():
+    problems = validate_construction_plan({"CONTAINS": PLAN["CONTAINS"]}, check_columns=False)
+    assert len(problems) == 1 and "no node constructions" in problems[0]
+
+
+def test_unknown_endpoint_label_and_column():
+    plan = dict(PLAN, USES=relationship("USES", "parts.csv", "Part", "supplier_id", "Supplier", "supplier_id"))
+    problems = validate_construction_plan(plan, check_columns=False)
+    assert any("'supplier_id', which is not a property of Part nodes" in problem for problem in problems)
+    assert any("to node label 'Supplier'" in problem for problem in problems)
+
+
+def test_inverse_relationship_is_redundant():
+    plan = dict(PLAN, PART_OF=relationship("PART_OF", "parts.csv", "Part", "assembly_id", "Assembly", "assembly_id"))
+    problems = validate_construction_plan(plan, check_columns=False)
+    assert problems == [problems[0]]
+    assert "PART_OF is redundant with CONTAINS" in problems[0]
+
+
+def test_disconnected_parts_are_reported():
+    plan = {key: rule for key, rule in PLAN.items() if key != "IS_PART_OF"}
+    problems = validate_construction_plan(plan, check_columns=False)
+    assert len(problems) == 1
+    assert "2 separate parts: {Assembly, Part}; {Product}" in problems[0]
+
+
+def test_missing_file_columns(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEO4J_IMPORT_DIR", str(tmp_path))
+    (tmp_path / "parts.csv").write_text("part_id,assembly_id\nP-1,A-1\n", encoding="utf-8")
+    (tmp_path / "assemblies.csv").write_text("assembly_id,product_id\nA-1,X-1\n", encoding="utf-8")
+    (tmp_path / "products.csv").write_text("productid\nX-1\n", encoding="utf-8")
+
+    problems = validate_construction_plan(PLAN)
+    assert len(problems) == 1
+    assert "product_id" in problems[0] and "products.csv" in problems[0]
@@ -0,0 +1,268 @@
+import functools
+import hashlib
+import inspect
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from neo4j_for_adk import tool_success, tool_error
+
+# tokens are estimated from the size of the JSON sent to the model
+BYTES_PER_TOKEN = 4
+DEFAULT_BUDGET = {"max_bytes": 16000, "max_tokens": 4000}
+# room kept for the truncation summary added to a truncated result
+SUMMARY_BYTES = 600
+
+# per-tool budgets, by tool name. Tools which are not listed get the DEFAULT_BUDGET.
+TOOL_BUDGETS: Dict[str, Dict[str, int]] = {
+    "list_available_files": {"max_bytes": 8000, "max_tokens": 2000},
+    "search_file": {"max_bytes": 12000, "max_tokens": 3000},
+    "search_files": {"max_bytes": 24000, "max_tokens": 6000},
+    "sample_files": {"max_bytes": 24000, "max_tokens": 6000},
+    "profile_file": {"max_bytes": 12000, "max_tokens": 3000},
+    "get_proposed_construction_plan": {"max_bytes": 16000, "max_tokens": 4000},
+    "discover_keys_and_references": {"max_bytes": 16000, "max_tokens": 4000},
+}
+
+
+def configure_tool_budgets(budgets: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    """Sets the 'max_bytes' and 'max_tokens' of tools, by tool name. Takes effect on the next call."""
+    for name, budget in budgets.items():
+        TOOL_BUDGETS[name] = dict(TOOL_BUDGETS.get(name, DEFAULT_BUDGET), **budget)
+    return TOOL_BUDGETS
+
+
+def budget_bytes(tool_name: str) -> int:
+    """The number of bytes of JSON a tool may return, the smaller of its byte and token budgets."""
+    budget = TOOL_BUDGETS.get(tool_name, DEFAULT_BUDGET)
+    return min(budget.get("max_bytes", DEFAULT_BUDGET["max_bytes"]),
+               budget.get("max_tokens", DEFAULT_BUDGET["max_tokens"]) * BYTES_PER_TOKEN)
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+def _cut_text(text: str, max_bytes: int) -> str:
+    encoded = text.encode("utf-8")
+    return encoded[:max(max_bytes, 0)].decode("utf-8", "ignore")
+
+
+def _sorted_items(value: Any) -> List[Any]:
+    """The items of a set in a deterministic order, by their JSON when they can not be compared."""
+    try:
+        return sorted(value)
+    except TypeError:
+        return sorted(value, key=lambda item: json.dumps(item, default=str, sort_keys=True))
+
+
+def shrink(value: Any, max_bytes: int, path: Tuple = (), cuts: Optional[List[Dict[str, Any]]] = None) -> Any:
+    """Deterministically shrinks a JSON-like value to about max_bytes of JSON.
+
+    Lists keep their first items and dictionaries their first entries, in order, as many as fit.
+    Sets are turned into sorted lists first, so they are cut like lists.
+    When not even the first item fits, it is shrunk in turn. Strings keep their start.
+    Each cut is appended to cuts with its 'path' and the total and returned counts.
+    """
+    cuts = cuts if cuts is not None else []
+    if isinstance(value, (set, frozenset)):
+        value = _sorted_items(value)
+    if _size(value) <= max_bytes:
+        return value
+    if isinstance(value, str):
+        kept = _cut_text(value, max_bytes - 2)
+        cuts.append({"path": list(path), "total_chars": len(value), "returned_chars": len(kept)})
+        return kept
+    if isinstance(value, (list, tuple)):
+        kept, used = [], 2
+        for index, item in enumerate(value):
+            # json.dumps separates items with ", "
+            item_size = _size(item) + (2 if kept else 0)
+            if used + item_size > max_bytes:
+                if not kept and max_bytes - used > 2:
+                    kept.append(shrink(item, max_bytes - used, path + (index,), cuts))
+                break
+            kept.append(item)
+            used += item_size
+        cuts.append({"path": list(path), "total_items": len(value), "returned_items": len(kept)})
+        return kept
+    if isinstance(value, dict):
+        kept, used = {}, 2
+        for key, item in value.items():
+            separator = 2 if kept else 0
+            entry_size = _size({key: item}) - 2 + separator
+            if used + entry_size > max_bytes:
+                # a large entry among small ones, like the results next to their metadata, is shrunk to fit.
+                # Otherwise, like for a plan with many rules, the remaining entries are left out.
+                remaining = max_bytes - used - separator - _size(key) - 2
+                if remaining >= max_bytes // 4 or not kept:
+                    kept[key] = shrink(item, remaining, path + (key,), cuts)
+                break
+            kept[key] = item
+            used += entry_size
+        if len(kept) < len(value):
+            cuts.append({"path": list(path), "total_keys": len(value), "returned_keys": len(kept)})
+        return kept
+    return value
+
+
+def page(value: Any, offset: int, max_bytes: int) -> Dict[str, Any]:
+    """A page of a list, a dictionary or a string starting at offset, of at most about max_bytes.
+
+    Returns:
+        Dict[str, Any]: the 'items', 'entries' or 'text' of the page, its 'offset', the 'total'
+            and the 'next_offset', which is None on the last page
+    """
+    if isinstance(value, str):
+        text = _cut_text(value[offset:], max_bytes)
+        next_offset = offset + len(text)
+        return {"text": text, "offset": offset, "total": len(value),
+                "next_offset": next_offset if next_offset < len(value) else None}
+    is_dict = isinstance(value, dict)
+    if is_dict:
+        items = list(value.items())
+    elif isinstance(value, (set, frozenset)):
+        items = _sorted_items(value)
+    else:
+        items = list(value)
+    cuts: List[Dict[str, Any]] = []
+    kept = shrink(items[offset:], max_bytes, (), cuts)
+    # a shrunk first item still moves the page forward
+    next_offset = offset + max(len(kept), 1)
+    return {"entries" if is_dict else "items": dict(kept) if is_dict else kept,
+            "offset": offset, "total": len(items),
+            "next_offset": next_offset if next_offset < len(items) else None}
+
+
+def _value_at(value: Any, path: List[Any]) -> Any:
+    for key in path:
+        value = value[key]
+    return value
+
+
+class ToolResultGovernor:
+    """Keeps tool results within per-tool budgets before they reach the model.
+
+    A result larger than its tool's budget is shrunk deterministically: lists keep their first items,
+    dictionaries their first entries and strings their start. A 'truncation' summary is added with the
+    original and returned sizes, the counts of each cut and a 'continuation' handle. The full result is
+    kept in memory under that handle, so the model can read the rest with the read_truncated_result tool.
+    How often each tool is truncated is counted in the metrics.
+    """
+    def __init__(self, max_continuations: int = 128):
+        self.max_continuations = max_continuations
+        self.continuations: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "truncated": 0, "original_bytes": 0, "returned_bytes": 0})
+
+    def govern(self, tool_name: str, result: Any) -> Any:
+        """Returns the result, or a truncated copy with a summary if it is over the tool's budget."""
+        max_bytes = budget_bytes(tool_name)
+        original_bytes = _size(result)
+        with self.lock:
+            metrics = self.metrics[tool_name]
+            metrics["calls"] += 1
+            metrics["original_bytes"] += original_bytes
+        if original_bytes <= max_bytes:
+            with self.lock:
+                metrics["returned_bytes"] += original_bytes
+            return result
+
+        full = result if isinstance(result, dict) else {"result": result}
+        cuts: List[Dict[str, Any]] = []
+        governed = shrink(full, max(max_bytes - SUMMARY_BYTES, 0), (), cuts)
+        encoded = json.dumps(full, sort_keys=True, default=str).encode("utf-8")
+        handle = f"{tool_name}:{hashlib.sha256(encoded).hexdigest()[:16]}"
+        first = cuts[0] if cuts else {"path": []}
+        returned = first.get("returned_items", first.get("returned_keys", first.get("returned_chars", 0)))
+        governed["truncation"] = {
+            "original_bytes": original_bytes,
+            "max_bytes": max_bytes,
+            "cuts": cuts,
+            "continuation": handle,
+            "message": f"The result was too large and was truncated. To read more, use the read_truncated_result tool "
+                       f"with continuation '{handle}' and offset {returned}, or make a narrower request.",
+        }
+        with self.lock:
+            self.continuations[handle] = {"tool": tool_name, "result": full, "path": first["path"]}
+            self.continuations.move_to_end(handle)
+            while len(self.continuations) > self.max_continuations:
+                self.continuations.popitem(last=False)
+            metrics["truncated"] += 1
+            metrics["returned_bytes"] += _size(governed)
+        return governed
+
+    def read(self, continuation: str, offset: int) -> Dict[str, Any]:
+        with self.lock:
+            entry = self.continuations.get(continuation)
+        if entry is None:
+            return tool_error(f"Unknown or expired continuation '{continuation}'. Call the original tool again.")
+        try:
+            value = _value_at(entry["result"], entry["path"])
+        except (KeyError, IndexError, TypeError):
+            return tool_error(f"The truncated part of continuation '{continuation}' can not be read.")
+        if offset < 0:
+            return tool_error("The offset must be 0 or more.")
+        max_bytes = max(budget_bytes(entry["tool"]) - SUMMARY_BYTES, 0)
+        return tool_success("truncated_result", dict(page(value, offset, max_bytes),
+                                                     continuation=continuation, path=entry["path"]))
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool calls, truncations, truncation rate and original and returned bytes."""
+        with self.lock:
+            return {name: dict(m, truncation_rate=round(m["truncated"] / m["calls"], 3) if m["calls"] else 0.0)
+                    for name, m in self.metrics.items()}
+
+
+_governor = ToolResultGovernor()
+
+def get_tool_result_governor() -> ToolResultGovernor:
+    """Gets the process-wide governor shared by all governed tools."""
+    return _governor
+
+
+# Tool: Read Truncated Result
+def read_truncated_result(continuation: str, offset: int = 0) -> dict:
+    """Reads more of a tool result which was truncated because it was too large.
+
+    Args:
+      continuation: the 'continuation' handle from the 'truncation' summary of the truncated result
+      offset: the index of the first item, entry or character to read, as given in the summary's message
+              or by the 'next_offset' of the previous page
+
+    Returns:
+        dict: A dictionary containing metadata about the content.
+                Includes a 'status' key ('success' or 'error').
+                If 'success', includes a 'truncated_result' key with a page of the truncated part
+                under 'items', 'entries' or 'text', the 'total' and the 'next_offset' (None on the last page).
+                If 'error', includes an 'error_message' key.
+    """
+    return _governor.read(continuation, offset)
+
+
+def governed(func: Callable) -> Callable:
+    """Wraps a tool function so its result is kept within the tool's budget.
+    The wrapper keeps the name, docstring and signature the model sees."""
+    if getattr(func, "__governed__", False):
+        return func
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return _governor.govern(func.__name__, await func(*args, **kwargs))
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return _governor.govern(func.__name__, func(*args, **kwargs))
+    wrapper.__governed__ = True
+    return wrapper
+
+
+def govern_tools(tools: List[Any]) -> List[Any]:
+    """Governs every function of a tool list, and adds the read_truncated_result tool.
+    Tool objects, like agents wrapped as tools, are kept as they are."""
+    governed_tools = [governed(tool) if inspect.isfunction(tool) else tool for tool in tools]
+    if any(getattr(tool, "__governed__", False) for tool in governed_tools) and read_truncated_result not in governed_tools:
+        governed_tools.append(read_truncated_result)
+    return governed_tools
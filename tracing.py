@@ -0,0 +1,226 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from neo4j_for_adk import get_cache_dir
+
+# the path of the running agent, like "schema_proposal_coordinator/schema_refinement_loop/schema_critic_agent_v1".
+# A context variable, so the path carries into agents run as tools, which start a new invocation.
+_agent_path: contextvars.ContextVar[str] = contextvars.ContextVar("agent_path", default="")
+
+
+def iter_agents(agent: BaseAgent):
+    """Every agent in a tree, including sub-agents and agents wrapped as tools, each once."""
+    seen, stack = set(), [agent]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        stack.extend(current.sub_agents)
+        if isinstance(current, LlmAgent):
+            stack.extend(tool.agent for tool in current.tools if isinstance(tool, AgentTool))
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+class Tracer:
+    """Records agent, LLM call and tool call spans to a JSONL file, from ADK callbacks.
+
+    Each line is one span with its 'kind' ('agent', 'llm' or 'tool'), 'name', the agent 'path',
+    'start' and 'latency_ms'. LLM spans add prompt and completion tokens, tool spans the
+    size of the arguments and the result in bytes of JSON.
+    """
+    def __init__(self, trace_path: Optional[str] = None):
+        if trace_path is None:
+            trace_dir = get_cache_dir() / "traces"
+            trace_dir.mkdir(exist_ok=True)
+            trace_path = trace_dir / f"trace_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self.trace_path = Path(trace_path)
+        self.lock = threading.Lock()
+        self.starts: Dict[tuple, float] = {}
+        self.file = open(self.trace_path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        self.file.close()
+
+    def _write(self, span: Dict[str, Any]) -> None:
+        with self.lock:
+            self.file.write(json.dumps(span, default=str) + "\n")
+            self.file.flush()
+
+    def _finish(self, key: tuple, kind: str, name: str, path: str, **fields) -> None:
+        started = self.starts.pop(key, None)
+        if started is None:
+            return
+        now = time.time()
+        self._write(dict({"kind": kind, "name": name, "path": path, "start": started,
+                          "latency_ms": round((now - started) * 1000, 2)}, **fields))
+
+    # before_agent_callback
+    def before_agent(self, callback_context: CallbackContext) -> None:
+        parent = _agent_path.get()
+        path = f"{parent}/{callback_context.agent_name}" if parent else callback_context.agent_name
+        _agent_path.set(path)
+        self.starts[("agent", callback_context.invocation_id, path)] = time.time()
+        return None
+
+    # after_agent_callback
+    def after_agent(self, callback_context: CallbackContext) -> None:
+        path = _agent_path.get()
+        self._finish(("agent", callback_context.invocation_id, path), "agent", callback_context.agent_name, path,
+                     invocation_id=callback_context.invocation_id)
+        _agent_path.set(path.rpartition("/")[0])
+        return None
+
+    # before_model_callback
+    def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        self.starts[("llm", callback_context.invocation_id, _agent_path.get())] = time.time()
+        return None
+
+    # after_model_callback
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> None:
+        if llm_response.partial:
+            return None
+        path = _agent_path.get()
+        usage = llm_response.usage_metadata
+        self._finish(("llm", callback_context.invocation_id, path), "llm", callback_context.agent_name, path,
+                     invocation_id=callback_context.invocation_id,
+                     prompt_tokens=(usage.prompt_token_count or 0) if usage else 0,
+                     completion_tokens=(usage.candidates_token_count or 0) if usage else 0,
+                     error=llm_response.error_code)
+        return None
+
+    # before_tool_callback
+    def before_tool(self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext) -> None:
+        self.starts[("tool", tool_context.invocation_id, tool_context.function_call_id)] = time.time()
+        return None
+
+    # after_tool_callback
+    def after_tool(self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Any) -> None:
+        status = tool_response.get("status") if isinstance(tool_response, dict) else None
+        self._finish(("tool", tool_context.invocation_id, tool_context.function_call_id), "tool", tool.name,
+                     _agent_path.get(), invocation_id=tool_context.invocation_id,
+                     args_bytes=_size(args), result_bytes=_size(tool_response), status=status)
+        return None
+
+    def install(self, root_agent: BaseAgent) -> "Tracer":
+        """Adds the tracing callbacks to every agent of a tree, once. Agents can be traced by one tracer at a time."""
+        hooks = {
+            "before_agent_callback": self.before_agent, "after_agent_callback": self.after_agent,
+            "before_model_callback": self.before_model, "after_model_callback": self.after_model,
+            "before_tool_callback": self.before_tool, "after_tool_callback": self.after_tool,
+        }
+        for agent in iter_agents(root_agent):
+            for attribute, hook in hooks.items():
+                if not hasattr(agent, attribute):
+                    continue
+                callbacks = getattr(agent, attribute) or []
+                callbacks = callbacks if isinstance(callbacks, list) else [callbacks]
+                if hook in callbacks:
+                    continue
+                # the before-agent hook goes first, so the agent's own callbacks run inside the span
+                setattr(agent, attribute, [hook] + callbacks if attribute == "before_agent_callback" else callbacks + [hook])
+        return self
+
+
+_tracer: Optional[Tracer] = None
+
+def get_tracer() -> Optional[Tracer]:
+    """Gets the shared tracer if tracing is enabled by the AGENTIC_KG_TRACE_FILE environment variable.
+    Set it to a file path, or to "1" for a timestamped file in the cache directory."""
+    global _tracer
+    trace_file = os.getenv("AGENTIC_KG_TRACE_FILE")
+    if _tracer is None and trace_file:
+        _tracer = Tracer(None if trace_file == "1" else trace_file)
+    return _tracer
+
+
+def summarize_trace(trace_path: str, under: Optional[str] = None) -> Dict[str, Any]:
+    """Summarizes a trace by agent and by tool: where the time and the tokens went.
+
+    Args:
+        trace_path: the JSONL trace file
+        under: optional agent name; only spans within that agent are counted, for example "schema_refinement_loop"
+
+    Returns:
+        Dict[str, Any]: 'agents' with per-agent run count, total time, LLM calls, LLM time and tokens,
+            'tools' with per-tool call count, total time and bytes, and 'totals'
+    """
+    agents = defaultdict(lambda: {"runs": 0, "total_ms": 0.0, "llm_calls": 0, "llm_ms": 0.0,
+                                  "prompt_tokens": 0, "completion_tokens": 0, "tool_calls": 0, "tool_ms": 0.0})
+    tools = defaultdict(lambda: {"calls": 0, "total_ms": 0.0, "args_bytes": 0, "result_bytes": 0, "errors": 0})
+    with open(trace_path, encoding="utf-8") as file:
+        for line in file:
+            span = json.loads(line)
+            if under and under not in span["path"].split("/"):
+                continue
+            agent_name = span["path"].rpartition("/")[2]
+            if span["kind"] == "agent":
+                agents[agent_name]["runs"] += 1
+                agents[agent_name]["total_ms"] += span["latency_ms"]
+            elif span["kind"] == "llm":
+                agents[agent_name]["llm_calls"] += 1
+                agents[agent_name]["llm_ms"] += span["latency_ms"]
+                agents[agent_name]["prompt_tokens"] += span.get("prompt_tokens", 0)
+                agents[agent_name]["completion_tokens"] += span.get("completion_tokens", 0)
+            elif span["kind"] == "tool":
+                agents[agent_name]["tool_calls"] += 1
+                agents[agent_name]["tool_ms"] += span["latency_ms"]
+                tool = tools[span["name"]]
+                tool["calls"] += 1
+                tool["total_ms"] += span["latency_ms"]
+                tool["args_bytes"] += span.get("args_bytes", 0)
+                tool["result_bytes"] += span.get("result_bytes", 0)
+                tool["errors"] += span.get("status") == "error"
+
+    totals = {
+        "llm_calls": sum(a["llm_calls"] for a in agents.values()),
+        "llm_ms": round(sum(a["llm_ms"] for a in agents.values()), 2),
+        "prompt_tokens": sum(a["prompt_tokens"] for a in agents.values()),
+        "completion_tokens": sum(a["completion_tokens"] for a in agents.values()),
+        "tool_calls": sum(t["calls"] for t in tools.values()),
+        "tool_ms": round(sum(t["total_ms"] for t in tools.values()), 2),
+    }
+    by_time = lambda items: dict(sorted(items, key=lambda item: -item[1]["total_ms"]))
+    return {"agents": by_time(agents.items()), "tools": by_time(tools.items()), "totals": totals}
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Renders a trace summary as a plain text report."""
+    lines = [f"{'agent':<40} {'runs':>5} {'total s':>9} {'llm':>5} {'llm s':>8} {'prompt tok':>11} {'compl tok':>10} {'tools':>6} {'tool s':>8}"]
+    for name, a in summary["agents"].items():
+        lines.append(f"{name:<40} {a['runs']:>5} {a['total_ms'] / 1000:>9.2f} {a['llm_calls']:>5} {a['llm_ms'] / 1000:>8.2f} "
+                     f"{a['prompt_tokens']:>11} {a['completion_tokens']:>10} {a['tool_calls']:>6} {a['tool_ms'] / 1000:>8.2f}")
+    lines.append("")
+    lines.append(f"{'tool':<40} {'calls':>5} {'total s':>9} {'args B':>9} {'result B':>10} {'errors':>6}")
+    for name, t in summary["tools"].items():
+        lines.append(f"{name:<40} {t['calls']:>5} {t['total_ms'] / 1000:>9.2f} {t['args_bytes']:>9} {t['result_bytes']:>10} {t['errors']:>6}")
+    totals = summary["totals"]
+    lines.append("")
+    lines.append(f"LLM: {totals['llm_calls']} calls, {totals['llm_ms'] / 1000:.2f} s, "
+                 f"{totals['prompt_tokens']} prompt and {totals['completion_tokens']} completion tokens. "
+                 f"Tools: {totals['tool_calls']} calls, {totals['tool_ms'] / 1000:.2f} s.")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import sys
+    # usage: python tracing.py trace.jsonl [agent_name]
+    print(format_summary(summarize_trace(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)))
@@ -1,5 +1,5 @@
 from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
+from llm_cache import CachingLiteLlm
 from dotenv import load_dotenv
 from unstructured_data_agents.tools import ner_agent_tools, fact_agent_tools
 from file_suggestion_agent.agent import file_suggestion_agent
@@ -45,7 +45,7 @@ prompt_ner_agent = """
 
 """
 
-llm = LiteLlm(model="gemini/gemini-2.5-flash")
+llm = CachingLiteLlm(model="gemini/gemini-2.5-flash")
 
 ner_schema_agent = Agent(
     name="ner_schema_agent_v1",
@@ -81,7 +81,8 @@ prompt_fact_agent = """
 
     Think step by step:
     1. Use the 'get_approved_user_goal' tool to get the user goal
-    2. Sample some of the approved files using the 'sample_file' tool to understand the content
+    2. Sample some of the approved files using the 'sample_file' tool to understand the content.
+       If passages have already been indexed, use the 'find_review_passages' tool to find supporting text instead of sampling whole files
     3. Consider how subjects and objects are related in the text
     4. Call the 'add_proposed_fact' tool for each type of fact you propose
     5. Use the 'get_proposed_facts' tool to retrieve all the proposed facts
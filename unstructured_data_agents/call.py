@@ -1,8 +1,10 @@
 import asyncio
+import sys
+from typing import Optional
 from main_call import make_agent_caller
 from unstructured_data_agents.agent import ner_schema_agent
 
-async def main():
+async def main(session_id: Optional[str] = None):
     ner_agent_initial_state = {
     "approved_user_goal": {
         "kind_of_graph": "supply chain analysis",
@@ -41,11 +43,17 @@ async def main():
         # Relationship construction omitted, since it won't get used in this notebook
     }
 }
-    ner_agent_caller = await make_agent_caller(ner_schema_agent, ner_agent_initial_state)
+    # continue the session of the structured data stage if given, keeping its approved goal and construction plan;
+    # this stage works on the review files instead of the CSV files approved there
+    review_files = {"approved_files": ner_agent_initial_state["approved_files"]}
+    ner_agent_caller = await make_agent_caller(ner_schema_agent, review_files if session_id else ner_agent_initial_state,
+                                               session_id=session_id)
 
     await ner_agent_caller.call("Add product reviews to the knowledge graph to trace product complaints back through the manufacturing process.")
+    return ner_agent_caller
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # usage: python -m unstructured_data_agents.call [session_id]
+    asyncio.run(main(*sys.argv[1:2]))
 
@@ -1,9 +1,12 @@
 from dotenv import load_dotenv
 from neo4j_for_adk import tool_success, tool_error
+from tool_budget import govern_tools
+from async_tools import offloaded
 from google.adk.tools.tool_context import ToolContext
 from google.adk.tools import ToolContext
 from file_suggestion_agent.tools import approve_suggested_files, sample_file
 from indent_agent.tools import approve_perceived_user_goal
+from knowledge_graph.chunk_retrieval import find_review_passages
 
 load_dotenv()
 
@@ -92,19 +95,19 @@ def approve_proposed_facts(tool_context:ToolContext) -> dict:
     return tool_success(APPROVED_FACTS, tool_context.state[APPROVED_FACTS])
 
 
-ner_agent_tools = [
-    approve_perceived_user_goal, approve_suggested_files, sample_file,
+ner_agent_tools = govern_tools([
+    approve_perceived_user_goal, approve_suggested_files, offloaded(sample_file),
     get_well_known_types,
     set_proposed_entities,
     approve_proposed_entities,
     get_proposed_entities
-]
+])
 
-fact_agent_tools = [
+fact_agent_tools = govern_tools([
     approve_perceived_user_goal, approve_suggested_files,
     get_approved_entities,
-    sample_file,
+    offloaded(sample_file), find_review_passages,
     add_proposed_fact,
     get_proposed_facts,
     approve_proposed_facts
-]
+])